@@ -0,0 +1,85 @@
+# benchmarks/ccd.py
+"""
+Continuous collision detection in Controller.update_all at high speed.
+
+Two runs of TICKS ticks per scenario and speed multiplier:
+- planned: every robot follows its planned path to its target. Reports ms
+  per tick, which grows with the substeps a fast tick needs, and the share
+  of robots that reached the end of their path. Without CCD fast robots
+  stall at a capped step instead.
+- straight: every robot heads straight for its target, through whatever
+  walls are in the way. A move whose center line crosses an obstacle is a
+  tunnel, an end position closer than the robot radius to an obstacle a
+  penetration; both should stay at zero at any speed.
+
+Run from the repository root:
+    python -m benchmarks.ccd
+"""
+import time
+
+import numpy as np
+
+from benchmarks.scenarios import Scenario
+from core.controller import Controller
+from core.fleet import segment_distances
+from core.geometry import segment_to_segment_distance
+
+SCENARIOS = [Scenario(100, 50), Scenario(400, 200)]
+MULTIPLIERS = [1, 4, 16, 64]
+TICKS = 120
+DT = 1.0 / 60
+
+
+def planned(scenario, multiplier):
+    """(ms per tick, share of robots at the end of their path)."""
+    world = scenario.build()
+    controller = Controller()
+    for robot in world.robots:
+        robot.set_path(controller.plan_path(robot, world, robot.target) or [])
+
+    began = time.perf_counter()
+    for _ in range(TICKS):
+        world.update_robot_index()
+        controller.update_all(world, DT * multiplier)
+    elapsed = time.perf_counter() - began
+    done = sum(robot.path_index >= len(robot.path) - 1 for robot in world.robots)
+    return elapsed / TICKS * 1000, done / len(world.robots)
+
+
+def straight(scenario, multiplier):
+    """(tunnels, penetrations) over the run."""
+    world = scenario.build()
+    controller = Controller()
+    for robot in world.robots:
+        robot.set_path([robot.target])
+    segments = np.array([(*o.p1, *o.p2) for o in world.obstacles], dtype=float)
+
+    tunnels, penetrations = 0, 0
+    for _ in range(TICKS):
+        fleet = world.sync_fleet()
+        before = fleet.pos[:fleet.size].copy()
+        world.update_robot_index()
+        controller.update_all(world, DT * multiplier)
+
+        after = fleet.pos[:fleet.size]
+        d = segment_distances(after, segments)
+        penetrations += int((d.min(axis=1) < fleet.radius[:fleet.size] - 1e-9).sum())
+        for p, q in zip(before, after):
+            if (p != q).any():
+                nearby = world.obstacle_index.query_aabb(*np.minimum(p, q), *np.maximum(p, q))
+                tunnels += any(segment_to_segment_distance(p, q, o.p1, o.p2) == 0 for o in nearby)
+    return tunnels, penetrations
+
+
+def main():
+    print(f"{'scenario':<16} {'speed':>5} {'ms/tick':>8} {'done':>6} {'tunnels':>8} {'penetrations':>12}")
+    for scenario in SCENARIOS:
+        for multiplier in MULTIPLIERS:
+            ms, done = planned(scenario, multiplier)
+            tunnels, penetrations = straight(scenario, multiplier)
+            print(f"{scenario.name:<16} {multiplier:>4}x {ms:>8.2f} {done:>6.0%} "
+                  f"{tunnels:>8} {penetrations:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/clearance.py
+"""
+Clearance field: build and edit cost, accuracy and how often it decides.
+
+For each scenario the field is built from scratch, then one obstacle is
+added and removed again through the obstacle journal (the incremental
+path). Accuracy is the largest difference between the interpolated
+clearance and the exact distance to the nearest obstacle over SAMPLES
+random points, next to the field's stated error bound. The last column is
+the share of those points classify() settles for a robot of radius 1
+without an exact check.
+
+Run from the repository root:
+    python -m benchmarks.clearance
+"""
+import random
+import time
+
+from benchmarks.scenarios import ROBOT_RADIUS, Scenario
+from core.spatial import SegmentIndex
+
+SCENARIOS = [Scenario(20, 10), Scenario(100, 50), Scenario(400, 200), Scenario(2000, 200)]
+SAMPLES = 2000
+
+
+def main():
+    print(f"{'scenario':<16} {'build ms':>9} {'add ms':>7} {'remove ms':>9} "
+          f"{'max error':>9} {'bound':>6} {'decided':>8}")
+    for scenario in SCENARIOS:
+        world = scenario.build()
+        # Build the field even where World would leave it to obstacle_index
+        world.CLEARANCE_MIN_OBSTACLES = 0
+
+        began = time.perf_counter()
+        field = world.clearance
+        built = time.perf_counter() - began
+
+        obs = world.add_obstacle((40.0, 40.0), (52.0, 47.0))
+        began = time.perf_counter()
+        world.clearance
+        added = time.perf_counter() - began
+        world.remove_obstacle(obs)
+        began = time.perf_counter()
+        world.clearance
+        removed = time.perf_counter() - began
+
+        rng = random.Random(scenario.seed)
+        worst, decided = 0.0, 0
+        for _ in range(SAMPLES):
+            x, y = rng.uniform(0, world.width), rng.uniform(0, world.height)
+            exact = min((SegmentIndex.distance(o, x, y) for o in world.obstacles), default=field.max_distance)
+            if exact < field.max_distance - field.error:
+                worst = max(worst, abs(field.clearance(x, y) - exact))
+            decided += field.classify(x, y, ROBOT_RADIUS, ROBOT_RADIUS) is not None
+
+        print(f"{scenario.name:<16} {built * 1000:>9.1f} {added * 1000:>7.1f} {removed * 1000:>9.1f} "
+              f"{worst:>9.3f} {field.error:>6.3f} {decided / SAMPLES:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
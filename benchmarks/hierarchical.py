@@ -0,0 +1,70 @@
+# benchmarks/hierarchical.py
+"""
+HPA* over clustered quadtree leaves versus plain A* as maps grow.
+
+Each map is a seeded random scenario at its own world size, with grid and
+cluster sizes scaled along. Every robot is planned from its position to
+its target with both searches on the same OccupancyGrid (path cache off);
+the times are per query, and "length" is the mean HPA* / A* ratio of the
+cell path lengths. One-off costs (grid and abstract graph) are listed
+separately.
+
+Run from the repository root:
+    python -m benchmarks.hierarchical
+"""
+import math
+import time
+
+from benchmarks.scenarios import Scenario
+from core.controller import Controller
+
+# (scenario, base_grid, min_grid, cluster_size)
+MAPS = [
+    (Scenario(400, 100), 8.0, 1.0, 32.0),
+    (Scenario(2000, 30, min_length=4.0, max_length=30.0, width=1024.0, height=1024.0), 16.0, 2.0, 64.0),
+    (Scenario(8000, 30, min_length=10.0, max_length=60.0, width=4096.0, height=4096.0), 64.0, 8.0, 256.0),
+]
+
+
+def cells_length(grid, cells):
+    points = [grid.center(i) for i in cells]
+    return sum(math.dist(a, b) for a, b in zip(points, points[1:]))
+
+
+def main():
+    print(f"{'map':<22} {'leaves':>7} {'grid s':>7} {'graph s':>8} {'nodes':>6} "
+          f"{'A* ms':>7} {'HPA* ms':>8} {'length':>7}")
+    for scenario, base_grid, min_grid, cluster_size in MAPS:
+        world = scenario.build()
+        flat = Controller(base_grid, min_grid, path_cache_size=0)
+        hpa = Controller(base_grid, min_grid, path_cache_size=0, hierarchical=True, cluster_size=cluster_size)
+
+        began = time.perf_counter()
+        grid = flat.get_occupancy_grid(world, 1.0)
+        built = time.perf_counter() - began
+        began = time.perf_counter()
+        graph = hpa.abstract_graph(grid)
+        abstracted = time.perf_counter() - began
+
+        queries = [(flat.get_cell_index(r.x, r.y, grid), flat.get_cell_index(*r.target, grid))
+                   for r in world.robots]
+        flat_time = hpa_time = 0.0
+        ratios = []
+        for start, end in queries:
+            began = time.perf_counter()
+            exact = flat.search_cells(grid, start, end)
+            flat_time += time.perf_counter() - began
+            began = time.perf_counter()
+            cells = hpa.search_cells(grid, start, end)
+            hpa_time += time.perf_counter() - began
+            if exact and cells and len(exact) > 1:
+                ratios.append(cells_length(grid, cells) / cells_length(grid, exact))
+
+        n = len(queries)
+        length = sum(ratios) / len(ratios) if ratios else float("nan")
+        print(f"{scenario.name:<22} {len(grid):>7} {built:>7.1f} {abstracted:>8.1f} {len(graph.edges):>6} "
+              f"{flat_time * 1000 / n:>7.2f} {hpa_time * 1000 / n:>8.2f} {length:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
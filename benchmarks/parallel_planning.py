@@ -0,0 +1,62 @@
+# benchmarks/parallel_planning.py
+"""
+Serial versus process-pool path planning (core/parallel.py).
+
+Plans every robot of a seeded scenario (benchmarks/scenarios.py) into the
+target region, as Engine.assign_paths does, and with a plain A* to each
+target, as plan_path does. "first" includes starting the pool and shipping
+the grid; "warm" is a second call on the same pool. Every run is checked
+against the serial paths. The path cache is off throughout, so every call
+plans every robot and the paths must match the serial ones exactly.
+
+Run from the repository root:
+    python -m benchmarks.parallel_planning [num_robots]
+"""
+import os
+import sys
+import time
+
+from benchmarks.scenarios import Scenario
+from core.controller import Controller
+from core.parallel import ParallelPlanner
+
+WORKERS = [1, 2, 4, 8]
+OBSTACLES = 400
+SEED = 1
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    num_robots = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    world = Scenario(OBSTACLES, num_robots, SEED).build()
+    controller = Controller(path_cache_size=0)
+    region = world.target_region
+
+    controller.cost_to_go(world, 1.0, region)  # build grid and field outside the timings
+    modes = {
+        "region": (region, lambda: [controller.plan_path_to_region(r, world, region, r.target)
+                                    for r in world.robots]),
+        "astar": (None, lambda: [controller.plan_path(r, world, r.target) for r in world.robots]),
+    }
+
+    print(f"{num_robots} robots, {OBSTACLES} obstacles, {os.cpu_count()} CPUs")
+    print(f"{'mode':>6} {'workers':>7} {'first ms':>9} {'warm ms':>8} {'speedup':>8} {'equal':>6}")
+    for mode, (target_region, serial) in modes.items():
+        expected, t_serial = timed(serial)
+        print(f"{mode:>6} {'serial':>7} {t_serial * 1000:>9.1f} {t_serial * 1000:>8.1f} {1.0:>7.2f}x {'-':>6}")
+        for workers in WORKERS:
+            with ParallelPlanner(controller, workers) as planner:
+                first, t_first = timed(lambda: planner.plan(world, world.robots, target_region))
+                warm, t_warm = timed(lambda: planner.plan(world, world.robots, target_region))
+            equal = first == expected and warm == expected
+            print(f"{mode:>6} {workers:>7} {t_first * 1000:>9.1f} {t_warm * 1000:>8.1f} "
+                  f"{t_serial / t_warm:>7.2f}x {str(equal):>6}")
+
+
+if __name__ == "__main__":
+    main()
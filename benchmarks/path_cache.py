@@ -0,0 +1,60 @@
+# benchmarks/path_cache.py
+"""
+Controller's LRU path cache on repeated and overlapping queries.
+
+For each benchmark scenario: plan every robot to its target with a cold
+cache, plan the same queries again (exact hits, as on a reset or a second
+START), then plan from a waypoint halfway along each path (suffix hits, as
+on a replan mid-route). The last column checks that the cached answers cost
+the same as fresh searches on a controller without a cache.
+
+Run from the repository root:
+    python -m benchmarks.path_cache
+"""
+import time
+
+from benchmarks.suite import SCENARIOS
+from core.controller import Controller
+
+
+def path_cost(grid, cells):
+    return sum(grid.neighbors[a][b] for a, b in zip(cells, cells[1:]))
+
+
+def timed(controller, grid, queries):
+    started = time.perf_counter()
+    paths = [controller.cached_astar(grid, s, e) for s, e in queries]
+    return time.perf_counter() - started, paths
+
+
+def main():
+    print(f"{'scenario':<14} {'queries':>7} {'cold ms':>8} {'repeat ms':>9} {'suffix ms':>9} "
+          f"{'hits':>5} {'suffix':>6} {'misses':>6} {'same cost':>9}")
+    for scenario in SCENARIOS:
+        world = scenario.build()
+        controller = Controller()
+        fresh = Controller(path_cache_size=0)
+        grid = controller.get_occupancy_grid(world, 1.0)
+        queries = [(controller.get_cell_index(*robot.position, grid),
+                    controller.get_cell_index(*robot.target, grid)) for robot in world.robots]
+        queries = [(s, e) for s, e in queries if s != -1 and e != -1]
+
+        cold, paths = timed(controller, grid, queries)
+        repeat, _ = timed(controller, grid, queries)
+        halfway = [(cells[len(cells) // 2], e) for cells, (_, e) in zip(paths, queries) if cells]
+        suffix, suffix_paths = timed(controller, grid, halfway)
+
+        same = all(
+            (cells is None and expected is None) or
+            abs(path_cost(grid, cells) - path_cost(grid, expected)) < 1e-9
+            for (s, e), cells in zip(queries + halfway, paths + suffix_paths)
+            for expected in [fresh.astar(grid, s, e)]
+        )
+        info = controller.path_cache_info()
+        print(f"{scenario.name:<14} {len(queries):>7} {cold * 1000:>8.1f} {repeat * 1000:>9.2f} "
+              f"{suffix * 1000:>9.2f} {info['hits']:>5} {info['suffix_hits']:>6} {info['misses']:>6} "
+              f"{str(same):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/plan_path.py
+"""
+Plan time versus obstacle count, before and after the quadtree neighbor graph.
+
+"before" replays the old A* that scanned every grid cell for touching
+neighbors on each expansion; "after" is Controller.search_path over the
+precomputed graph. Both search the same prebuilt grid.
+
+Run from the repository root:
+    python -m benchmarks.plan_path
+"""
+import heapq
+import math
+import random
+import time
+
+from core.controller import Controller
+from core.world import World
+
+OBSTACLE_COUNTS = [0, 25, 50, 100, 200, 400]
+ROBOTS = 5
+SEED = 0
+
+
+def random_world(num_obstacles, seed):
+    random.seed(seed)
+    world = World(num_robots=ROBOTS)
+    for _ in range(num_obstacles):
+        x = random.uniform(35, 85)
+        y = random.uniform(35, 85)
+        a = random.uniform(0, math.pi)
+        l = random.uniform(2, 8)
+        world.add_obstacle((x, y), (x + l * math.cos(a), y + l * math.sin(a)))
+    return world
+
+
+def legacy_search_path(controller, grid, start, target):
+    """The pre-graph search: linear neighbor scan over all cells per expansion."""
+    start_idx = controller.get_cell_index(start[0], start[1], grid)
+    end_idx = controller.get_cell_index(target[0], target[1], grid)
+    grid_cells = list(grid)
+    if start_idx == -1 or end_idx == -1:
+        return None
+
+    start_cell = grid_cells[start_idx]
+    start_center = (start_cell[0] + start_cell[2] / 2, start_cell[1] + start_cell[3] / 2)
+    end_cell = grid_cells[end_idx]
+    end_center = (end_cell[0] + end_cell[2] / 2, end_cell[1] + end_cell[3] / 2)
+
+    open_set = [(0, start_idx, [start_center])]
+    g_score = {start_idx: 0}
+    visited = set()
+    EPS = 0.1
+
+    while open_set:
+        _, current_idx, path = heapq.heappop(open_set)
+        if current_idx in visited:
+            continue
+        visited.add(current_idx)
+        if current_idx == end_idx:
+            return path + [target]
+
+        cx0, cy0, cw, ch, _ = grid_cells[current_idx]
+        cx, cy = cx0 + cw / 2, cy0 + ch / 2
+        for i, cell in enumerate(grid_cells):
+            if i == current_idx or not cell[4] or i in visited:
+                continue
+            nx, ny = cell[0] + cell[2] / 2, cell[1] + cell[3] / 2
+            dx, dy = abs(nx - cx), abs(ny - cy)
+            sum_w, sum_h = (cw + cell[2]) / 2, (ch + cell[3]) / 2
+            if dx > sum_w + EPS or dy > sum_h + EPS:
+                continue
+            touch_x = abs(dx - sum_w) < EPS and dy < sum_h - EPS
+            touch_y = abs(dy - sum_h) < EPS and dx < sum_w - EPS
+            touch_diag = abs(dx - sum_w) < EPS and abs(dy - sum_h) < EPS
+            if touch_x or touch_y or touch_diag:
+                new_g = g_score[current_idx] + math.hypot(nx - cx, ny - cy)
+                if i not in g_score or new_g < g_score[i]:
+                    g_score[i] = new_g
+                    h = math.hypot(end_center[0] - nx, end_center[1] - ny)
+                    heapq.heappush(open_set, (new_g + h, i, path + [(nx, ny)]))
+    return None
+
+
+def time_searches(search, controller, grid, world):
+    start = time.perf_counter()
+    paths = [search(controller, grid, robot.position, (100.0, 100.0)) for robot in world.robots]
+    return (time.perf_counter() - start) / len(world.robots), paths
+
+
+def main():
+    # No path cache: every search below is timed for real
+    controller = Controller(base_grid=5.0, min_grid=1.0, path_cache_size=0)
+    print("Per-robot times; plan = grid build + search.")
+    print(f"{'obstacles':>9} {'cells':>6} {'build ms':>9} {'search before':>14} "
+          f"{'search after':>13} {'plan before':>12} {'plan after':>11}")
+    for n in OBSTACLE_COUNTS:
+        world = random_world(n, SEED)
+        start = time.perf_counter()
+        grid = controller.build_occupancy_grid(world, 1.0)
+        build = time.perf_counter() - start
+
+        before, old_paths = time_searches(legacy_search_path, controller, grid, world)
+        after, new_paths = time_searches(Controller.search_path, controller, grid, world)
+        assert old_paths == new_paths, "graph planner diverged from the legacy planner"
+        print(f"{n:>9} {len(grid):>6} {build * 1000:>9.1f} {before * 1000:>14.1f} "
+              f"{after * 1000:>13.2f} {(build + before) * 1000:>12.1f} {(build + after) * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
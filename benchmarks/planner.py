@@ -0,0 +1,74 @@
+# benchmarks/planner.py
+"""
+CBS and ECBS on core.grid.Grid for fleets of 10, 50 and 200 robots.
+
+Robots start in distinct cells on the left edge of the world and cross a
+field of random segments to distinct cells on the right edge. Each run is
+capped at TIME_LIMIT seconds; "-" marks runs that hit the cap.
+
+Run from the repository root:
+    python -m benchmarks.planner [time_limit_seconds]
+"""
+import math
+import random
+import sys
+import time
+
+from core.constants import WORLD_WIDTH, WORLD_HEIGHT
+from core.grid import Grid
+from core.planner import Planner, find_conflicts
+from core.robot import Robot
+from core.world import World
+
+FLEET_SIZES = [10, 50, 200]
+ALGORITHMS = [("cbs", 1.0), ("ecbs", 1.5)]
+CELL_SIZE = 2.0
+OBSTACLES = 30
+SEED = 1
+
+
+def fleet_world(num_robots, seed):
+    random.seed(seed)
+    world = World(num_robots=0)
+    for _ in range(OBSTACLES):
+        x = random.uniform(30, WORLD_WIDTH - 30)
+        y = random.uniform(10, WORLD_HEIGHT - 10)
+        a = random.uniform(0, math.pi)
+        l = random.uniform(2, 10)
+        world.add_obstacle((x, y), (x + l * math.cos(a), y + l * math.sin(a)))
+
+    cols, rows = int(WORLD_WIDTH / CELL_SIZE), int(WORLD_HEIGHT / CELL_SIZE)
+    band = 12
+    starts = random.sample([(x, y) for x in range(band) for y in range(rows)], num_robots)
+    goals = random.sample([(x, y) for x in range(cols - band, cols) for y in range(rows)], num_robots)
+    for i, (start, goal) in enumerate(zip(starts, goals)):
+        robot = Robot(i, ((start[0] + 0.5) * CELL_SIZE, (start[1] + 0.5) * CELL_SIZE))
+        robot.target = ((goal[0] + 0.5) * CELL_SIZE, (goal[1] + 0.5) * CELL_SIZE)
+        world.robots.append(robot)
+    return world
+
+
+def main():
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    print(f"{'algorithm':>9} {'robots':>6} {'time s':>8} {'nodes':>6} {'sum cost':>9} {'makespan':>9}")
+    for algorithm, w in ALGORITHMS:
+        for n in FLEET_SIZES:
+            world = fleet_world(n, SEED)
+            grid = Grid(world.width, world.height, CELL_SIZE)
+            planner = Planner(algorithm, suboptimality=w, time_limit=time_limit)
+
+            start = time.perf_counter()
+            plan = planner.plan(world, grid)
+            elapsed = time.perf_counter() - start
+
+            if not plan.success:
+                print(f"{algorithm:>9} {n:>6} {elapsed:>8.2f} {'-':>6} {'-':>9} {'-':>9}")
+                continue
+            cells = {rid: [cell for cell, _ in path] for rid, path in plan.paths.items()}
+            assert not find_conflicts(cells), "plan has conflicts"
+            print(f"{algorithm:>9} {n:>6} {elapsed:>8.2f} {plan.expanded:>6} "
+                  f"{plan.cost:>9} {plan.makespan:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/profiler.py
+"""
+Cost of the profiling instrumentation, disabled and enabled.
+
+Times an empty scope and a guarded counter on their own, then Engine ticks
+of a seeded scenario with the profiler off and on (best of REPEATS runs of
+TICKS steps from the same start positions).
+
+Run from the repository root:
+    python -m benchmarks.profiler
+"""
+import time
+
+from benchmarks.scenarios import Scenario
+from core.profiler import PROFILER
+from simulation.engine import Engine
+
+CALLS = 200_000
+TICKS = 200
+REPEATS = 5
+DT = 1.0 / 60
+SCENARIOS = [Scenario(100, 10), Scenario(400, 400)]
+
+
+def per_call_ns(fn):
+    began = time.perf_counter_ns()
+    fn()
+    return (time.perf_counter_ns() - began) / CALLS
+
+
+def bare_loop():
+    for _ in range(CALLS):
+        pass
+
+
+def scope_loop():
+    for _ in range(CALLS):
+        with PROFILER.scope("bench"):
+            pass
+
+
+def count_loop():
+    for _ in range(CALLS):
+        if PROFILER.enabled:
+            PROFILER.count("bench")
+
+
+def run_ticks(engine, start):
+    world = engine.world
+    world.fleet.pos[:world.fleet.size] = start
+    for robot in world.robots:
+        robot.set_path([robot.target])
+    engine.running = True
+    began = time.perf_counter()
+    for _ in range(TICKS):
+        engine.step(DT)
+        PROFILER.frame()
+    return time.perf_counter() - began
+
+
+def main():
+    loop = per_call_ns(bare_loop)
+    print(f"{'':<10} {'scope ns':>9} {'count ns':>9}")
+    for on in (False, True):
+        PROFILER.enable(on)
+        print(f"{'enabled' if on else 'disabled':<10} {per_call_ns(scope_loop) - loop:>9.0f} "
+              f"{per_call_ns(count_loop) - loop:>9.0f}")
+
+    print(f"\n{'scenario':<16} {'off ms/tick':>11} {'on ms/tick':>11} {'overhead':>9}")
+    for scenario in SCENARIOS:
+        world = scenario.build()
+        start = world.sync_fleet().pos[:world.fleet.size].copy()
+        engine = Engine(world)
+        PROFILER.enable(False)
+        run_ticks(engine, start)  # warm-up
+        times = {False: float("inf"), True: float("inf")}
+        for _ in range(REPEATS):
+            for on in times:
+                PROFILER.enable(on)
+                times[on] = min(times[on], run_ticks(engine, start))
+        PROFILER.enable(False)
+        off, on = times[False] * 1000 / TICKS, times[True] * 1000 / TICKS
+        print(f"{scenario.name:<16} {off:>11.3f} {on:>11.3f} {on / off - 1:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/raycast.py
+"""
+Scalar raycast versus batched raycast_many for a whole fleet.
+
+Every robot casts BEAMS evenly spaced rays against OBSTACLES random
+segments and every other robot, as Renderer.draw_rays does. The scalar
+loop is only timed while it stays under SCALAR_BUDGET ray-shape tests;
+"-" marks skipped runs. The last column is the largest disagreement
+between the two where both ran.
+
+Run from the repository root:
+    python -m benchmarks.raycast
+"""
+import math
+import random
+import time
+
+import numpy as np
+
+from core.constants import WORLD_WIDTH, WORLD_HEIGHT
+from core.robot import Robot
+from core.world import World
+from simulation.sensors import circle_array, raycast, raycast_many, segment_array
+
+FLEET_SIZES = [10, 100, 500]
+BEAMS = [3, 36, 360]
+OBSTACLES = 100
+MAX_RANGE = 20.0
+SCALAR_BUDGET = 5_000_000
+SEED = 1
+
+
+def sensing_world(num_robots, seed):
+    random.seed(seed)
+    world = World(num_robots=0)
+    for _ in range(OBSTACLES):
+        x = random.uniform(0, WORLD_WIDTH)
+        y = random.uniform(0, WORLD_HEIGHT)
+        a = random.uniform(0, math.pi)
+        l = random.uniform(2, 10)
+        world.add_obstacle((x, y), (x + l * math.cos(a), y + l * math.sin(a)))
+    for i in range(num_robots):
+        world.robots.append(Robot(i, (random.uniform(0, WORLD_WIDTH), random.uniform(0, WORLD_HEIGHT))))
+    return world
+
+
+def scalar(world, angles):
+    out = []
+    for robot in world.robots:
+        for a in angles:
+            out.append(raycast((robot.x, robot.y), (math.cos(a), math.sin(a)),
+                               world.obstacles, world.robots, MAX_RANGE, robot))
+    return np.array(out)
+
+
+def batched(world, angles):
+    robots = world.robots
+    n = len(angles)
+    origins = np.repeat([robot.position for robot in robots], n, axis=0)
+    directions = np.tile(np.column_stack((np.cos(angles), np.sin(angles))), (len(robots), 1))
+    return raycast_many(origins, directions, segment_array(world.obstacles), circle_array(robots),
+                        MAX_RANGE, ignore=np.repeat(np.arange(len(robots)), n))
+
+
+def main():
+    print(f"{'robots':>6} {'beams':>5} {'rays':>7} {'scalar ms':>10} {'batched ms':>11} {'speedup':>8} {'max diff':>9}")
+    for n in FLEET_SIZES:
+        world = sensing_world(n, SEED)
+        for beams in BEAMS:
+            angles = np.linspace(0, 2 * math.pi, beams, endpoint=False)
+            rays = n * beams
+
+            start = time.perf_counter()
+            fast = batched(world, angles)
+            t_batched = time.perf_counter() - start
+
+            if rays * (OBSTACLES + n) <= SCALAR_BUDGET:
+                start = time.perf_counter()
+                slow = scalar(world, angles)
+                t_scalar = time.perf_counter() - start
+                print(f"{n:>6} {beams:>5} {rays:>7} {t_scalar * 1000:>10.1f} {t_batched * 1000:>11.1f} "
+                      f"{t_scalar / t_batched:>7.1f}x {np.abs(slow - fast).max():>9.1e}")
+            else:
+                print(f"{n:>6} {beams:>5} {rays:>7} {'-':>10} {t_batched * 1000:>11.1f} {'-':>8} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
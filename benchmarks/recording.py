@@ -0,0 +1,83 @@
+# benchmarks/recording.py
+"""
+Per-tick cost of trajectory recording next to the tick it records.
+
+Each fleet runs TICKS bare Engine steps towards its targets from the same
+start positions, best of REPEATS. Recorder.capture is timed on its own over
+the same number of frames (chunk growth included), since the difference of
+two noisy tick loops hides a cost of a few microseconds. Also reports the
+compressed file size and how long saving and reopening it for replay take.
+
+Run from the repository root:
+    python -m benchmarks.recording
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.scenarios import Scenario
+from simulation.engine import Engine
+from simulation.recording import Recorder, Replay
+
+SCENARIOS = [Scenario(100, 10), Scenario(100, 100), Scenario(400, 400)]
+TICKS = 300
+REPEATS = 5
+DT = 1.0 / 60
+
+
+def run_ticks(engine, start):
+    """Wall time of TICKS steps from start positions."""
+    world = engine.world
+    world.fleet.pos[:world.fleet.size] = start
+    for robot in world.robots:
+        robot.set_path([robot.target])
+    engine.running = True
+
+    began = time.perf_counter()
+    for _ in range(TICKS):
+        engine.step(DT)
+    return time.perf_counter() - began
+
+
+def run_captures(recorder, world):
+    """Wall time of TICKS captures into a fresh recording."""
+    recorder.reset(world)
+    began = time.perf_counter()
+    for tick in range(TICKS):
+        recorder.capture(tick * DT, world.fleet)
+    return time.perf_counter() - began
+
+
+def main():
+    print(f"{'scenario':<16} {'bare ms/tick':>12} {'capture us':>11} {'overhead':>9} "
+          f"{'file KB':>8} {'save ms':>8} {'open ms':>8}")
+    for scenario in SCENARIOS:
+        world = scenario.build()
+        start = world.sync_fleet().pos[:world.fleet.size].copy()
+
+        # Warm-up run (indices, first-call allocations), recorded for the file columns
+        recorder = Recorder()
+        engine = Engine(world, recorder=recorder)
+        recorder.reset(world)
+        run_ticks(engine, start)
+
+        path = os.path.join(tempfile.mkdtemp(), "run.npz")
+        began = time.perf_counter()
+        recorder.save(path)
+        saved = time.perf_counter() - began
+        began = time.perf_counter()
+        Replay(path)
+        opened = time.perf_counter() - began
+
+        engine.recorder = None
+        bare = min(run_ticks(engine, start) for _ in range(REPEATS))
+        captures = min(run_captures(recorder, world) for _ in range(REPEATS))
+
+        print(f"{scenario.name:<16} {bare * 1000 / TICKS:>12.3f} {captures * 1e6 / TICKS:>11.1f} "
+              f"{captures / bare:>8.1%} {os.path.getsize(path) / 1024:>8.0f} "
+              f"{saved * 1000:>8.1f} {opened * 1000:>8.1f}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
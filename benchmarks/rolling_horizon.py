@@ -0,0 +1,59 @@
+# benchmarks/rolling_horizon.py
+"""
+Rolling-horizon ECBS: planning time per replan versus window size.
+
+Uses the same crossing scenario as benchmarks/planner.py and runs each
+fleet until every robot rests on its goal (or MAX_TICKS), replanning every
+window / 2 ticks. The one-shot ECBS plan of the whole horizon is shown for
+comparison.
+
+Run from the repository root:
+    python -m benchmarks.rolling_horizon
+"""
+import time
+
+from benchmarks.planner import CELL_SIZE, SEED, fleet_world
+from core.grid import Grid
+from core.planner import Planner, RollingHorizonPlanner
+
+FLEET_SIZES = [50, 200]
+WINDOWS = [4, 8, 16]
+MAX_TICKS = 1000
+
+
+def run_windowed(num_robots, window):
+    world = fleet_world(num_robots, SEED)
+    grid = Grid(world.width, world.height, CELL_SIZE)
+    rolling = RollingHorizonPlanner(Planner("ecbs"), window=window, replan_every=max(1, window // 2))
+
+    planning = worst = 0.0
+    for _ in range(MAX_TICKS):
+        start = time.perf_counter()
+        rolling.step(world, grid)
+        elapsed = time.perf_counter() - start
+        planning += elapsed
+        worst = max(worst, elapsed)
+        if rolling.finished:
+            break
+    return rolling, planning, worst
+
+
+def main():
+    print(f"{'robots':>6} {'window':>6} {'replans':>7} {'ms/replan':>10} {'worst ms':>9} {'ticks':>6}")
+    for n in FLEET_SIZES:
+        for window in WINDOWS:
+            rolling, planning, worst = run_windowed(n, window)
+            ticks = rolling.tick if rolling.finished else f">{MAX_TICKS}"
+            print(f"{n:>6} {window:>6} {rolling.replans:>7} "
+                  f"{planning / rolling.replans * 1000:>10.1f} {worst * 1000:>9.1f} {ticks:>6}")
+
+        world = fleet_world(n, SEED)
+        start = time.perf_counter()
+        plan = Planner("ecbs").plan(world, Grid(world.width, world.height, CELL_SIZE))
+        elapsed = time.perf_counter() - start
+        makespan = plan.makespan if plan.success else "-"
+        print(f"{n:>6} {'full':>6} {1:>7} {elapsed * 1000:>10.1f} {elapsed * 1000:>9.1f} {makespan:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/scenarios.py
+"""
+Seeded scenario generator for the benchmark suite.
+
+A Scenario is a recipe: the same (obstacles, robots, seed, size) always
+builds the same World, with random segments, non-overlapping robots clear
+of the obstacles and a random free target for each robot. The world size
+defaults to the constants in core/constants.py.
+"""
+import math
+import random
+
+from core.constants import WORLD_WIDTH, WORLD_HEIGHT
+from core.robot import Robot
+from core.world import World
+
+ROBOT_RADIUS = 1.0
+CLEARANCE = 0.5
+MAX_ATTEMPTS = 100000
+
+
+class Scenario:
+    def __init__(self, obstacles, robots, seed=1, min_length=2.0, max_length=10.0,
+                 width=WORLD_WIDTH, height=WORLD_HEIGHT):
+        self.obstacles = obstacles
+        self.robots = robots
+        self.seed = seed
+        self.min_length = min_length
+        self.max_length = max_length
+        self.width = width
+        self.height = height
+
+    @property
+    def name(self):
+        name = f"o{self.obstacles}-r{self.robots}-s{self.seed}"
+        if (self.width, self.height) != (WORLD_WIDTH, WORLD_HEIGHT):
+            name += f"-{self.width:g}x{self.height:g}"
+        return name
+
+    def to_dict(self):
+        return {"obstacles": self.obstacles, "robots": self.robots, "seed": self.seed,
+                "width": self.width, "height": self.height}
+
+    def build(self):
+        rng = random.Random(self.seed)
+        world = World(num_robots=0, width=self.width, height=self.height)
+
+        for _ in range(self.obstacles):
+            x = rng.uniform(0, self.width)
+            y = rng.uniform(0, self.height)
+            a = rng.uniform(0, math.pi)
+            l = rng.uniform(self.min_length, self.max_length)
+            world.add_obstacle((x, y), (x + l * math.cos(a), y + l * math.sin(a)))
+
+        for i in range(self.robots):
+            position = self._free_point(rng, world, avoid_robots=True)
+            robot = Robot(i, position, radius=ROBOT_RADIUS)
+            robot.target = self._free_point(rng, world, avoid_robots=False)
+            world.robots.append(robot)
+            world.move_robot(robot, *position)
+        world.update_robot_index()
+        return world
+
+    @staticmethod
+    def _free_point(rng, world, avoid_robots):
+        r = ROBOT_RADIUS
+        for _ in range(MAX_ATTEMPTS):
+            x = rng.uniform(r, world.width - r)
+            y = rng.uniform(r, world.height - r)
+            obs, _ = world.obstacle_index.nearest(x, y, r + CLEARANCE)
+            if obs is not None:
+                continue
+            if avoid_robots and any(
+                math.hypot(x - o.x, y - o.y) < r + o.radius + CLEARANCE
+                for o in world.robots_near(x, y, r + CLEARANCE)
+            ):
+                continue
+            return (x, y)
+        raise RuntimeError("Failed to place robot; scenario too crowded.")
@@ -0,0 +1,325 @@
+# benchmarks/suite.py
+"""
+Hot-path benchmark suite with regression checks.
+
+Times each case on every seeded scenario (see benchmarks/scenarios.py),
+writes the results as JSON and compares them against a stored baseline.
+A case regresses when its best time per call exceeds the baseline's by more
+than the threshold; the run then exits with status 1. Best-of-N is used
+because it is far less noisy than the median for millisecond cases. On the
+machine (and Python/NumPy) the baseline was taken on, raw times are
+compared; elsewhere times are scaled by a fixed calibration workload, the
+median of several timings of it, so a slower machine doesn't read as a
+regression.
+
+On a shared machine a burst of load can slow a whole run, and the best
+times of single runs here spread by up to 1.7x (--noise measures it). The
+best over three runs stayed within 1.2x, so a case that looks regressed is
+re-timed up to CONFIRM_RUNS more times and only counts if it stays slow.
+
+Run from the repository root:
+    python -m benchmarks.suite                     # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --quick --out r.json
+    python -m benchmarks.suite --update-baseline   # store this run as the baseline
+    python -m benchmarks.suite --noise 5           # run-to-run spread per case
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.scenarios import Scenario
+from core.controller import Controller
+from simulation.sensors import circle_array, raycast_many, segment_array
+
+SCENARIOS = [Scenario(20, 10), Scenario(100, 50), Scenario(400, 200),
+             # Four times the area: bigger grids, HPA* clusters across the map
+             Scenario(400, 100, width=256.0, height=256.0)]
+QUICK_SCENARIOS = SCENARIOS[:2]
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+THRESHOLD = 0.3  # allowed slowdown of the best time, as a fraction
+REPEATS = 11
+CONFIRM_RUNS = 2  # re-timings of an apparent regression before it counts
+CALIBRATION_RUNS = 5  # calibrate() takes the median of this many timings
+MIN_SAMPLE = 0.02  # seconds; fast cases loop until one sample takes this long
+PLAN_SAMPLE = 10  # robots planned per plan_path repetition
+BEAMS = 36
+DT = 1.0 / 60
+
+
+# --- Cases: setup(world) -> function to time ---
+def occupancy_grid(world):
+    controller = Controller()
+    return lambda: controller.build_occupancy_grid(world, 1.0)
+
+
+def plan_path(world):
+    # No path cache: the warm-up call would fill it and every timed call be a hit
+    controller = Controller(path_cache_size=0)
+    controller.get_occupancy_grid(world, 1.0)  # time the search, not the build
+    robots = world.robots[:PLAN_SAMPLE]
+    return lambda: [controller.plan_path(robot, world, robot.target) for robot in robots]
+
+
+def plan_path_hpa(world):
+    # The abstract graph is built in the warm-up call; only searches are timed
+    controller = Controller(path_cache_size=0, hierarchical=True)
+    controller.get_occupancy_grid(world, 1.0)
+    robots = world.robots[:PLAN_SAMPLE]
+    return lambda: [controller.plan_path(robot, world, robot.target) for robot in robots]
+
+
+def update_tick(world):
+    controller = Controller()
+    for robot in world.robots:
+        robot.set_path([robot.target])
+
+    fleet = world.sync_fleet()
+    start = fleet.pos[:fleet.size].copy()
+
+    def tick():
+        # Same starting state every call, so repetitions time the same work
+        fleet.pos[:fleet.size] = start
+        world.update_robot_index()
+        controller.update_all(world, DT)
+    return tick
+
+
+def raycast(world):
+    angles = np.linspace(0, 2 * math.pi, BEAMS, endpoint=False)
+    directions = np.tile(np.column_stack((np.cos(angles), np.sin(angles))), (len(world.robots), 1))
+    ignore = np.repeat(np.arange(len(world.robots)), BEAMS)
+
+    def cast():
+        origins = np.repeat([robot.position for robot in world.robots], BEAMS, axis=0)
+        return raycast_many(origins, directions, segment_array(world.obstacles),
+                            circle_array(world.robots), 20.0, ignore=ignore)
+    return cast
+
+
+def render_frame(world):
+    # Only this case needs pygame; off-screen so no window opens
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from core.constants import WINDOW_WIDTH, WINDOW_HEIGHT
+    from gui.renderer import Renderer
+
+    renderer = Renderer(pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)))
+    return lambda: renderer.draw_world(world)
+
+
+CASES = {
+    "occupancy_grid": occupancy_grid,
+    "plan_path": plan_path,
+    "plan_path_hpa": plan_path_hpa,
+    "update_tick": update_tick,
+    "raycast": raycast,
+    "render_frame": render_frame,
+}
+
+
+# --- Running ---
+def prepare(fn):
+    """Warm fn up (caches, imports, first-call allocations); returns calls per sample, like timeit."""
+    start = time.perf_counter()
+    fn()
+    return max(1, int(MIN_SAMPLE / max(time.perf_counter() - start, 1e-9)))
+
+
+def sample(fn, number):
+    """Time per call in ms over one sample of number calls, garbage collection off like timeit."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return (time.perf_counter() - start) * 1000 / number
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def summary(times, number):
+    return {"min_ms": min(times), "median_ms": statistics.median(times),
+            "repeats": len(times), "number": number}
+
+
+def measure(fn, repeats):
+    """Per-call times over `repeats` samples of `number` calls each."""
+    number = prepare(fn)
+    return summary([sample(fn, number) for _ in range(repeats)], number)
+
+
+def calibrate(repeats, runs=CALIBRATION_RUNS):
+    """
+    Median over runs of the best time of a fixed mixed Python/NumPy
+    workload, the unit of comparison across machines. One best time alone
+    varies by about 25% here.
+    """
+    values = np.arange(20000, dtype=float)
+
+    def work():
+        total = 0.0
+        for i in range(20000):
+            total += i * 0.5
+        return total + float(np.sqrt(values).sum())
+    return statistics.median(measure(work, repeats)["min_ms"] for _ in range(runs))
+
+
+def run(scenarios, cases, repeats):
+    """
+    Samples are taken round-robin over all cases rather than case by case,
+    so a burst of load on the machine costs each case at most a sample or
+    two instead of every sample of whichever case it hits.
+    """
+    timed = {}
+    for scenario in scenarios:
+        for case in cases:
+            # Fresh world per case so one case's moves don't leak into the next
+            fn = CASES[case](scenario.build())
+            timed[f"{scenario.name}/{case}"] = (fn, prepare(fn), [], scenario, case)
+    for _ in range(repeats):
+        for fn, number, times, _, _ in timed.values():
+            times.append(sample(fn, number))
+
+    results = {}
+    for key, (_, number, times, scenario, case) in timed.items():
+        results[key] = dict(summary(times, number), scenario=scenario.to_dict(), case=case)
+        print(f"{key:<40} {results[key]['min_ms']:>10.3f} ms")
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "calibration_ms": calibrate(repeats),
+        },
+        "results": results,
+    }
+
+
+def retime(current, keys, repeats):
+    """Time the cases under keys again on fresh worlds, keeping each case's best time."""
+    for key in keys:
+        result = current["results"][key]
+        fn = CASES[result["case"]](Scenario(**result["scenario"]).build())
+        result["min_ms"] = min(result["min_ms"], measure(fn, repeats)["min_ms"])
+        result["retimed"] = result.get("retimed", 0) + 1
+
+
+def noise(runs):
+    """
+    Largest ratio between the slowest and fastest best time of each case
+    over several runs: the spread THRESHOLD has to stay clear of.
+    """
+    spread = {}
+    for key, result in runs[0]["results"].items():
+        best = [run["results"][key]["min_ms"] for run in runs]
+        spread[key] = max(best) / min(best)
+    print(f"\n{'case':<40} {'spread':>6}  over {len(runs)} runs")
+    for key, ratio in spread.items():
+        print(f"{key:<40} {ratio:>6.2f}")
+    worst = max(spread, key=spread.get)
+    print(f"\nWorst: {worst} at {spread[worst]:.2f}")
+    return spread
+
+
+def same_machine(current, baseline):
+    keys = ("python", "numpy", "machine")
+    return all(current["meta"].get(k) == baseline["meta"].get(k) for k in keys)
+
+
+def compare(current, baseline, threshold, keys=None):
+    """
+    Keys (of keys, default all) whose best time slowed down by more than
+    threshold, with the ratio. Raw times on the baseline's machine,
+    calibrated ones elsewhere.
+    """
+    regressions = {}
+    if same_machine(current, baseline):
+        speed = 1.0
+        print("\nSame machine as the baseline: comparing raw times")
+    else:
+        speed = baseline["meta"]["calibration_ms"] / current["meta"]["calibration_ms"]
+        print(f"\nThis machine runs the calibration {speed:.2f}x as fast as the baseline's")
+    print(f"{'case':<40} {'baseline':>10} {'current':>10} {'ratio':>6}")
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None or (keys is not None and key not in keys):
+            continue
+        ratio = result["min_ms"] * speed / base["min_ms"]
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{key:<40} {base['min_ms']:>10.3f} {result['min_ms']:>10.3f} {ratio:>6.2f}{flag}")
+        if flag:
+            regressions[key] = ratio
+    return regressions
+
+
+def write(results, path):
+    if path:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="small scenarios only")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated case names")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--confirm-runs", type=int, default=CONFIRM_RUNS)
+    parser.add_argument("--update-baseline", action="store_true", help="store results as the baseline")
+    parser.add_argument("--noise", type=int, metavar="RUNS",
+                        help="run RUNS times and report each case's spread instead of comparing")
+    args = parser.parse_args()
+
+    cases = [c for c in args.cases.split(",") if c]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    scenarios = QUICK_SCENARIOS if args.quick else SCENARIOS
+    if args.noise:
+        noise([run(scenarios, cases, args.repeats) for _ in range(args.noise)])
+        return
+
+    current = run(scenarios, cases, args.repeats)
+
+    if args.update_baseline:
+        write(current, args.out)
+        write(current, args.baseline)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        write(current, args.out)
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    for _ in range(args.confirm_runs):
+        if not regressions:
+            break
+        print(f"\nRe-timing {len(regressions)} case(s) in case a burst of load slowed them")
+        retime(current, regressions, args.repeats)
+        regressions = compare(current, baseline, args.threshold, keys=regressions)
+    write(current, args.out)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,44 @@ WORLD_HEIGHT = 128.0
 
 FPS = 60
 
-import pygame
-pygame.init()
-info = pygame.display.Info()
 SCREEN_USAGE = 1
 
-SCALE_X = (info.current_w * SCREEN_USAGE) / WORLD_WIDTH
-SCALE_Y = (info.current_h * SCREEN_USAGE) / WORLD_HEIGHT
-SCALE = int(min(SCALE_X, SCALE_Y))
+# Screen-dependent values, computed by display_metrics() the first time one
+# of them is imported, so only the GUI pays for pygame and a display. The
+# window is sized for the default world; world_scale() fits any other world
+# size into it
+DISPLAY_NAMES = ("SCALE_X", "SCALE_Y", "SCALE", "WINDOW_WIDTH", "WINDOW_HEIGHT")
+
+
+def display_metrics():
+    import pygame
+    pygame.init()
+    info = pygame.display.Info()
+
+    scale_x = (info.current_w * SCREEN_USAGE) / WORLD_WIDTH
+    scale_y = (info.current_h * SCREEN_USAGE) / WORLD_HEIGHT
+    scale = int(min(scale_x, scale_y))
+    return {
+        "SCALE_X": scale_x,
+        "SCALE_Y": scale_y,
+        "SCALE": scale,
+        "WINDOW_WIDTH": int(WORLD_WIDTH * scale),
+        "WINDOW_HEIGHT": int(WORLD_HEIGHT * scale),
+    }
+
+
+def world_scale(width, height):
+    """Pixels per world unit that fit a width x height world into the window."""
+    import core.constants as c  # through the module, so display_metrics() runs if needed
+    return min(c.WINDOW_WIDTH / width, c.WINDOW_HEIGHT / height)
+
+
+def __getattr__(name):
+    if name in DISPLAY_NAMES:
+        globals().update(display_metrics())
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-WINDOW_WIDTH = int(WORLD_WIDTH * SCALE)
-WINDOW_HEIGHT = int(WORLD_HEIGHT * SCALE)
 
 # Colors (RGB)
 WHITE = (255, 255, 255)
@@ -1,263 +1,615 @@
 # core/controller.py
 import math
 import heapq
-from core.geometry import LineSegment, Rectangle
-from core.constants import WORLD_WIDTH, WORLD_HEIGHT
+from collections import OrderedDict
+import numpy as np
+from core.geometry import (LineSegment, Rectangle, circle_circle_toi, circle_rectangle_toi,
+                           circle_segment_toi, point_to_segment_distance,
+                           segment_to_rectangle_distance, segment_to_segment_distance)
+from core.fleet import close_pairs, segment_distances, segment_tois
+from core.hierarchy import AbstractGraph
+from core.profiler import PROFILER
+from core.quadtree import OccupancyGrid
+
+
+# Clearance kept beyond the robot radius when smoothing cuts a corner
+LOS_MARGIN = 0.05
+# Distance a blocked robot stops short of first contact
+CONTACT_GAP = 1e-6
+# Substeps per update_all tick at most; faster robots are swept, see update_all
+MAX_SUBSTEPS = 64
 
 
 class Controller:
-    def __init__(self, base_grid=8.0, min_grid=1.0):
+    def __init__(self, base_grid=8.0, min_grid=1.0, any_angle=False, path_cache_size=1024,
+                 hierarchical=False, cluster_size=32.0):
         """
         base_grid: maximum size for a cell (coarse resolution)
         min_grid: minimum size for a cell (fine resolution near obstacles)
+        any_angle: string-pull planned paths (see smooth_path)
+        path_cache_size: A* results kept for reuse (see cached_astar), 0 to disable
+        hierarchical: search over an AbstractGraph of clusters (HPA*, see core/hierarchy.py)
+        cluster_size: largest cluster side for hierarchical search, at least base_grid
         """
         self.base_grid = base_grid
         self.min_grid = min_grid
+        self.any_angle = any_angle
+        self.hierarchical = hierarchical
+        self.cluster_size = max(cluster_size, base_grid)
+
+        # (obstacle version, radius, base_grid, min_grid) -> OccupancyGrid
+        self._grid_cache = {}
+
+        # LRU of A* cell paths: (start cell, goal cell, radius, version) -> cells
+        self.path_cache_size = path_cache_size
+        self.path_cache_hits = 0
+        self.path_cache_suffix_hits = 0
+        self.path_cache_misses = 0
+        self.clear_path_cache()
 
     # --- Distance from point to segment ---
-    @staticmethod
-    def point_to_segment_distance(px, py, p1, p2):
-        x1, y1 = p1
-        x2, y2 = p2
-        dx = x2 - x1
-        dy = y2 - y1
-        if dx == 0 and dy == 0:
-            return math.hypot(px - x1, py - y1)
-        t = ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)
-        t = max(0, min(1, t))
-        nearest_x = x1 + t * dx
-        nearest_y = y1 + t * dy
-        return math.hypot(px - nearest_x, py - nearest_y)
+    point_to_segment_distance = staticmethod(point_to_segment_distance)
 
     # --- Adaptive occupancy grid ---
     def build_occupancy_grid(self, world, robot_radius):
         """
-        Returns a list of tuples:
-        (x0, y0, w, h, is_free)
+        Returns an OccupancyGrid: a quadtree whose leaves iterate as
+        (x0, y0, w, h, is_free) tuples, with a precomputed neighbor graph.
         """
-        grid_cells = []
-
-        def subdivide(x0, y0, w, h):
-            mid_x, mid_y = x0 + w / 2, y0 + h / 2
-            near_obs = False
-
-            # 1. Broad phase: Check if any obstacle is within the cell's bounding box (expanded by radius)
-            cell_aabb = (
-                x0 - robot_radius, 
-                y0 - robot_radius, 
-                w + 2 * robot_radius, 
-                h + 2 * robot_radius
+        with PROFILER.scope("grid build"):
+            return OccupancyGrid(
+                world, robot_radius, self.base_grid, self.min_grid,
+                world.width, world.height
             )
 
-            for obs in world.obstacles:
-                if isinstance(obs, Rectangle):
-                    if (obs.x < cell_aabb[0] + cell_aabb[2] and obs.x + obs.w > cell_aabb[0] and
-                        obs.y < cell_aabb[1] + cell_aabb[3] and obs.y + obs.h > cell_aabb[1]):
-                        near_obs = True
-                        break
-                elif isinstance(obs, LineSegment):
-                    # Distance from center to segment
-                    dist = self.point_to_segment_distance(mid_x, mid_y, obs.p1, obs.p2)
-                    # Conservative check: if distance < radius + half_diagonal, it might intersect
-                    half_diag = math.hypot(w, h) / 2
-                    if dist < robot_radius + half_diag:
-                        near_obs = True
-                        break
-
-            # 2. Decision to subdivide or stop
-            should_subdivide = False
-            
-            if near_obs:
-                # If near obstacle, subdivide unless we reached min resolution
-                if w > self.min_grid:
-                    should_subdivide = True
-            else:
-                # If free, subdivide unless we are small enough (base_grid)
-                if w > self.base_grid:
-                    should_subdivide = True
-
-            if not should_subdivide:
-                # Leaf node
-                # If near_obs is True here, it means we hit min_grid, so it's occupied.
-                is_free = not near_obs
-                grid_cells.append((x0, y0, w, h, is_free))
-                return
-
-            # Subdivide into 4
-            hw, hh = w / 2, h / 2
-            subdivide(x0, y0, hw, hh)
-            subdivide(x0 + hw, y0, hw, hh)
-            subdivide(x0, y0 + hh, hw, hh)
-            subdivide(x0 + hw, y0 + hh, hw, hh)
-
-        # Start with the full world dimensions
-        subdivide(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
-        return grid_cells
+    def get_occupancy_grid(self, world, robot_radius):
+        """
+        Cached build_occupancy_grid: robots with the same radius share one
+        grid until the world's obstacles change. A grid built for an older
+        obstacle set is patched incrementally when the change journal allows.
+        """
+        key = (world.obstacle_version, robot_radius, self.base_grid, self.min_grid)
+        grid = self._grid_cache.get(key)
+        if grid is not None:
+            return grid
+
+        stale = {}
+        for k, g in self._grid_cache.items():
+            if k[0] == key[0]:
+                stale[k] = g
+            elif grid is None and k[1:] == key[1:] and g.world is world and g.sync():
+                grid = g
+        # Anything else built for an older obstacle set is dropped
+        self._grid_cache = stale
+
+        if grid is None:
+            grid = self.build_occupancy_grid(world, robot_radius)
+        self._grid_cache[key] = grid
+        return grid
 
     # --- Helper to find cell index ---
     def get_cell_index(self, x, y, grid_cells):
-        best_idx = -1
-        min_dist = float('inf')
-        
-        for i, (cx, cy, w, h, is_free) in enumerate(grid_cells):
-            if not is_free:
-                continue
-            # Check if point is strictly inside
-            if cx <= x <= cx + w and cy <= y <= cy + h:
-                return i
-            
-            # Fallback: find nearest center
-            center_x, center_y = cx + w / 2, cy + h / 2
-            d = math.hypot(center_x - x, center_y - y)
-            if d < min_dist:
-                min_dist = d
-                best_idx = i
-                
-        return best_idx
+        """
+        Free cell containing (x, y) by quadtree descent, falling back to the
+        free cell with the nearest center when the point is in an occupied one.
+        """
+        i = grid_cells.locate(x, y)
+        cx, cy, w, h, is_free = grid_cells[i]
+        # Descent clamps points outside the world onto a border leaf
+        if is_free and cx <= x <= cx + w and cy <= y <= cy + h:
+            return i
+        return grid_cells.nearest_free(x, y)
 
     # --- A* path planning over adaptive grid ---
     def plan_path(self, robot, world, target):
-        grid_cells = self.build_occupancy_grid(world, robot.radius)
-        
-        start_idx = self.get_cell_index(robot.x, robot.y, grid_cells)
+        grid_cells = self.get_occupancy_grid(world, robot.radius)
+        path = self.search_path(grid_cells, (robot.x, robot.y), target)
+        if self.any_angle:
+            path = self.smooth_path(world, robot.radius, path, robot.position)
+        return path
+
+    def search_path(self, grid_cells, start, target):
+        """A* from start to target over an already built OccupancyGrid."""
+        start_idx = self.get_cell_index(start[0], start[1], grid_cells)
         end_idx = self.get_cell_index(target[0], target[1], grid_cells)
 
         if start_idx == -1 or end_idx == -1:
             return None
 
-        # A* Initialization
-        # Node state is the index in grid_cells
-        start_cell = grid_cells[start_idx]
-        start_center = (start_cell[0] + start_cell[2]/2, start_cell[1] + start_cell[3]/2)
-        
-        end_cell = grid_cells[end_idx]
-        end_center = (end_cell[0] + end_cell[2]/2, end_cell[1] + end_cell[3]/2)
-
-        # Priority Queue: (f_score, cell_index, path_points)
-        open_set = []
-        heapq.heappush(open_set, (0, start_idx, [start_center]))
-        
+        cells = self.cached_astar(grid_cells, start_idx, end_idx)
+        return self.cells_to_path(grid_cells, cells, target)
+
+    @staticmethod
+    def cells_to_path(grid_cells, cells, target):
+        """Waypoints for a cell path (cell centers, then target), or None for no path."""
+        if cells is None:
+            return None
+        return [grid_cells.center(i) for i in cells] + [target]
+
+    # --- LRU path cache ---
+    def clear_path_cache(self):
+        self._path_cache = OrderedDict()
+        # Every (cell, goal cell, radius, version) on a cached path -> (owner key, position)
+        self._path_suffixes = {}
+        self._path_cache_grid = None
+
+    def path_cache_info(self):
+        return {
+            "hits": self.path_cache_hits,
+            "suffix_hits": self.path_cache_suffix_hits,
+            "misses": self.path_cache_misses,
+            "size": len(self._path_cache),
+            "maxsize": self.path_cache_size,
+        }
+
+    def cached_astar(self, grid_cells, start_idx, end_idx):
+        """
+        search_cells() through the LRU path cache. A query is also answered
+        when its start cell lies on a cached path to the same goal: the rest
+        of a shortest path is a shortest path too (and the rest of an HPA*
+        path still a valid one). Everything is dropped once the grid's
+        obstacle version (or resolution) moves on.
+        """
+        found, cells = self.cache_lookup(grid_cells, start_idx, end_idx)
+        if found:
+            return cells
+        cells = self.search_cells(grid_cells, start_idx, end_idx)
+        self.cache_store(grid_cells, start_idx, end_idx, cells)
+        return cells
+
+    def cache_lookup(self, grid_cells, start_idx, end_idx):
+        """
+        The cache half of cached_astar: (True, cells) when the cache answers
+        start -> end (cells None for a cached "no path"), else (False, None).
+        """
+        if not self.path_cache_size:
+            return False, None
+
+        grid_key = (grid_cells.version, grid_cells.base_grid, grid_cells.min_grid)
+        if grid_key != self._path_cache_grid:
+            self.clear_path_cache()
+            self._path_cache_grid = grid_key
+
+        key = (start_idx, end_idx, grid_cells.robot_radius, grid_cells.version)
+        entry = self._path_suffixes.get(key)
+        if entry is not None:
+            owner, position = entry
+            self._path_cache.move_to_end(owner)
+            if position == 0:
+                self.path_cache_hits += 1
+            else:
+                self.path_cache_suffix_hits += 1
+            return True, list(self._path_cache[owner][position:])
+        if key in self._path_cache:
+            # Cached "no path"
+            self._path_cache.move_to_end(key)
+            self.path_cache_hits += 1
+            return True, None
+
+        self.path_cache_misses += 1
+        return False, None
+
+    def cache_store(self, grid_cells, start_idx, end_idx, cells):
+        """Record the search result for start -> end after a cache_lookup miss."""
+        if not self.path_cache_size:
+            return
+        key = (start_idx, end_idx, grid_cells.robot_radius, grid_cells.version)
+        self._path_cache[key] = tuple(cells) if cells is not None else None
+        for position, cell in enumerate(cells or ()):
+            self._path_suffixes.setdefault((cell,) + key[1:], (key, position))
+
+        while len(self._path_cache) > self.path_cache_size:
+            old, old_cells = self._path_cache.popitem(last=False)
+            for cell in old_cells or ():
+                suffix = (cell,) + old[1:]
+                if self._path_suffixes.get(suffix, (None,))[0] == old:
+                    del self._path_suffixes[suffix]
+
+    def search_cells(self, grid_cells, start_idx, end_idx):
+        """Cell path from start to end: A*, or HPA* over the abstract graph when hierarchical."""
+        if self.hierarchical:
+            return self.abstract_graph(grid_cells).search(start_idx, end_idx)
+        return self.astar(grid_cells, start_idx, end_idx)
+
+    def abstract_graph(self, grid_cells):
+        """
+        The grid's AbstractGraph for this cluster size, stored on the grid
+        and rebuilt once the grid's obstacle version moves on.
+        """
+        graph = grid_cells.abstract_graphs.get(self.cluster_size)
+        if graph is None or graph.version != grid_cells.version:
+            graph = AbstractGraph(grid_cells, self.cluster_size)
+            grid_cells.abstract_graphs[self.cluster_size] = graph
+        return graph
+
+    @staticmethod
+    def astar(grid_cells, start_idx, end_idx, allowed=None):
+        """
+        A* over the precomputed neighbor graph, node state is the cell index.
+        Returns the list of cell indices from start to end, or None.
+        allowed: optional set of cell indices the search may enter.
+        """
+        end_center = grid_cells.center(end_idx)
+
+        # Priority Queue: (f_score, cell_index)
+        open_set = [(0, start_idx)]
         g_score = {start_idx: 0}
+        came_from = {}
         visited = set()
 
         while open_set:
-            _, current_idx, path = heapq.heappop(open_set)
-            
+            _, current_idx = heapq.heappop(open_set)
+
             if current_idx in visited:
                 continue
             visited.add(current_idx)
 
             if current_idx == end_idx:
-                # Path found
-                return path + [target]
-
-            current_cell = grid_cells[current_idx]
-            cx, cy = current_cell[0] + current_cell[2]/2, current_cell[1] + current_cell[3]/2
-            cw, ch = current_cell[2], current_cell[3]
-
-            # Find neighbors
-            for i, cell in enumerate(grid_cells):
-                if i == current_idx or not cell[4]: # Skip self or occupied
+                # Path found: walk back through came_from
+                cells = [current_idx]
+                while current_idx != start_idx:
+                    current_idx = came_from[current_idx]
+                    cells.append(current_idx)
+                cells.reverse()
+                return cells
+
+            current_g = g_score[current_idx]
+            for i, dist in grid_cells.neighbors[current_idx].items():
+                if i in visited or (allowed is not None and i not in allowed):
                     continue
-                if i in visited:
-                    continue
-
-                nx, ny = cell[0] + cell[2]/2, cell[1] + cell[3]/2
-                nw, nh = cell[2], cell[3]
-
-                # Optimization: Bounding box check for adjacency
-                # If centers are too far, they can't be neighbors
-                if abs(nx - cx) > (cw + nw) / 2 + 0.1: continue
-                if abs(ny - cy) > (ch + nh) / 2 + 0.1: continue
-
-                # Geometric Adjacency Check (Touching edges)
-                dx = abs(nx - cx)
-                dy = abs(ny - cy)
-                sum_w = (cw + nw) / 2
-                sum_h = (ch + nh) / 2
-                EPS = 0.1
-
-                # Touching in X (vertical edge shared)
-                touch_x = (abs(dx - sum_w) < EPS) and (dy < sum_h - EPS)
-                # Touching in Y (horizontal edge shared)
-                touch_y = (abs(dy - sum_h) < EPS) and (dx < sum_w - EPS)
-                # Touching Corner (Diagonal)
-                touch_diag = (abs(dx - sum_w) < EPS) and (abs(dy - sum_h) < EPS)
-
-                if touch_x or touch_y or touch_diag:
-                    dist = math.hypot(nx - cx, ny - cy)
-                    new_g = g_score[current_idx] + dist
-                    
-                    if i not in g_score or new_g < g_score[i]:
-                        g_score[i] = new_g
-                        h = math.hypot(end_center[0] - nx, end_center[1] - ny)
-                        heapq.heappush(open_set, (new_g + h, i, path + [(nx, ny)]))
+                new_g = current_g + dist
+                if i not in g_score or new_g < g_score[i]:
+                    g_score[i] = new_g
+                    came_from[i] = current_idx
+                    nx, ny = grid_cells.center(i)
+                    h = math.hypot(end_center[0] - nx, end_center[1] - ny)
+                    heapq.heappush(open_set, (new_g + h, i))
 
         # Fallback
         return None
 
-    # --- Move robot along path safely ---
-    def update(self, robot, dt, world):
-        if not robot.path or robot.path_index >= len(robot.path):
-            return
+    # --- Shared cost-to-go field towards a region ---
+    def cost_to_go(self, world, robot_radius, region):
+        """
+        Backward Dijkstra field from `region` over the occupancy graph,
+        shared by every robot of this radius heading there. Stored on the
+        grid and recomputed once the grid's obstacle version moves on.
+        """
+        grid_cells = self.get_occupancy_grid(world, robot_radius)
+        key = (region.x, region.y, region.w, region.h)
+        field = grid_cells.cost_fields.get(key)
+        if field is None or field.version != grid_cells.version:
+            field = CostField(grid_cells, region)
+            grid_cells.cost_fields[key] = field
+        return field
+
+    def plan_path_to_region(self, robot, world, region, target=None):
+        """
+        Path into `region` by descending the shared cost-to-go field instead
+        of running a fresh A* per robot. With a target, the last leg runs a
+        small A* restricted to the cells inside the region.
+        """
+        grid_cells = self.get_occupancy_grid(world, robot.radius)
+        field = self.cost_to_go(world, robot.radius, region)
+        path = self.descend_path(grid_cells, field, (robot.x, robot.y), target)
+        if self.any_angle:
+            path = self.smooth_path(world, robot.radius, path, robot.position)
+        return path
+
+    def descend_path(self, grid_cells, field, start, target=None):
+        """plan_path_to_region on an already built grid and cost-to-go field."""
+        current = self.get_cell_index(start[0], start[1], grid_cells)
+        if current not in field.dist:
+            return None
 
-        target = robot.path[robot.path_index]
-        dx = target[0] - robot.x
-        dy = target[1] - robot.y
-        dist = math.hypot(dx, dy)
+        cells = [current]
+        while field.next_hop[current] != -1:
+            current = field.next_hop[current]
+            cells.append(current)
 
-        if dist < 0.2: # Slightly larger tolerance for waypoints
-            robot.path_index += 1
-            if robot.path_index >= len(robot.path):
+        if target is None:
+            return [grid_cells.center(i) for i in cells]
+
+        end_idx = self.get_cell_index(target[0], target[1], grid_cells)
+        if end_idx != current:
+            tail = self.astar(grid_cells, current, end_idx, allowed=field.goal_cells)
+            if tail is None:
+                return self.search_path(grid_cells, start, target)
+            cells += tail[1:]
+        return [grid_cells.center(i) for i in cells] + [target]
+
+    # --- Any-angle smoothing ---
+    @staticmethod
+    def line_of_sight(world, p, q, radius):
+        """
+        True if a robot of `radius` can move straight from p to q without
+        coming within radius (+ LOS_MARGIN) of an obstacle. Only obstacles
+        from the index near the segment's box are tested exactly.
+        """
+        r = radius + LOS_MARGIN
+        nearby = world.obstacle_index.query_aabb(
+            min(p[0], q[0]) - r, min(p[1], q[1]) - r,
+            max(p[0], q[0]) + r, max(p[1], q[1]) + r)
+        for obs in nearby:
+            if isinstance(obs, Rectangle):
+                d = segment_to_rectangle_distance(p, q, obs)
+            else:
+                d = segment_to_segment_distance(p, q, obs.p1, obs.p2)
+            if d < r:
+                return False
+        return True
+
+    def smooth_path(self, world, radius, path, start=None):
+        """
+        String pulling: keep a waypoint only where the straight line from
+        the last kept point to the next waypoint is blocked, so the robot
+        cuts across cells instead of visiting every cell center. start (the
+        robot's position) lets the first waypoints go as well. The last
+        waypoint is always kept.
+        """
+        if not path:
+            return path
+        points = ([tuple(start)] if start is not None else []) + [tuple(p) for p in path]
+        anchor = points[0]
+        kept = [] if start is not None else [anchor]
+        for k in range(1, len(points) - 1):
+            if not self.line_of_sight(world, anchor, points[k + 1], radius):
+                anchor = points[k]
+                kept.append(anchor)
+        kept.append(points[-1])
+        return kept
+
+    # --- Move robot along path safely ---
+    def update(self, robot, dt, world):
+        """
+        Follow the path for the full speed * dt, one straight substep per
+        path leg. Each substep is swept against the obstacles and the other
+        robots (see time_of_impact); a blocked robot stops where it first
+        touches, so thin walls can't be skipped over at any speed.
+        """
+        remaining = robot.speed * dt
+        while remaining > 0:
+            if not robot.path or robot.path_index >= len(robot.path):
                 return
-            
-            # Update target to next waypoint immediately for continuous movement
+
             target = robot.path[robot.path_index]
             dx = target[0] - robot.x
             dy = target[1] - robot.y
             dist = math.hypot(dx, dy)
-
-        # Step-limited movement
-        step = min(robot.speed * dt, 2.0)
-        vx = dx / dist * step
-        vy = dy / dist * step
-        new_x = robot.x + vx
-        new_y = robot.y + vy
-
-        # Clamp to world
-        new_x = max(robot.radius, min(WORLD_WIDTH - robot.radius, new_x))
-        new_y = max(robot.radius, min(WORLD_HEIGHT - robot.radius, new_y))
-
-        # Check collisions
-        collision = False
-        
-        # Robot-robot collision
-        for other in world.robots:
-            if other is robot:
+            if dist < 0.2: # Slightly larger tolerance for waypoints
+                # Continue towards the next waypoint with what is left
+                robot.path_index += 1
                 continue
-            if math.hypot(new_x - other.x, new_y - other.y) < robot.radius + other.radius:
-                # Priority: Lower ID moves, Higher ID waits
-                if robot.id > other.id:
-                    return
-                collision = True
-                break
-        
-        # Static collision (Safety net)
-        if not collision:
-            for obs in world.obstacles:
+
+            step = min(remaining, dist)
+            remaining -= step
+            start = robot.position
+            end = (robot.x + dx / dist * step, robot.y + dy / dist * step)
+
+            # Clamp to world
+            end = (max(robot.radius, min(world.width - robot.radius, end[0])),
+                   max(robot.radius, min(world.height - robot.radius, end[1])))
+
+            t = self.time_of_impact(world, robot, start, end)
+            if t is not None:
+                # Stop at first contact, a hair short of it
+                t = max(0.0, t - CONTACT_GAP / max(math.dist(start, end), CONTACT_GAP))
+                world.move_robot(robot, start[0] + (end[0] - start[0]) * t,
+                                 start[1] + (end[1] - start[1]) * t)
+                return
+            world.move_robot(robot, *end)
+
+    def time_of_impact(self, world, robot, start, end):
+        """
+        Fraction of the straight move start -> end at which robot first
+        touches an obstacle or another (standing) robot, or None if the
+        whole move is clear. The clearance field clears most moves in open
+        space without testing a single obstacle.
+        """
+        r = robot.radius
+        length = math.dist(start, end)
+        hits = []
+
+        # Robot-robot, only against robots in hash buckets along the move
+        mid_x, mid_y = (start[0] + end[0]) / 2, (start[1] + end[1]) / 2
+        for other in world.robots_near(mid_x, mid_y, length / 2 + r):
+            if other is not robot:
+                hits.append(circle_circle_toi(start, end, r + other.radius, other.position))
+
+        # Static obstacles: nothing to test if the whole swept disc is clear
+        field = world.clearance
+        if field is None or field.classify(start[0], start[1], r + length) is not True:
+            nearby = world.obstacle_index.query_aabb(
+                min(start[0], end[0]) - r, min(start[1], end[1]) - r,
+                max(start[0], end[0]) + r, max(start[1], end[1]) + r)
+            if PROFILER.enabled:
+                PROFILER.count("obstacle tests", len(nearby))
+            for obs in nearby:
                 if isinstance(obs, Rectangle):
-                    if (obs.x - robot.radius <= new_x <= obs.x + obs.w + robot.radius and
-                        obs.y - robot.radius <= new_y <= obs.y + obs.h + robot.radius):
-                        collision = True
-                        break
+                    hits.append(circle_rectangle_toi(start, end, r, obs))
                 elif isinstance(obs, LineSegment):
-                    if self.point_to_segment_distance(new_x, new_y, obs.p1, obs.p2) < robot.radius:
-                        collision = True
-                        break
-
-        if not collision:
-            robot.x = new_x
-            robot.y = new_y
-        else:
-            # Simple local avoidance: stop or nudge
-            pass
+                    hits.append(circle_segment_toi(start, end, r, obs.p1, obs.p2))
+
+        hits = [t for t in hits if t is not None]
+        return min(hits) if hits else None
+
+    # --- Move the whole fleet in one vectorized step ---
+    def update_all(self, world, dt):
+        """
+        update() for every robot at once on world's FleetState arrays.
+
+        The tick is split into substeps in which no robot moves further than
+        its own radius, so no two robots can pass through each other between
+        checks; one substep is enough at normal speeds. At most MAX_SUBSTEPS
+        are taken: a robot that would still move further than its radius per
+        substep (a stalled frame at 16x, a zero radius) has its moves swept
+        against the other robots instead, so the guarantee holds for it too.
+        In each substep moves are checked against the other robots' current
+        positions (a blocked robot stays put) and swept against the static
+        obstacles (a robot stops at first contact). Two moves that end up
+        overlapping each other are then resolved by priority: the higher ID
+        waits. A robot blocked in one substep sits out the rest of the tick,
+        and fleet.collided flags it.
+        """
+        fleet = world.sync_fleet()
+        n = fleet.size
+        fleet.collided[:n] = False
+        fleet.vel[:n] = 0.0
+        if n == 0:
+            return fleet.collided[:n]
+
+        radius = fleet.radius[:n]
+        start = fleet.pos[:n].copy()
+        travel = fleet.speed[:n] * dt
+        needed = np.ceil(travel / np.maximum(radius, CONTACT_GAP))
+        substeps = int(max(1, min(MAX_SUBSTEPS, needed.max())))
+        swept = needed > substeps
+        if PROFILER.enabled:
+            PROFILER.count("substeps", substeps)
+
+        # Static obstacles as segments, rectangles by their four sides
+        segments = [(*o.p1, *o.p2) for o in world.obstacles if isinstance(o, LineSegment)]
+        for o in world.obstacles:
+            if isinstance(o, Rectangle):
+                x0, y0, x1, y1 = o.x, o.y, o.x + o.w, o.y + o.h
+                segments += [(x0, y0, x1, y0), (x1, y0, x1, y1), (x1, y1, x0, y1), (x0, y1, x0, y0)]
+        segments = np.array(segments, dtype=float).reshape(-1, 4)
+
+        active = np.ones(n, dtype=bool)
+        for _ in range(substeps):
+            collided = self._substep(world, fleet, travel / substeps, active, segments, swept)
+            fleet.collided[:n] |= collided
+            active &= ~collided
+
+        if dt > 0:
+            fleet.vel[:n] = (fleet.pos[:n] - start) / dt
+        return fleet.collided[:n]
+
+    def _substep(self, world, fleet, step, active, segments, swept):
+        """One substep of update_all for the active rows; returns the rows blocked in it."""
+        n = fleet.size
+        pos = fleet.pos[:n]
+        radius = fleet.radius[:n]
+
+        # Waypoint reached: advance the cursor (only a few rows per tick)
+        dist = np.hypot(*(fleet.waypoint[:n] - pos).T)
+        for row in np.nonzero(active & (dist < 0.2))[0]:
+            fleet.set_path_index(row, fleet.path_index[row] + 1)
+        delta = fleet.waypoint[:n] - pos
+        dist = np.hypot(*delta.T)
+        moving = active & (dist > 0)  # nan for robots without a waypoint
+
+        # Step-limited movement (never past the waypoint), clamped to world
+        step = np.minimum(step, dist)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            new = pos + delta / dist[:, None] * step[:, None]
+        new[:, 0] = np.clip(new[:, 0], radius, world.width - radius)
+        new[:, 1] = np.clip(new[:, 1], radius, world.height - radius)
+        new[~moving] = pos[~moving]
+
+        # Robot-robot collision against where the others stand now
+        reach = 2 * radius.max()
+        i, j = close_pairs(new, pos, reach)
+        if PROFILER.enabled:
+            PROFILER.count("robot pair tests", len(i))
+        hit = (i != j) & moving[i] & (np.hypot(*(new[i] - pos[j]).T) < radius[i] + radius[j])
+        blocked = np.zeros(n, dtype=bool)
+        blocked[i[hit]] = True
+
+        # Moves too long for that check: sweep them against the others,
+        # except those already touching the mover (the end check covers them)
+        for row in np.nonzero(swept & moving & ~blocked)[0]:
+            reach_row = radius + radius[row]
+            d = segment_distances(pos, np.array([[*pos[row], *new[row]]]))[:, 0]
+            touching = np.hypot(*(pos - pos[row]).T) < reach_row
+            touching[row] = True
+            blocked[row] = (d[~touching] < reach_row[~touching]).any()
+
+        # Static collision: sweep the move, exact tests only where the
+        # clearance field can't clear the whole swept disc
+        stopped = np.zeros(n, dtype=bool)
+        rows = np.nonzero(moving & ~blocked)[0]
+        field = world.clearance
+        if len(rows) and field is not None:
+            r = radius[rows]
+            length = np.hypot(*(new[rows] - pos[rows]).T)
+            rows = rows[field.classify_many(pos[rows], r + length) != 1]
+        if len(rows) and len(segments):
+            r = radius[rows]
+            # Only segments whose box reaches the swept box
+            lo = np.minimum(segments[:, :2], segments[:, 2:])
+            hi = np.maximum(segments[:, :2], segments[:, 2:])
+            box_lo = np.minimum(pos[rows], new[rows]) - r[:, None]
+            box_hi = np.maximum(pos[rows], new[rows]) + r[:, None]
+            i, j = np.nonzero((lo[:, 0] <= box_hi[:, 0:1]) & (hi[:, 0] >= box_lo[:, 0:1]) &
+                              (lo[:, 1] <= box_hi[:, 1:2]) & (hi[:, 1] >= box_lo[:, 1:2]))
+            if PROFILER.enabled:
+                PROFILER.count("obstacle tests", len(i))
+            toi = np.full(len(rows), np.inf)
+            np.minimum.at(toi, i, segment_tois(pos[rows[i]], new[rows[i]], r[i], segments[j]))
+            hit = toi <= 1
+            rows, toi = rows[hit], toi[hit]
+            # Stop at first contact, a hair short of it
+            length = np.maximum(np.hypot(*(new[rows] - pos[rows]).T), CONTACT_GAP)
+            toi = np.maximum(toi - CONTACT_GAP / length, 0.0)
+            new[rows] = pos[rows] + (new[rows] - pos[rows]) * toi[:, None]
+            stopped[rows] = True
+
+        # Moves into each other: the higher ID waits, until nothing new overlaps
+        moved = moving & ~blocked
+        final = np.where(moved[:, None], new, pos)
+        while True:
+            i, j = close_pairs(final, final, reach)
+            hit = ((i < j) & (moved[i] | moved[j]) &
+                   (np.hypot(*(final[i] - final[j]).T) < radius[i] + radius[j]))
+            if not hit.any():
+                break
+            i, j = i[hit], j[hit]
+            # Revert the higher-ID mover of each pair (the only mover if just one moved)
+            ids = fleet.ids[:n]
+            higher = np.where(ids[i] > ids[j], i, j)
+            lower = np.where(ids[i] > ids[j], j, i)
+            wait = np.where(moved[higher], higher, lower)
+            moved[wait] = False
+            final[wait] = pos[wait]
+
+        world.move_fleet(np.nonzero(moved)[0], final[moved])
+        return (moving & ~moved) | stopped
+
+
+class CostField:
+    """
+    Distance from every free cell to the nearest goal cell (free cells whose
+    center lies in the region), with next_hop pointing one step downhill.
+    """
+
+    def __init__(self, grid_cells, region):
+        self.version = grid_cells.version
+
+        self.goal_cells = {
+            i for i, cell in enumerate(grid_cells.cells)
+            if cell is not None and cell[4] and region.contains(grid_cells.center(i))
+        }
+        if not self.goal_cells:
+            # Region smaller than its cells: settle for cells overlapping it
+            self.goal_cells = {
+                i for i, cell in enumerate(grid_cells.cells)
+                if cell is not None and cell[4] and
+                cell[0] <= region.x + region.w and cell[0] + cell[2] >= region.x and
+                cell[1] <= region.y + region.h and cell[1] + cell[3] >= region.y
+            }
+
+        self.dist = {}
+        self.next_hop = {}
+        open_set = [(0.0, i, -1) for i in self.goal_cells]
+        heapq.heapify(open_set)
+        while open_set:
+            d, i, hop = heapq.heappop(open_set)
+            if i in self.dist:
+                continue
+            self.dist[i] = d
+            self.next_hop[i] = hop
+            # Costs are symmetric, so forward edges serve the backward search
+            for j, cost in grid_cells.neighbors[i].items():
+                if j not in self.dist:
+                    heapq.heappush(open_set, (d + cost, j, i))
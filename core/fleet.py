@@ -0,0 +1,170 @@
+# core/fleet.py
+import numpy as np
+
+# name -> (per-row shape, dtype, fill value for new rows)
+FIELDS = {
+    "ids": ((), np.int64, -1),
+    "pos": ((2,), float, 0.0),
+    "vel": ((2,), float, 0.0),
+    "radius": ((), float, 0.0),
+    "speed": ((), float, 0.0),
+    "path_index": ((), np.int64, 0),
+    "waypoint": ((2,), float, np.nan),  # path[path_index], nan once the path is done
+    "collided": ((), bool, False),      # move blocked during the last update_all
+}
+
+
+class FleetState:
+    """
+    Struct-of-arrays state of a fleet: row i of each array belongs to
+    robots[i], and Robot attributes like x, vx or path_index read and write
+    that row. Arrays are over-allocated; only the first `size` rows are live.
+    Paths are ragged, so they stay a Python list of waypoint lists.
+    """
+
+    def __init__(self, capacity=16):
+        self.size = 0
+        self.robots = []
+        self.paths = []
+        self.capacity = 0
+        self._grow(max(1, capacity))
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, capacity):
+        for name, (shape, dtype, fill) in FIELDS.items():
+            array = np.full((capacity,) + shape, fill, dtype=dtype)
+            if self.capacity:
+                array[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def _append(self, robot, path):
+        if self.size == self.capacity:
+            self._grow(2 * self.capacity)
+        row = self.size
+        self.size += 1
+        self.robots.append(robot)
+        self.paths.append(path)
+        return row
+
+    # --- Rows ---
+    def add(self, robot, position, radius, speed):
+        """New row for robot, which becomes a view onto it."""
+        row = self._append(robot, [])
+        self.ids[row] = robot.id
+        self.pos[row] = position
+        self.radius[row] = radius
+        self.speed[row] = speed
+        robot.fleet, robot.row = self, row
+        return row
+
+    def adopt(self, robot):
+        """Copy robot's row over from the fleet it lives in now and rebind it here."""
+        src, i = robot.fleet, robot.row
+        row = self._append(robot, src.paths[i])
+        for name in FIELDS:
+            getattr(self, name)[row] = getattr(src, name)[i]
+        self.ids[row] = robot.id
+        robot.fleet, robot.row = self, row
+        return row
+
+    # --- Path cursor ---
+    def set_path(self, row, path):
+        self.paths[row] = path
+        self.set_path_index(row, 0)
+
+    def set_path_index(self, row, index):
+        self.path_index[row] = index
+        self.retarget(row)
+
+    def retarget(self, row):
+        path, k = self.paths[row], self.path_index[row]
+        self.waypoint[row] = path[k] if 0 <= k < len(path) else (np.nan, np.nan)
+
+
+# --- Vectorized geometry ---
+def close_pairs(a, b, reach):
+    """
+    Index pairs (i, j) with a[i] and b[j] closer than reach on both axes.
+    Sorts b on x and takes each a[i]'s window with searchsorted, so the
+    cost follows the number of nearby pairs rather than len(a) * len(b).
+    """
+    order = np.argsort(b[:, 0], kind="stable")
+    bx = b[order, 0]
+    lo = np.searchsorted(bx, a[:, 0] - reach, side="left")
+    hi = np.searchsorted(bx, a[:, 0] + reach, side="right")
+    counts = hi - lo
+    i = np.repeat(np.arange(len(a)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    j = order[np.repeat(lo, counts) + offsets]
+    keep = np.abs(a[i, 1] - b[j, 1]) < reach
+    return i[keep], j[keep]
+
+
+def segment_distances(points, segments, pairwise=False):
+    """
+    (N, M) distances from points (N, 2) to segments (M, 4) as in
+    point_to_segment_distance; pairwise: (N,) distances from each point
+    to the segment in the same row.
+    """
+    if pairwise:
+        px, py = points[:, 0], points[:, 1]
+    else:
+        px, py = points[:, 0:1], points[:, 1:2]
+    x1, y1, x2, y2 = segments.T
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = ((px - x1) * dx + (py - y1) * dy) / length_sq
+    t = np.where(length_sq == 0, 0.0, np.clip(t, 0.0, 1.0))
+    return np.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+def circle_tois(starts, ends, radius, centers):
+    """
+    circle_circle_toi row by row: (N,) fractions of the moves starts -> ends
+    at which a point first comes within radius of centers, inf for no hit.
+    """
+    d = ends - starts
+    f = starts - centers
+    c = (f * f).sum(axis=1) - radius * radius
+    b = (f * d).sum(axis=1)
+    a = (d * d).sum(axis=1)
+    disc = b * b - a * c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (-b - np.sqrt(np.maximum(disc, 0.0))) / a
+    toi = np.where((c >= 0) & (a > 0) & (b < 0) & (disc >= 0) & (t <= 1), t, np.inf)
+    # Overlapping at the start: a hit right away while going deeper
+    return np.where(c < 0, np.where(b < 0, 0.0, np.inf), toi)
+
+
+def segment_tois(starts, ends, radius, segments):
+    """
+    circle_segment_toi row by row: (N,) fractions of the moves starts ->
+    ends (N, 2) at which circles of radius (N,) first touch segments (N, 4),
+    inf for no hit.
+    """
+    d = ends - starts
+    a, e = segments[:, :2], segments[:, 2:] - segments[:, :2]
+    length_sq = (e * e).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Flat sides of the capsule
+        normal = np.column_stack((-e[:, 1], e[:, 0])) / np.sqrt(length_sq)[:, None]
+        side = ((starts - a) * normal).sum(axis=1)
+        closing = (d * normal).sum(axis=1)
+        t = (np.abs(side) - radius) / np.abs(closing)
+        u = ((starts + t[:, None] * d - a) * e).sum(axis=1) / length_sq
+        u0 = np.where(length_sq > 0, np.clip(((starts - a) * e).sum(axis=1) / length_sq, 0.0, 1.0), 0.0)
+    toi = np.where((length_sq > 0) & (side * closing < 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1),
+                   t, np.inf)
+    # End caps
+    toi = np.minimum(toi, circle_tois(starts, ends, radius, a))
+    toi = np.minimum(toi, circle_tois(starts, ends, radius, a + e))
+
+    # Overlapping at the start: a hit right away while going deeper, else none
+    closest = a + u0[:, None] * e - starts
+    over = (closest * closest).sum(axis=1) < radius * radius
+    deeper = (closest * d).sum(axis=1) > 0
+    return np.where(over, np.where(deeper, 0.0, np.inf), toi)
@@ -1,4 +1,6 @@
 # core/geometry.py
+import math
+
 
 class LineSegment:
     def __init__(self, p1, p2):
@@ -19,3 +21,117 @@ class Rectangle:
             self.x <= px <= self.x + self.w and
             self.y <= py <= self.y + self.h
         )
+
+
+def point_to_segment_distance(px, py, p1, p2):
+    x1, y1 = p1
+    x2, y2 = p2
+    dx = x2 - x1
+    dy = y2 - y1
+    if dx == 0 and dy == 0:
+        return math.hypot(px - x1, py - y1)
+    t = ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)
+    t = max(0, min(1, t))
+    nearest_x = x1 + t * dx
+    nearest_y = y1 + t * dy
+    return math.hypot(px - nearest_x, py - nearest_y)
+
+
+def segments_intersect(p1, p2, q1, q2):
+    """True if segments p1-p2 and q1-q2 cross or touch."""
+    def orient(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    d1, d2 = orient(q1, q2, p1), orient(q1, q2, p2)
+    d3, d4 = orient(p1, p2, q1), orient(p1, p2, q2)
+    if ((d1 > 0) != (d2 > 0) and d1 != 0 and d2 != 0 and
+            (d3 > 0) != (d4 > 0) and d3 != 0 and d4 != 0):
+        return True
+    # Collinear or touching cases come out as a zero endpoint distance
+    return False
+
+
+def segment_to_segment_distance(p1, p2, q1, q2):
+    if segments_intersect(p1, p2, q1, q2):
+        return 0.0
+    return min(
+        point_to_segment_distance(p1[0], p1[1], q1, q2),
+        point_to_segment_distance(p2[0], p2[1], q1, q2),
+        point_to_segment_distance(q1[0], q1[1], p1, p2),
+        point_to_segment_distance(q2[0], q2[1], p1, p2),
+    )
+
+
+def segment_to_rectangle_distance(p1, p2, rect):
+    if rect.contains(p1) or rect.contains(p2):
+        return 0.0
+    x0, y0, x1, y1 = rect.x, rect.y, rect.x + rect.w, rect.y + rect.h
+    corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    return min(segment_to_segment_distance(p1, p2, corners[k], corners[(k + 1) % 4]) for k in range(4))
+
+
+# --- Swept circles ---
+def circle_circle_toi(p, q, radius, center):
+    """
+    Fraction t in [0, 1] of the move p -> q at which a point first comes
+    within radius of center (a circle moving into a static one, radius being
+    the sum of both radii), or None. Already overlapping counts as t = 0
+    only while the move goes deeper, so touching circles can still part.
+    """
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    fx, fy = p[0] - center[0], p[1] - center[1]
+    c = fx * fx + fy * fy - radius * radius
+    b = fx * dx + fy * dy
+    if c < 0:
+        return 0.0 if b < 0 else None
+    a = dx * dx + dy * dy
+    disc = b * b - a * c
+    if a == 0 or b >= 0 or disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / a
+    return t if t <= 1 else None
+
+
+def circle_segment_toi(p, q, radius, a, b):
+    """
+    Fraction t in [0, 1] of the move p -> q at which a circle of radius
+    first touches the segment ab, or None. First contact is either on one
+    of the capsule's two flat sides or on one of its end caps. Overlapping
+    at the start counts as t = 0 only while the move goes deeper.
+    """
+    d = point_to_segment_distance(p[0], p[1], a, b)
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    ex, ey = b[0] - a[0], b[1] - a[1]
+    length_sq = ex * ex + ey * ey
+    if d < radius:
+        # Direction towards the closest point of the segment
+        u = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((p[0] - a[0]) * ex + (p[1] - a[1]) * ey) / length_sq))
+        cx, cy = a[0] + u * ex, a[1] + u * ey
+        return 0.0 if (cx - p[0]) * dx + (cy - p[1]) * dy > 0 else None
+
+    best = None
+    if length_sq > 0:
+        length = math.sqrt(length_sq)
+        nx, ny = -ey / length, ex / length
+        side = (p[0] - a[0]) * nx + (p[1] - a[1]) * ny
+        closing = dx * nx + dy * ny
+        if side * closing < 0:
+            t = (abs(side) - radius) / abs(closing)
+            if 0 <= t <= 1:
+                u = ((p[0] + t * dx - a[0]) * ex + (p[1] + t * dy - a[1]) * ey) / length_sq
+                if 0 <= u <= 1:
+                    best = t
+    for end in (a, b):
+        t = circle_circle_toi(p, q, radius, end)
+        if t is not None and (best is None or t < best):
+            best = t
+    return best
+
+
+def circle_rectangle_toi(p, q, radius, rect):
+    """circle_segment_toi against the four sides of rect."""
+    x0, y0, x1, y1 = rect.x, rect.y, rect.x + rect.w, rect.y + rect.h
+    corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    hits = [circle_segment_toi(p, q, radius, corners[k], corners[(k + 1) % 4]) for k in range(4)]
+    hits = [t for t in hits if t is not None]
+    return min(hits) if hits else None
@@ -1,10 +1,20 @@
 # core/grid.py
+import math
+import numpy as np
+from core.geometry import LineSegment, Rectangle, point_to_segment_distance
+
+
 class Grid:
     def __init__(self, width, height, cell_size):
         self.cell_size = cell_size
         self.cols = int(width / cell_size)
         self.rows = int(height / cell_size)
 
+        # Cells a robot centered there would collide in, see mark_obstacles
+        self.blocked = set()
+        self.obstacle_version = None
+        self._moves = None
+
     def world_to_cell(self, x, y):
         return int(x // self.cell_size), int(y // self.cell_size)
 
@@ -13,3 +23,318 @@ class Grid:
             cx * self.cell_size + self.cell_size / 2,
             cy * self.cell_size + self.cell_size / 2
         )
+
+    def in_bounds(self, cell):
+        cx, cy = cell
+        return 0 <= cx < self.cols and 0 <= cy < self.rows
+
+    def is_free(self, cell):
+        return self.in_bounds(cell) and cell not in self.blocked
+
+    def neighbors(self, cell):
+        """Free 4-connected neighbors of cell."""
+        cx, cy = cell
+        for n in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            if self.is_free(n):
+                yield n
+
+    def moves(self):
+        """
+        cell -> (cell, *free neighbors) for every free cell: the wait and
+        move actions of a space-time search, built once per obstacle set.
+        """
+        if self._moves is None:
+            self._moves = {
+                (cx, cy): ((cx, cy),) + tuple(self.neighbors((cx, cy)))
+                for cx in range(self.cols) for cy in range(self.rows)
+                if (cx, cy) not in self.blocked
+            }
+        return self._moves
+
+    def clamp(self, cell):
+        cx, cy = cell
+        return (max(0, min(self.cols - 1, cx)), max(0, min(self.rows - 1, cy)))
+
+    # --- Obstacles ---
+    def mark_obstacles(self, world, radius):
+        """
+        Block every cell whose center is within radius + half a cell of an
+        obstacle, so moving between two free neighbor centers stays clear.
+        Skipped if the world's obstacles haven't changed since last time.
+        """
+        if self.obstacle_version == world.obstacle_version:
+            return
+        self.obstacle_version = world.obstacle_version
+        self.blocked = set()
+        self._moves = None
+
+        clearance = radius + self.cell_size / 2
+        for obs in world.obstacles:
+            if isinstance(obs, Rectangle):
+                x0, y0 = obs.x - clearance, obs.y - clearance
+                x1, y1 = obs.x + obs.w + clearance, obs.y + obs.h + clearance
+            elif isinstance(obs, LineSegment):
+                x0 = min(obs.p1[0], obs.p2[0]) - clearance
+                y0 = min(obs.p1[1], obs.p2[1]) - clearance
+                x1 = max(obs.p1[0], obs.p2[0]) + clearance
+                y1 = max(obs.p1[1], obs.p2[1]) + clearance
+            else:
+                continue
+
+            cx0, cy0 = self.clamp(self.world_to_cell(x0, y0))
+            cx1, cy1 = self.clamp(self.world_to_cell(x1, y1))
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    if (cx, cy) in self.blocked:
+                        continue
+                    px, py = self.cell_to_world(cx, cy)
+                    if isinstance(obs, Rectangle):
+                        dx = max(obs.x - px, 0.0, px - obs.x - obs.w)
+                        dy = max(obs.y - py, 0.0, py - obs.y - obs.h)
+                        d = math.hypot(dx, dy)
+                    else:
+                        d = point_to_segment_distance(px, py, obs.p1, obs.p2)
+                    if d < clearance:
+                        self.blocked.add((cx, cy))
+
+
+# --- Clearance field ---
+def distance_transform(seeds):
+    """
+    Exact Euclidean distance (in cells) from every cell of the boolean
+    array seeds to the nearest True cell, in time linear in the array size:
+    a 1D scan along axis 1, then Felzenszwalb & Huttenlocher's lower
+    envelope of parabolas along axis 0, run for all columns at once.
+    Cells with no seed anywhere get a distance beyond the array's diagonal.
+    """
+    n, m = seeds.shape
+    far = 2.0 * (n + m)
+
+    # Axis 1: distance to the nearest seed in the same row
+    j = np.arange(m, dtype=float)
+    before = np.maximum.accumulate(np.where(seeds, j, -far), axis=1)
+    after = np.minimum.accumulate(np.where(seeds, j, 2 * far)[:, ::-1], axis=1)[:, ::-1]
+    f = np.minimum(j - before, after - j) ** 2
+
+    # Axis 0: lower envelope of the parabolas (q - i)^2 + f[i], per column
+    cols = np.arange(m)
+    v = np.zeros((n, m), dtype=np.intp)  # apex row of the k-th envelope parabola
+    z = np.empty((n + 1, m))              # where the k-th parabola takes over
+    z[0], z[1] = -np.inf, np.inf
+    k = np.zeros(m, dtype=np.intp)
+    for q in range(1, n):
+        fq = f[q] + q * q
+        while True:
+            vk = v[k, cols]
+            s = (fq - f[vk, cols] - vk * vk) / (2 * (q - vk))
+            hidden = s <= z[k, cols]
+            if not hidden.any():
+                break
+            k[hidden] -= 1
+        k += 1
+        v[k, cols] = q
+        z[k, cols] = s
+        z[k + 1, cols] = np.inf
+
+    out = np.empty((n, m))
+    k[:] = 0
+    for q in range(n):
+        while True:
+            ahead = z[k + 1, cols] < q
+            if not ahead.any():
+                break
+            k[ahead] += 1
+        vk = v[k, cols]
+        out[q] = (q - vk) ** 2 + f[vk, cols]
+    return np.sqrt(out)
+
+
+class ClearanceField:
+    """
+    Distance to the nearest obstacle, sampled at the cell centers of a
+    fine Grid and interpolated bilinearly in between, so a clearance query
+    is a handful of array reads whatever the number of obstacles.
+
+    Obstacles are rasterized into seed cells (every cell a rectangle covers,
+    cells of points every half cell along a segment) and the field is their
+    distance_transform. Interpolated values are within `error` of the true
+    distance; classify() only answers when that margin settles the question.
+    Values are capped at max_distance, which keeps obstacle edits local:
+    insert() and remove() recompute just the window the change can reach.
+    The raster extends max_distance past the world on every side, so
+    obstacles sticking out of the world still count.
+    `version` records which obstacle-list version the field reflects.
+    """
+
+    def __init__(self, width, height, cell_size=0.25, max_distance=8.0):
+        self.width, self.height = width, height
+        self.cell_size = cell_size
+        self.max_distance = max_distance
+        self.margin = max_distance
+        self.grid = Grid(width + 2 * self.margin, height + 2 * self.margin, cell_size)
+        # Sample spacing error plus interpolation error, both Lipschitz bounds
+        self.error = cell_size * (math.sqrt(2) + 0.25)
+        self.version = None
+
+        shape = (self.grid.cols, self.grid.rows)
+        self.seeds = np.zeros(shape, dtype=np.int32)  # obstacles seeding each cell
+        self.dist = np.full(shape, max_distance)
+        self.cells = {}       # obstacle -> (ix, iy) of its seed cells
+        self.rectangles = 0   # classify callers treat rectangles as boxes
+        self._pad = int(math.ceil(max_distance / cell_size)) + 2
+
+    def __len__(self):
+        return len(self.cells)
+
+    def _seed_cells(self, obs):
+        h, m = self.cell_size, self.margin
+        if isinstance(obs, Rectangle):
+            i0, j0 = self.grid.world_to_cell(obs.x + m, obs.y + m)
+            i1, j1 = self.grid.world_to_cell(obs.x + obs.w + m, obs.y + obs.h + m)
+            ix, iy = np.meshgrid(np.arange(max(i0, 0), min(i1, self.grid.cols - 1) + 1),
+                                 np.arange(max(j0, 0), min(j1, self.grid.rows - 1) + 1),
+                                 indexing="ij")
+            return ix.ravel(), iy.ravel()
+        (x1, y1), (x2, y2) = obs.p1, obs.p2
+        samples = int(math.ceil(math.hypot(x2 - x1, y2 - y1) / (h / 2))) + 1
+        t = np.linspace(0.0, 1.0, samples)
+        ix = np.floor((x1 + (x2 - x1) * t + m) / h).astype(np.intp)
+        iy = np.floor((y1 + (y2 - y1) * t + m) / h).astype(np.intp)
+        inside = (ix >= 0) & (ix < self.grid.cols) & (iy >= 0) & (iy < self.grid.rows)
+        keys = np.unique(ix[inside] * self.grid.rows + iy[inside])
+        return keys // self.grid.rows, keys % self.grid.rows
+
+    # --- Maintenance ---
+    def rebuild(self, obstacles):
+        self.seeds[:] = 0
+        self.cells = {}
+        self.rectangles = 0
+        for obs in obstacles:
+            self._add_seeds(obs)
+        self._refresh((0, 0, self.grid.cols - 1, self.grid.rows - 1))
+
+    def insert(self, obs):
+        self._refresh(self._add_seeds(obs))
+
+    def remove(self, obs):
+        self._refresh(self._remove_seeds(obs))
+
+    def apply(self, changes):
+        """Replay (op, obstacle) journal entries, recomputing each touched window once."""
+        boxes = [self._add_seeds(obs) if op == "add" else self._remove_seeds(obs)
+                 for op, obs in changes]
+        boxes = [box for box in boxes if box is not None]
+        if not boxes:
+            return
+        pad = 2 * self._pad
+        area = sum((i1 - i0 + pad) * (j1 - j0 + pad) for i0, j0, i1, j1 in boxes)
+        if area > self.seeds.size:
+            # The windows would cost more than one pass over everything
+            self._refresh((0, 0, self.grid.cols - 1, self.grid.rows - 1))
+        else:
+            for box in boxes:
+                self._refresh(box)
+
+    def _add_seeds(self, obs):
+        if not isinstance(obs, (LineSegment, Rectangle)):
+            return None
+        ix, iy = self._seed_cells(obs)
+        self.cells[obs] = (ix, iy)
+        self.rectangles += isinstance(obs, Rectangle)
+        np.add.at(self.seeds, (ix, iy), 1)
+        return self._box(ix, iy)
+
+    def _remove_seeds(self, obs):
+        cells = self.cells.pop(obs, None)
+        if cells is None:
+            return None
+        ix, iy = cells
+        self.rectangles -= isinstance(obs, Rectangle)
+        np.subtract.at(self.seeds, (ix, iy), 1)
+        return self._box(ix, iy)
+
+    @staticmethod
+    def _box(ix, iy):
+        if not len(ix):
+            return None
+        return int(ix.min()), int(iy.min()), int(ix.max()), int(iy.max())
+
+    def _refresh(self, box):
+        """Recompute the field within max_distance of the seed-cell box (i0, j0, i1, j1)."""
+        if box is None:
+            return
+        i0, j0, i1, j1 = box
+        cols, rows, pad = self.grid.cols, self.grid.rows, self._pad
+        # Window to rewrite, and the seeds that can reach into it
+        wi0, wj0 = max(i0 - pad, 0), max(j0 - pad, 0)
+        wi1, wj1 = min(i1 + pad, cols - 1), min(j1 + pad, rows - 1)
+        si0, sj0 = max(wi0 - pad, 0), max(wj0 - pad, 0)
+        si1, sj1 = min(wi1 + pad, cols - 1), min(wj1 + pad, rows - 1)
+        dist = distance_transform(self.seeds[si0:si1 + 1, sj0:sj1 + 1] > 0) * self.cell_size
+        self.dist[wi0:wi1 + 1, wj0:wj1 + 1] = np.minimum(
+            dist[wi0 - si0:wi1 - si0 + 1, wj0 - sj0:wj1 - sj0 + 1], self.max_distance)
+
+    # --- Queries ---
+    def _corners(self, x, y):
+        """Sample cell (i, j) below-left of (x, y) and the bilinear weights, or None off the raster."""
+        h = self.cell_size
+        fx = (x + self.margin) / h - 0.5
+        fy = (y + self.margin) / h - 0.5
+        i, j = math.floor(fx), math.floor(fy)
+        if not (0 <= i < self.grid.cols - 1 and 0 <= j < self.grid.rows - 1):
+            return None
+        return i, j, fx - i, fy - j
+
+    def clearance(self, x, y):
+        """Interpolated distance from (x, y) to the nearest obstacle (+- error, at most max_distance)."""
+        corners = self._corners(x, y)
+        if corners is None:
+            return 0.0
+        i, j, a, b = corners
+        item = self.dist.item
+        return ((1 - a) * ((1 - b) * item(i, j) + b * item(i, j + 1)) +
+                a * ((1 - b) * item(i + 1, j) + b * item(i + 1, j + 1)))
+
+    def classify(self, x, y, clear_at, blocked_below=None):
+        """
+        True if the clearance at (x, y) is surely >= clear_at, False if it
+        is surely < blocked_below, None when the field can't tell (an exact
+        check is needed then).
+        """
+        corners = self._corners(x, y)
+        if corners is None:
+            return None
+        i, j, a, b = corners
+        item = self.dist.item
+        d00, d01, d10, d11 = item(i, j), item(i, j + 1), item(i + 1, j), item(i + 1, j + 1)
+        d = (1 - a) * ((1 - b) * d00 + b * d01) + a * ((1 - b) * d10 + b * d11)
+        if d - self.error >= clear_at:
+            return True
+        # Capped samples are only lower bounds, so they can't prove a hit
+        if (blocked_below is not None and d + self.error < blocked_below and
+                max(d00, d01, d10, d11) < self.max_distance):
+            return False
+        return None
+
+    def classify_many(self, points, clear_at, blocked_below=None):
+        """
+        classify() for an (n, 2) array of points with per-point thresholds:
+        int8 array of 1 (clear), 0 (blocked) and -1 (exact check needed).
+        """
+        h = self.cell_size
+        f = (np.asarray(points, dtype=float) + self.margin) / h - 0.5
+        ij = np.floor(f).astype(np.intp)
+        on = ((ij[:, 0] >= 0) & (ij[:, 0] < self.grid.cols - 1) &
+              (ij[:, 1] >= 0) & (ij[:, 1] < self.grid.rows - 1))
+        i, j = np.where(on, ij[:, 0], 0), np.where(on, ij[:, 1], 0)
+        a, b = f[:, 0] - i, f[:, 1] - j
+        dist = self.dist
+        d00, d01, d10, d11 = dist[i, j], dist[i, j + 1], dist[i + 1, j], dist[i + 1, j + 1]
+        d = (1 - a) * ((1 - b) * d00 + b * d01) + a * ((1 - b) * d10 + b * d11)
+
+        verdict = np.full(len(f), -1, dtype=np.int8)
+        verdict[on & (d - self.error >= clear_at)] = 1
+        if blocked_below is not None:
+            capped = np.maximum(np.maximum(d00, d01), np.maximum(d10, d11)) >= self.max_distance
+            verdict[on & (d + self.error < blocked_below) & ~capped] = 0
+        return verdict
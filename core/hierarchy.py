@@ -0,0 +1,261 @@
+# core/hierarchy.py
+"""
+HPA*-style abstraction of an OccupancyGrid for planning on large maps.
+
+Free leaves are grouped into clusters: the quadtree's own nodes at the
+depth where a node is no larger than cluster_size on either side, or a leaf
+that stops above that depth on its own. Every leaf lies inside exactly one
+of them, whatever the world's shape.
+Where free leaves of two clusters touch, each run of crossing edges is an
+entrance; its middle edge (and both end edges of a long run) become
+transitions, and the leaves on either side are the abstract graph's nodes.
+Inside a cluster every pair of abstract nodes is linked by its shortest
+path through the cluster's own leaves, precomputed once per grid version.
+
+A query links the start and goal leaves to the abstract nodes of their
+clusters, runs A* over the abstract graph and splices the stored
+intra-cluster paths back together, so its cost grows with the clusters
+crossed rather than with the leaves. Paths are valid leaf paths of the
+grid but, as with any HPA*, may be slightly longer than the A* optimum.
+"""
+import heapq
+import math
+
+LONG_ENTRANCE = 10  # crossing edges from which an entrance gets transitions at both ends too
+_START, _GOAL = -1, -2
+
+
+def _dijkstra(neighbors, source, allowed, targets=()):
+    """
+    Distances and parents of a Dijkstra search from source that only enters
+    cells in allowed. Stops as soon as every cell in targets is settled.
+    """
+    dist = {source: 0.0}
+    parent = {source: None}
+    remaining = set(targets)
+    remaining.discard(source)
+    heap = [(0.0, source)]
+    done = set()
+    while heap and (remaining or not targets):
+        d, i = heapq.heappop(heap)
+        if i in done:
+            continue
+        done.add(i)
+        remaining.discard(i)
+        for j, cost in neighbors[i].items():
+            if j in done or j not in allowed:
+                continue
+            nd = d + cost
+            if nd < dist.get(j, math.inf):
+                dist[j] = nd
+                parent[j] = i
+                heapq.heappush(heap, (nd, j))
+    return {i: dist[i] for i in done}, parent
+
+
+def _walk(parent, i):
+    """Cells from i back to the root of a parent tree."""
+    cells = []
+    while i is not None:
+        cells.append(i)
+        i = parent[i]
+    return cells
+
+
+class AbstractGraph:
+    """
+    Clusters, entrances and intra-cluster paths of one OccupancyGrid, see
+    the module docstring. `version` is the grid version it was built for.
+    """
+
+    def __init__(self, grid, cluster_size):
+        self.grid = grid
+        self.version = grid.version
+        self.cluster_size = cluster_size
+
+        root = grid.root
+        self.depth = max(0, math.ceil(math.log2(max(root.w, root.h) / cluster_size)))
+
+        self.boxes = []    # cluster id -> (x0, y0, w, h) of its quadtree node
+        self.cluster = {}  # free leaf -> cluster id
+        self.members = {}  # cluster id -> set of its free leaves
+        self.nodes = {}    # cluster id -> abstract nodes (leaves) in it
+        self.edges = {}    # abstract node -> {abstract node: cost}
+        self.trees = {}    # abstract node -> parents of its search within its cluster
+        self.points = {}   # abstract node -> its leaf center, for the heuristic
+        self._build()
+
+    # --- Construction ---
+    def _add_clusters(self):
+        """One cluster per quadtree node at self.depth (or leaf above it), holding its free leaves."""
+        cells = self.grid.cells
+        stack = [(self.grid.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth < self.depth and node.children is not None:
+                stack.extend((child, depth + 1) for child in node.children)
+                continue
+            c = len(self.boxes)
+            self.boxes.append((node.x0, node.y0, node.w, node.h))
+            below = [node]
+            while below:
+                n = below.pop()
+                if n.children is not None:
+                    below.extend(n.children)
+                elif cells[n.index][4]:
+                    self.cluster[n.index] = c
+                    self.members.setdefault(c, set()).add(n.index)
+
+    def _build(self):
+        self._add_clusters()
+
+        # Crossing edges, grouped by the pair of clusters they join
+        neighbors, cluster = self.grid.neighbors, self.cluster
+        crossings = {}
+        for u, cu in cluster.items():
+            for v in neighbors[u]:
+                cv = cluster[v]
+                if cu < cv:
+                    crossings.setdefault((cu, cv), []).append((u, v))
+
+        for (cu, cv), crossing in crossings.items():
+            vertical = self._side_by_side(cu, cv)
+            for run in self._entrances(crossing):
+                run.sort(key=lambda e: self._along(e, vertical))
+                picks = {run[len(run) // 2]}
+                if len(run) >= LONG_ENTRANCE:
+                    picks.update((run[0], run[-1]))
+                for u, v in picks:
+                    self._add_node(u)
+                    self._add_node(v)
+                    self.edges[u][v] = self.edges[v][u] = neighbors[u][v]
+
+        # Intra-cluster edges; one whose shortest path runs through another
+        # abstract node is implied by the two shorter edges and left out
+        for c, nodes in self.nodes.items():
+            for a in nodes:
+                dist, tree = _dijkstra(neighbors, a, self.members[c], nodes)
+                self.trees[a] = tree
+                for b in nodes:
+                    if b != a and b in dist and not any(i in nodes for i in _walk(tree, tree[b])[:-1]):
+                        self.edges[a][b] = dist[b]
+
+    def _add_node(self, i):
+        if i not in self.edges:
+            self.edges[i] = {}
+            self.points[i] = self.grid.center(i)
+            self.nodes.setdefault(self.cluster[i], set()).add(i)
+
+    def _entrances(self, crossing):
+        """
+        Split crossing edges (u, v) into entrances: runs in which neighboring
+        edges have touching leaves on both sides, so every edge of a run can
+        be reached from any other without leaving the two clusters.
+        """
+        neighbors = self.grid.neighbors
+        parent = list(range(len(crossing)))
+
+        def find(k):
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        by_u = {}
+        for k, (u, _) in enumerate(crossing):
+            by_u.setdefault(u, []).append(k)
+        for k, (u, v) in enumerate(crossing):
+            for u2 in (u, *neighbors[u]):
+                for k2 in by_u.get(u2, ()):
+                    v2 = crossing[k2][1]
+                    if v2 == v or v2 in neighbors[v]:
+                        parent[find(k2)] = find(k)
+
+        runs = {}
+        for k, edge in enumerate(crossing):
+            runs.setdefault(find(k), []).append(edge)
+        return list(runs.values())
+
+    def _side_by_side(self, cu, cv):
+        """True if clusters cu and cv share a vertical border (rather than a horizontal one)."""
+        (ux, _, uw, _), (vx, _, vw, _) = self.boxes[cu], self.boxes[cv]
+        return math.isclose(ux + uw, vx) or math.isclose(vx + vw, ux)
+
+    def _along(self, edge, vertical):
+        """Position of a crossing edge along the border between its clusters."""
+        (ux, uy), (vx, vy) = self.grid.center(edge[0]), self.grid.center(edge[1])
+        return (uy + vy, ux + vx) if vertical else (ux + vx, uy + vy)
+
+    # --- Queries ---
+    def search(self, start, goal):
+        """Leaf indices from start to goal through the abstract graph, or None."""
+        if start == goal:
+            return [start]
+        cluster, neighbors = self.cluster, self.grid.neighbors
+        cs, cg = cluster.get(start), cluster.get(goal)
+        if cs is None or cg is None:
+            return None
+
+        # Link start and goal to the abstract nodes of their clusters
+        start_nodes = self.nodes.get(cs, set())
+        goal_nodes = self.nodes.get(cg, set())
+        targets = start_nodes | {goal} if cs == cg else start_nodes
+        d_start, p_start = _dijkstra(neighbors, start, self.members[cs], targets)
+        d_goal, p_goal = _dijkstra(neighbors, goal, self.members[cg], goal_nodes)
+
+        # A* over the abstract graph plus the start and goal links
+        start_edges = {a: d for a, d in d_start.items() if a in start_nodes}
+        if goal in d_start:
+            start_edges[_GOAL] = d_start[goal]
+        goal_edges = {a: d for a, d in d_goal.items() if a in goal_nodes}
+        gx, gy = self.grid.center(goal)
+        points = self.points
+        g_score = {_START: 0.0}
+        came_from = {}
+        open_set = [(0.0, _START)]
+        closed = set()
+        while open_set:
+            _, node = heapq.heappop(open_set)
+            if node in closed:
+                continue
+            if node == _GOAL:
+                return self._refine(came_from, p_start, p_goal, goal)
+            closed.add(node)
+
+            g = g_score[node]
+            cost = goal_edges.get(node)
+            if cost is not None and g + cost < g_score.get(_GOAL, math.inf):
+                g_score[_GOAL] = g + cost
+                came_from[_GOAL] = node
+                heapq.heappush(open_set, (g + cost, _GOAL))
+            for nxt, cost in (start_edges if node == _START else self.edges[node]).items():
+                new_g = g + cost
+                if nxt in closed or new_g >= g_score.get(nxt, math.inf):
+                    continue
+                g_score[nxt] = new_g
+                came_from[nxt] = node
+                if nxt == _GOAL:
+                    heapq.heappush(open_set, (new_g, nxt))
+                else:
+                    x, y = points[nxt]
+                    heapq.heappush(open_set, (new_g + math.hypot(gx - x, gy - y), nxt))
+        return None
+
+    def _refine(self, came_from, p_start, p_goal, goal):
+        """Leaf path for the abstract path ending at _GOAL in came_from."""
+        hops = [_GOAL]
+        while hops[-1] != _START:
+            hops.append(came_from[hops[-1]])
+        hops.reverse()
+
+        if len(hops) == 2:
+            # Start and goal in one cluster, linked directly
+            return _walk(p_start, goal)[::-1]
+        cells = _walk(p_start, hops[1])[::-1]
+        for a, b in zip(hops[1:-2], hops[2:-1]):
+            if self.cluster[a] == self.cluster[b]:
+                cells += _walk(self.trees[a], b)[::-1][1:]
+            else:
+                cells.append(b)
+        cells += _walk(p_goal, hops[-2])[1:]
+        return cells
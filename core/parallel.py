@@ -0,0 +1,288 @@
+# core/parallel.py
+"""
+Plan many robots' paths at once across worker processes.
+
+The OccupancyGrid (and cost-to-go field, when planning into a region) is
+packed into flat arrays in one shared-memory block. Each worker attaches
+once, in the pool initializer, rebuilds a read-only copy of the grid with
+the same leaf indices and neighbor order, and then runs the serial
+Controller code per robot.
+
+Workers search without a path cache. The parent's Controller answers what
+its LRU cache already holds before any work is dispatched, and stores what
+the workers find. With the cache off (path_cache_size=0) the paths equal the
+serial planner's exactly. With it on, the serial planner may reuse a suffix
+of a path planned earlier in the same batch where a worker searches afresh:
+the path can differ, at equal cost for A* but not always for HPA*.
+"""
+import math
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.controller import Controller, CostField
+from core.quadtree import OccupancyGrid, QuadNode
+
+
+# --- Packing a grid into flat arrays ---
+def pack_grid(grid, field=None):
+    """name -> ndarray snapshot of grid (and field). Inverse of unpack_grid."""
+    cells = np.full((len(grid.cells), 5), np.nan)
+    live = np.zeros(len(grid.cells), dtype=bool)
+    for i, cell in enumerate(grid.cells):
+        if cell is not None:
+            cells[i] = cell
+            live[i] = True
+
+    # Neighbor graph as CSR, keeping each dict's insertion order
+    ptr = np.zeros(len(grid.neighbors) + 1, dtype=np.int64)
+    for i, edges in enumerate(grid.neighbors):
+        ptr[i + 1] = ptr[i] + len(edges)
+    idx = np.fromiter((j for edges in grid.neighbors for j in edges), dtype=np.int64, count=ptr[-1])
+    cost = np.fromiter((c for edges in grid.neighbors for c in edges.values()), dtype=float, count=ptr[-1])
+
+    # Quadtree in preorder; children refer to preorder positions
+    order = []
+    stack = [grid.root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if node.children is not None:
+            stack.extend(reversed(node.children))
+    position = {id(node): k for k, node in enumerate(order)}
+    boxes = np.array([(n.x0, n.y0, n.w, n.h) for n in order], dtype=float)
+    children = np.array([
+        [position[id(c)] for c in n.children] if n.children is not None else [-1] * 4
+        for n in order
+    ], dtype=np.int64)
+
+    arrays = {
+        "cells": cells,
+        "live": live,
+        "nbr_ptr": ptr,
+        "nbr_idx": idx,
+        "nbr_cost": cost,
+        "node_box": boxes,
+        "node_children": children,
+        "node_index": np.array([n.index for n in order], dtype=np.int64),
+        "node_free": np.array([n.free for n in order], dtype=np.int64),
+        "free_slots": np.array(grid._free_slots, dtype=np.int64),
+    }
+    if field is not None:
+        arrays["field_goal"] = np.array(sorted(field.goal_cells), dtype=np.int64)
+        arrays["field_cells"] = np.fromiter(field.dist, dtype=np.int64, count=len(field.dist))
+        arrays["field_dist"] = np.fromiter(field.dist.values(), dtype=float, count=len(field.dist))
+        arrays["field_hop"] = np.array([field.next_hop[i] for i in field.dist], dtype=np.int64)
+    return arrays
+
+
+def unpack_grid(arrays, meta):
+    """(OccupancyGrid, CostField or None) rebuilt from pack_grid arrays; not tied to a World."""
+    grid = OccupancyGrid.__new__(OccupancyGrid)
+    grid.world = None
+    grid.robot_radius = meta["robot_radius"]
+    grid.base_grid = meta["base_grid"]
+    grid.min_grid = meta["min_grid"]
+    grid.version = meta["version"]
+    grid.cost_fields = {}
+    grid.abstract_graphs = {}
+
+    grid.cells = [
+        (x0, y0, w, h, bool(free)) if alive else None
+        for (x0, y0, w, h, free), alive in zip(arrays["cells"].tolist(), arrays["live"].tolist())
+    ]
+    ptr, idx, cost = arrays["nbr_ptr"].tolist(), arrays["nbr_idx"].tolist(), arrays["nbr_cost"].tolist()
+    grid.neighbors = [dict(zip(idx[ptr[i]:ptr[i + 1]], cost[ptr[i]:ptr[i + 1]])) for i in range(len(grid.cells))]
+    grid._free_slots = arrays["free_slots"].tolist()
+
+    nodes = [QuadNode(*box) for box in arrays["node_box"].tolist()]
+    grid.nodes = [None] * len(grid.cells)
+    for node, kids, index, free in zip(nodes, arrays["node_children"].tolist(),
+                                       arrays["node_index"].tolist(), arrays["node_free"].tolist()):
+        node.index = index
+        node.free = free
+        if kids[0] != -1:
+            node.children = [nodes[k] for k in kids]
+        elif index >= 0:
+            grid.nodes[index] = node
+    grid.root = nodes[0]
+
+    field = None
+    if "field_goal" in arrays:
+        field = CostField.__new__(CostField)
+        field.version = grid.version
+        field.goal_cells = set(arrays["field_goal"].tolist())
+        keys = arrays["field_cells"].tolist()
+        field.dist = dict(zip(keys, arrays["field_dist"].tolist()))
+        field.next_hop = dict(zip(keys, arrays["field_hop"].tolist()))
+    return grid, field
+
+
+# --- Shared memory ---
+def to_shared(arrays):
+    """Copy arrays into one SharedMemory block. Returns (shm, layout)."""
+    layout = {}
+    offset = 0
+    for name, a in arrays.items():
+        offset = -(-offset // 8) * 8  # keep every array 8-byte aligned
+        layout[name] = (offset, a.shape, a.dtype.str)
+        offset += a.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, a in arrays.items():
+        start, shape, dtype = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = a
+    return shm, layout
+
+
+def from_shared(shm, layout):
+    """name -> ndarray views onto shm (valid while shm stays open)."""
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+        for name, (start, shape, dtype) in layout.items()
+    }
+
+
+def plan_one(controller, grid, field, start, target):
+    """One robot's path: descend field if given, else plain A* to target."""
+    if field is not None:
+        return controller.descend_path(grid, field, start, target)
+    return controller.search_path(grid, start, target)
+
+
+# --- Worker side ---
+_worker = {}
+
+
+def _init_worker(shm_name, layout, meta):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        _worker["grid"], _worker["field"] = unpack_grid(from_shared(shm, layout), meta)
+    finally:
+        # Everything was copied into Python objects, the block isn't needed anymore
+        shm.close()
+    # No cache here: the parent's cache is the one that sees every result
+    _worker["controller"] = Controller(meta["base_grid"], meta["min_grid"], path_cache_size=0,
+                                       hierarchical=meta["hierarchical"], cluster_size=meta["cluster_size"])
+
+
+def _plan(task):
+    return plan_one(_worker["controller"], _worker["grid"], _worker["field"], *task)
+
+
+def _search(task):
+    return _worker["controller"].search_cells(_worker["grid"], *task)
+
+
+class ParallelPlanner:
+    """
+    Process pool that plans paths with the serial Controller code on a
+    shared snapshot of the grid. The pool is kept between calls and only
+    restarted when the grid or the region's cost-to-go field changes.
+
+        with ParallelPlanner(controller, workers=4) as planner:
+            paths = planner.plan(world, world.robots, world.target_region)
+    """
+
+    def __init__(self, controller, workers=None):
+        self.controller = controller
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self._shm = None
+        self._key = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        self._key = None
+
+    def plan(self, world, robots, region=None, targets=None):
+        """
+        Paths for robots in order, as plan_path_to_region (region given) or
+        plan_path would plan them (see the module docstring for the path
+        cache). targets defaults to robot.target.
+        """
+        if targets is None:
+            targets = [robot.target for robot in robots]
+        paths = [None] * len(robots)
+
+        # One grid per robot radius
+        groups = {}
+        for k, robot in enumerate(robots):
+            groups.setdefault(robot.radius, []).append(k)
+
+        for radius, rows in groups.items():
+            grid = self.controller.get_occupancy_grid(world, radius)
+            field = self.controller.cost_to_go(world, radius, region) if region is not None else None
+            tasks = [((robots[k].x, robots[k].y), targets[k]) for k in rows]
+
+            if self.workers <= 1:
+                results = [plan_one(self.controller, grid, field, *task) for task in tasks]
+            elif field is not None:
+                self._start(grid, field)
+                results = self._pool.map(_plan, tasks, chunksize=self._chunk(len(tasks)))
+            else:
+                self._start(grid, field)
+                results = self._search_many(grid, tasks)
+
+            for k, path in zip(rows, results):
+                if self.controller.any_angle:
+                    # Needs the world's obstacles, so it runs here rather than in the workers
+                    path = self.controller.smooth_path(world, radius, path, robots[k].position)
+                paths[k] = path
+        return paths
+
+    def _search_many(self, grid, tasks):
+        """search_path for each (start, target): cache hits here, misses in the workers."""
+        controller = self.controller
+        results = [None] * len(tasks)
+        misses = []
+        for k, (start, target) in enumerate(tasks):
+            start_idx = controller.get_cell_index(start[0], start[1], grid)
+            end_idx = controller.get_cell_index(target[0], target[1], grid)
+            if start_idx == -1 or end_idx == -1:
+                continue
+            found, cells = controller.cache_lookup(grid, start_idx, end_idx)
+            if found:
+                results[k] = controller.cells_to_path(grid, cells, target)
+            else:
+                misses.append((k, start_idx, end_idx))
+
+        found = self._pool.map(_search, [m[1:] for m in misses], chunksize=self._chunk(len(misses)))
+        for (k, start_idx, end_idx), cells in zip(misses, found):
+            controller.cache_store(grid, start_idx, end_idx, cells)
+            results[k] = controller.cells_to_path(grid, cells, tasks[k][1])
+        return results
+
+    def _chunk(self, count):
+        return max(1, math.ceil(count / (4 * self.workers)))
+
+    def _start(self, grid, field):
+        key = (id(grid), grid.version, id(field))
+        if self._pool is not None and self._key == key:
+            return
+        self.close()
+
+        meta = {
+            "robot_radius": grid.robot_radius, "base_grid": grid.base_grid,
+            "min_grid": grid.min_grid, "version": grid.version,
+            "hierarchical": self.controller.hierarchical, "cluster_size": self.controller.cluster_size,
+        }
+        # The block lives until close(): workers may still be starting up
+        self._shm, layout = to_shared(pack_grid(grid, field))
+        self._pool = mp.Pool(self.workers, initializer=_init_worker,
+                             initargs=(self._shm.name, layout, meta))
+        self._key = key
@@ -1,10 +1,511 @@
 # core/planner.py
+import heapq
+import itertools
+import time
+from collections import deque
+
+
 class DiscretePlan:
     def __init__(self):
         self.paths = {}  # robot_id -> [(cell, time)]
+        self.success = False
+        self.cost = 0       # sum of costs (time steps until each robot rests at its goal)
+        self.expanded = 0   # high-level constraint tree nodes expanded
+
+    @property
+    def makespan(self):
+        return max((len(path) - 1 for path in self.paths.values()), default=0)
+
+
+class FocalQueue:
+    """
+    OPEN ordered by f, plus the FOCAL subset whose focal value (f unless
+    given) is <= w * f_min, ordered by a secondary key. With w == 1 this is
+    a plain best-first queue that breaks f ties on the secondary key.
+    """
+
+    def __init__(self, w=1.0):
+        self.w = w
+        self.bound = float('-inf')
+        self._open = []     # (f, tie, entry)
+        self._pending = []  # (focal value, tie, entry, secondary) outside the bound
+        self._focal = []    # (secondary, tie, entry)
+        self._tie = itertools.count()
+
+    def push(self, f, secondary, item, focal_value=None):
+        if focal_value is None:
+            focal_value = f
+        tie = next(self._tie)
+        entry = [item, True]  # [item, still queued]
+        heapq.heappush(self._open, (f, tie, entry))
+        if focal_value <= self.bound:
+            heapq.heappush(self._focal, (secondary, tie, entry))
+        else:
+            heapq.heappush(self._pending, (focal_value, tie, entry, secondary))
+
+    @property
+    def f_min(self):
+        while self._open and not self._open[0][2][1]:
+            heapq.heappop(self._open)
+        return self._open[0][0] if self._open else None
+
+    def pop(self):
+        f_min = self.f_min
+        if f_min is None:
+            return None
+        # f_min never decreases (consistent heuristics, monotone bounds),
+        # so the bound only grows
+        if self.w * f_min > self.bound:
+            self.bound = self.w * f_min
+            while self._pending and self._pending[0][0] <= self.bound:
+                _, tie, entry, secondary = heapq.heappop(self._pending)
+                heapq.heappush(self._focal, (secondary, tie, entry))
+        while self._focal:
+            entry = heapq.heappop(self._focal)[2]
+            if entry[1]:
+                entry[1] = False
+                return entry[0]
+        # Nothing within the bound (an item costing more than w * f): take the best f
+        entry = heapq.heappop(self._open)[2]
+        entry[1] = False
+        return entry[0]
+
+    def __bool__(self):
+        return self.f_min is not None
+
+
+class ConstraintTable:
+    """
+    Constraints on one robot, hashed for O(1) lookup by the low-level search.
+    A vertex constraint (cell, t) forbids being at cell at time t; an edge
+    constraint (a, b, t) forbids moving from a to b arriving at time t.
+    """
+
+    def __init__(self, constraints=()):
+        self.vertex = set()
+        self.edge = set()
+        self.last_on = {}  # cell -> latest constrained time
+        self.latest = 0
+        for c in constraints:
+            self.add(c)
+
+    def add(self, constraint):
+        if len(constraint) == 2:
+            cell, t = constraint
+            self.vertex.add(constraint)
+            self.last_on[cell] = max(self.last_on.get(cell, -1), t)
+        else:
+            t = constraint[2]
+            self.edge.add(constraint)
+        self.latest = max(self.latest, t)
+
+    def allows(self, cell, nxt, t):
+        return (nxt, t) not in self.vertex and (cell, nxt, t) not in self.edge
+
+
+class Reservations:
+    """
+    Where the other robots are, for counting conflicts of a candidate move.
+    Paths are added and removed incrementally so one table serves a whole
+    constraint tree expansion. Nothing past `horizon` is recorded.
+    """
+
+    def __init__(self, paths=(), horizon=None):
+        self.vertex = {}
+        self.edge = {}
+        self.parked = {}  # goal cell -> arrival times of robots resting there
+        self.horizon = horizon
+        for path in paths:
+            self.add(path)
+
+    def add(self, path, sign=1):
+        vertex, edge = self.vertex, self.edge
+        if self.horizon is not None and len(path) > self.horizon + 1:
+            path = path[:self.horizon + 1]
+            parks = False
+        else:
+            parks = True
+        for t, cell in enumerate(path):
+            vertex[(cell, t)] = vertex.get((cell, t), 0) + sign
+            if t:
+                key = (path[t - 1], cell, t)
+                edge[key] = edge.get(key, 0) + sign
+        if not parks:
+            return
+        if sign > 0:
+            self.parked.setdefault(path[-1], []).append(len(path) - 1)
+        else:
+            self.parked[path[-1]].remove(len(path) - 1)
+
+    def remove(self, path):
+        self.add(path, sign=-1)
+
+    def count(self, cell, nxt, t):
+        n = self.vertex.get((nxt, t), 0) + self.edge.get((nxt, cell, t), 0)
+        if self.horizon is not None and t > self.horizon:
+            return n
+        for arrival in self.parked.get(nxt, ()):
+            if t > arrival:
+                n += 1
+        return n
+
+
+def distance_map(grid, goal):
+    """BFS distance from every reachable free cell to goal (perfect heuristic)."""
+    moves = grid.moves()
+    dist = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        cell = queue.popleft()
+        for n in moves[cell]:
+            if n not in dist:
+                dist[n] = dist[cell] + 1
+                queue.append(n)
+    return dist
+
+
+def space_time_astar(grid, start, goal, table, h, w=1.0, reservations=None, horizon=None):
+    """
+    Low-level search over (cell, t) states; every move or wait costs 1.
+    With w > 1 and reservations it is a focal search that prefers fewer
+    conflicts with other robots within w times the optimal cost.
+    With a horizon (beyond every constraint) the search stops at that depth
+    and finishes by walking down the heuristic, which is exact there.
+    Returns (cells indexed by time, lower bound on cost) or (None, None).
+    """
+    if start not in h:
+        return None, None
+    # Past the last constraint nothing can block, so any longer path is wasted
+    max_t = table.latest + len(h)
+    moves = grid.moves()
+
+    queue = FocalQueue(w)
+    queue.push(h[start], (0, h[start], 0), (start, 0, 0, None))
+    closed = set()
+    while queue:
+        f_min = queue.f_min
+        node = queue.pop()
+        cell, t, conflicts, parent = node
+        if (cell, t) in closed:
+            continue
+        closed.add((cell, t))
+
+        done = cell == goal and t > table.last_on.get(goal, -1)
+        if done or (horizon is not None and t >= horizon):
+            path = []
+            while node is not None:
+                path.append(node[0])
+                node = node[3]
+            path.reverse()
+            while cell != goal:
+                cell = min(moves[cell], key=h.__getitem__)
+                path.append(cell)
+            return path, f_min
+
+        if t >= max_t:
+            continue
+        for nxt in moves[cell]:
+            if nxt not in h or (nxt, t + 1) in closed or not table.allows(cell, nxt, t + 1):
+                continue
+            c = conflicts
+            if reservations is not None:
+                c += reservations.count(cell, nxt, t + 1)
+            f = t + 1 + h[nxt]
+            # Secondary key: fewest conflicts, then lowest f, then deepest
+            queue.push(f, (c, f, -t - 1), (nxt, t + 1, c, node))
+    return None, None
+
+
+def find_conflicts(paths, horizon=None):
+    """
+    All pairwise conflicts between robot paths (robots rest on their goal),
+    up to time `horizon` if given.
+    A conflict is (a, b, constraint_for_a, constraint_for_b).
+    """
+    conflicts = []
+    end = max((len(p) for p in paths.values()), default=0)
+    if horizon is not None:
+        end = min(end, horizon + 1)
+    prev = {}
+    for t in range(end):
+        seen = {}
+        moves = {}
+        for rid, path in paths.items():
+            cell = path[min(t, len(path) - 1)]
+            if cell in seen:
+                other = seen[cell]
+                conflicts.append((other, rid, (cell, t), (cell, t)))
+            else:
+                seen[cell] = rid
+            if t:
+                before = prev[rid]
+                if before != cell:
+                    moves[(before, cell)] = rid
+                    other = moves.get((cell, before))
+                    if other is not None:
+                        conflicts.append((other, rid, (cell, before, t), (before, cell, t)))
+            prev[rid] = cell
+    return conflicts
+
+
+class CTNode:
+    """Constraint tree node of (E)CBS."""
+
+    def __init__(self, constraints, paths, bounds, horizon=None):
+        self.constraints = constraints  # robot_id -> tuple of constraints
+        self.paths = paths              # robot_id -> [cell, ...]
+        self.bounds = bounds            # robot_id -> low-level cost lower bound
+        self.cost = sum(len(p) - 1 for p in paths.values())
+        self.lower_bound = sum(bounds.values())
+        self.conflicts = find_conflicts(paths, horizon)
+
 
 class Planner:
+    """
+    Conflict-Based Search over a core.grid.Grid in space-time.
+
+    algorithm="cbs" returns sum-of-costs optimal plans; algorithm="ecbs"
+    runs Enhanced CBS, bounded by `suboptimality` times the optimum, with
+    focal searches at both levels that prefer fewer conflicts. The search
+    gives up (plan.success = False) after time_limit seconds or max_nodes
+    constraint tree expansions.
+    """
+
+    def __init__(self, algorithm="cbs", suboptimality=1.5, robot_radius=1.0,
+                 time_limit=30.0, max_nodes=100000):
+        self.algorithm = algorithm
+        self.w = 1.0 if algorithm == "cbs" else suboptimality
+        self.robot_radius = robot_radius
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+
+        # goal cell -> BFS distances, reused until the grid's obstacles change
+        self._heuristics = {}
+        self._heuristics_version = None
+
+    def heuristic(self, grid, goal):
+        if self._heuristics_version != grid.obstacle_version:
+            self._heuristics = {}
+            self._heuristics_version = grid.obstacle_version
+        h = self._heuristics.get(goal)
+        if h is None:
+            h = self._heuristics[goal] = distance_map(grid, goal)
+        return h
+
+    # --- Start / goal assignment ---
+    def _nearest_unused(self, grid, cell, used):
+        """Closest free cell to `cell` not in `used` (BFS through free cells)."""
+        cell = grid.clamp(cell)
+        seen = {cell}
+        queue = deque([cell])
+        while queue:
+            c = queue.popleft()
+            if grid.is_free(c) and c not in used:
+                return c
+            cx, cy = c
+            for n in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                if grid.in_bounds(n) and n not in seen:
+                    seen.add(n)
+                    queue.append(n)
+        return None
+
+    def endpoints(self, world, grid):
+        """Distinct free start and goal cells per robot id."""
+        starts, goals = {}, {}
+        used_starts, used_goals = set(), set()
+        region = world.target_region
+        for robot in world.robots:
+            start = self._nearest_unused(grid, grid.world_to_cell(robot.x, robot.y), used_starts)
+            target = robot.target
+            if target is None:
+                target = (region.x + region.w / 2, region.y + region.h / 2)
+            goal = self._nearest_unused(grid, grid.world_to_cell(*target), used_goals)
+            if start is None or goal is None:
+                return None, None
+            starts[robot.id] = start
+            goals[robot.id] = goal
+            used_starts.add(start)
+            used_goals.add(goal)
+        return starts, goals
+
+    # --- High level ---
     def plan(self, world, grid):
         plan = DiscretePlan()
-        # TODO: CBS or prioritized planning
+        grid.mark_obstacles(world, self.robot_radius)
+
+        starts, goals = self.endpoints(world, grid)
+        if starts is None:
+            return plan
+
+        root = self.search(grid, starts, goals)
+        if root is None:
+            return plan
+        node, plan.expanded = root
+
+        plan.success = True
+        plan.cost = node.cost
+        plan.paths = {
+            rid: [(cell, t) for t, cell in enumerate(path)]
+            for rid, path in node.paths.items()
+        }
         return plan
+
+    def search(self, grid, starts, goals, horizon=None, initial_paths=None):
+        """
+        Run (E)CBS. Returns (conflict-free node, nodes expanded) or None.
+        With a horizon only conflicts up to that time step are resolved.
+        initial_paths seeds the root with still-valid paths (starting at the
+        robot's start and ending at its goal) instead of searching again.
+        """
+        deadline = time.perf_counter() + self.time_limit
+
+        # Robots are planned one by one at the root, each avoiding the
+        # ones before it where the focal bound allows
+        paths, bounds = {}, {}
+        reservations = Reservations(horizon=horizon) if self.w > 1.0 else None
+        for rid in starts:
+            path = initial_paths.get(rid) if initial_paths else None
+            if path and path[0] == starts[rid] and path[-1] == goals[rid]:
+                bound = self.heuristic(grid, goals[rid]).get(starts[rid], len(path) - 1)
+            else:
+                path, bound = self._replan(grid, rid, starts, goals, (), reservations, horizon)
+                if path is None:
+                    return None
+            paths[rid], bounds[rid] = path, bound
+            if reservations is not None:
+                reservations.add(path)
+
+        queue = FocalQueue(self.w)
+        self._push(queue, CTNode({}, paths, bounds, horizon))
+
+        expanded = 0
+        while queue:
+            if expanded >= self.max_nodes or time.perf_counter() > deadline:
+                return None
+            node = queue.pop()
+            expanded += 1
+            if not node.conflicts:
+                return node, expanded
+
+            reservations = None
+            if self.w > 1.0:
+                reservations = Reservations(node.paths.values(), horizon)
+
+            a, b, constraint_a, constraint_b = node.conflicts[0]
+            for rid, constraint in ((a, constraint_a), (b, constraint_b)):
+                constraints = dict(node.constraints)
+                constraints[rid] = constraints.get(rid, ()) + (constraint,)
+                if reservations is not None:
+                    reservations.remove(node.paths[rid])
+                path, bound = self._replan(
+                    grid, rid, starts, goals, constraints[rid], reservations, horizon
+                )
+                if reservations is not None:
+                    reservations.add(node.paths[rid])
+                if path is None:
+                    continue
+                paths = dict(node.paths)
+                paths[rid] = path
+                bounds = dict(node.bounds)
+                # More constraints never make the optimum cheaper
+                bounds[rid] = max(bound, node.bounds[rid])
+                self._push(queue, CTNode(constraints, paths, bounds, horizon))
+        return None
+
+    def _push(self, queue, node):
+        if self.w == 1.0:
+            queue.push(node.cost, len(node.conflicts), node)
+        else:
+            # ECBS: OPEN by lower bound, FOCAL holds nodes costing within w of it
+            queue.push(node.lower_bound, len(node.conflicts), node, focal_value=node.cost)
+
+    def _replan(self, grid, rid, starts, goals, constraints, reservations, horizon=None):
+        return space_time_astar(
+            grid, starts[rid], goals[rid], ConstraintTable(constraints),
+            self.heuristic(grid, goals[rid]), self.w, reservations, horizon
+        )
+
+
+class RollingHorizonPlanner:
+    """
+    Windowed (E)CBS for long-running fleets. Conflicts are only resolved
+    `window` steps ahead and the fleet replans every `replan_every` ticks
+    from wherever it stands, so planning cost follows the window, not the
+    full horizon. Each replan reuses the previous search: its remaining
+    paths seed the root and the per-goal heuristic tables are kept.
+
+    A short window can livelock robots that keep dodging each other just
+    past it, so while some robot has made no progress for `patience`
+    replans in a row the window doubles, up to max_window.
+    """
+
+    def __init__(self, planner=None, window=10, replan_every=5, max_window=None, patience=2):
+        self.planner = planner or Planner("ecbs")
+        self.window = window
+        self.max_window = max_window or 8 * window
+        self.patience = patience
+        # Replanning less often than the window would leave unchecked steps
+        self.replan_every = max(1, min(replan_every, window))
+        self.reset()
+
+    def reset(self):
+        self.tick = 0
+        self.goals = None
+        self.positions = {}  # robot_id -> current cell
+        self.paths = {}      # robot_id -> remaining cells, starting at the current one
+        self.replans = 0
+        self.horizon = self.window
+        self._distances = {}  # robot_id -> distance to goal at the last replan
+        self._stalls = {}     # robot_id -> replans in a row without progress
+
+    def step(self, world, grid):
+        """Advance one tick. Returns robot_id -> cell to occupy after it."""
+        if self.goals is None:
+            grid.mark_obstacles(world, self.planner.robot_radius)
+            self.positions, self.goals = self.planner.endpoints(world, grid)
+            if self.positions is None:
+                self.positions, self.goals = {}, None
+                return {}
+
+        if self.tick % self.replan_every == 0 or grid.obstacle_version != world.obstacle_version:
+            self.replan(world, grid)
+
+        for rid, path in self.paths.items():
+            if len(path) > 1:
+                self.paths[rid] = path = path[1:]
+            self.positions[rid] = path[0]
+        self.tick += 1
+        return dict(self.positions)
+
+    def replan(self, world, grid):
+        # Old paths may cross new obstacles, so only reuse them on an unchanged map
+        reuse = self.paths if grid.obstacle_version == world.obstacle_version else None
+        grid.mark_obstacles(world, self.planner.robot_radius)
+
+        stalled = False
+        for rid, cell in self.positions.items():
+            d = self.planner.heuristic(grid, self.goals[rid]).get(cell, 0)
+            if d and d >= self._distances.get(rid, float('inf')):
+                self._stalls[rid] = self._stalls.get(rid, 0) + 1
+                stalled = stalled or self._stalls[rid] >= self.patience
+            else:
+                self._stalls[rid] = 0
+            self._distances[rid] = d
+        self.horizon = min(2 * self.horizon, self.max_window) if stalled else self.window
+
+        result = self.planner.search(
+            grid, self.positions, self.goals,
+            horizon=self.horizon, initial_paths=reuse
+        )
+        self.replans += 1
+        if result is not None:
+            self.paths = result[0].paths
+        elif not self.paths:
+            # Nothing to fall back on: hold position until the next replan
+            self.paths = {rid: [cell] for rid, cell in self.positions.items()}
+
+    @property
+    def finished(self):
+        return self.goals is not None and all(
+            self.positions[rid] == goal for rid, goal in self.goals.items()
+        )
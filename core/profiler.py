@@ -0,0 +1,146 @@
+# core/profiler.py
+"""
+Per-frame timing scopes and counters for the hot paths.
+
+    from core.profiler import PROFILER
+
+    with PROFILER.scope("update"):
+        ...
+    if PROFILER.enabled:
+        PROFILER.count("rays cast", n)
+
+PROFILER.frame() closes a frame: its scope totals and counters go into a
+rolling history (see breakdown) and, as complete events, into a trace that
+export_trace() writes in the Chrome trace-event format (chrome://tracing,
+Perfetto, speedscope).
+
+Disabled (the default), scope() hands back one shared no-op context
+manager and counters sit behind an `enabled` check, so instrumented code
+pays an attribute lookup and a call.
+"""
+import collections
+import json
+import os
+import threading
+import time
+
+HISTORY = 120          # frames in the rolling breakdown
+MAX_EVENTS = 1_000_000  # trace events kept; the oldest are dropped first
+
+
+class _NullScope:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.profiler._close(self.name, self.start, end)
+        return False
+
+
+class Profiler:
+    def __init__(self, history=HISTORY, max_events=MAX_EVENTS):
+        self.enabled = False
+        self.frames = collections.deque(maxlen=history)  # (frame ns, {scope: ns}, {counter: n})
+        self.events = collections.deque(maxlen=max_events)
+        self._reset_frame()
+
+    def _reset_frame(self):
+        self.totals = {}
+        self.counters = {}
+        self.frame_start = time.perf_counter_ns()
+
+    def enable(self, on=True):
+        """Switch recording on or off; switching on starts from an empty history."""
+        if on and not self.enabled:
+            self.frames.clear()
+            self.events.clear()
+            self._reset_frame()
+        self.enabled = on
+
+    # --- Recording ---
+    def scope(self, name):
+        """Context manager timing the block under name (nested scopes are fine)."""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def _close(self, name, start, end):
+        self.totals[name] = self.totals.get(name, 0) + end - start
+        self.events.append((name, start, end - start, threading.get_ident()))
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def frame(self):
+        """End the current frame and start the next one."""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.frames.append((now - self.frame_start, self.totals, self.counters))
+        self.events.append(("frame", self.frame_start, now - self.frame_start, None))
+        if self.counters:
+            self.events.append((self.counters, now, None, None))
+        self.totals = {}
+        self.counters = {}
+        self.frame_start = now
+
+    # --- Reporting ---
+    def breakdown(self):
+        """
+        (frame ms, {scope: ms}, {counter: value}) averaged over the rolling
+        history, scopes in order of cost. None before the first frame.
+        """
+        if not self.frames:
+            return None
+        n = len(self.frames)
+        scopes, counters = {}, {}
+        for _, totals, counts in self.frames:
+            for name, ns in totals.items():
+                scopes[name] = scopes.get(name, 0) + ns
+            for name, value in counts.items():
+                counters[name] = counters.get(name, 0) + value
+        frame_ms = sum(f[0] for f in self.frames) / n / 1e6
+        scopes = {k: v / n / 1e6 for k, v in sorted(scopes.items(), key=lambda kv: -kv[1])}
+        counters = {k: v / n for k, v in counters.items()}
+        return frame_ms, scopes, counters
+
+    def export_trace(self, path):
+        """Write the recorded events as a Chrome trace-event JSON file. Returns the event count."""
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for name, start, duration, thread in self.events:
+            if duration is None:
+                # Counter sample: one track per counter in the viewer
+                for key, value in name.items():
+                    events.append({"name": key, "ph": "C", "ts": start / 1000, "pid": pid,
+                                   "args": {"value": value}})
+                continue
+            tid = threads.setdefault(thread, len(threads))
+            events.append({"name": name, "ph": "X", "ts": start / 1000, "dur": duration / 1000,
+                           "pid": pid, "tid": tid, "cat": "frame" if thread is None else "scope"})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+
+PROFILER = Profiler()
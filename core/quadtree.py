@@ -0,0 +1,311 @@
+# core/quadtree.py
+import heapq
+import math
+from core.geometry import LineSegment, Rectangle, point_to_segment_distance
+
+EPS = 1e-6
+
+
+class QuadNode:
+    def __init__(self, x0, y0, w, h):
+        self.x0 = x0
+        self.y0 = y0
+        self.w = w
+        self.h = h
+        self.children = None  # [bottom-left, bottom-right, top-left, top-right]
+        self.index = -1       # leaf index into OccupancyGrid.cells
+        self.free = 0         # number of free leaves in this subtree
+
+    @property
+    def is_leaf(self):
+        return self.children is None
+
+    def touches(self, x0, y0, x1, y1):
+        """True if this node's closed box overlaps [x0, x1] x [y0, y1]."""
+        return (self.x0 <= x1 + EPS and self.x0 + self.w >= x0 - EPS and
+                self.y0 <= y1 + EPS and self.y0 + self.h >= y0 - EPS)
+
+
+class OccupancyGrid:
+    """
+    Adaptive quadtree over the world plus a precomputed adjacency graph.
+
+    cells[i] is the (x0, y0, w, h, is_free) tuple of leaf i, so the grid can
+    still be iterated like the old list of cells. neighbors[i] maps every free
+    leaf touching free leaf i (edge or corner) to the center-to-center cost.
+
+    Leaf indices are stable across incremental updates: a leaf that gets
+    merged or split leaves a None slot in cells, reused by later leaves.
+    """
+
+    def __init__(self, world, robot_radius, base_grid, min_grid, width, height):
+        self.world = world
+        self.robot_radius = robot_radius
+        self.base_grid = base_grid
+        self.min_grid = min_grid
+
+        self.version = world.obstacle_version
+
+        self.cells = []
+        self.nodes = []   # leaf QuadNodes, parallel to cells
+        self.neighbors = []
+        self._free_slots = []
+
+        # Per-region cost-to-go fields, tagged with the version they were built for
+        self.cost_fields = {}
+        # Per-cluster-size HPA* graphs, likewise (see core/hierarchy.py)
+        self.abstract_graphs = {}
+
+        self.root = QuadNode(0, 0, width, height)
+        self._subdivide(self.root)
+        self._build_adjacency()
+
+    # --- Sequence protocol (old list-of-tuples API) ---
+    def __iter__(self):
+        return (cell for cell in self.cells if cell is not None)
+
+    def __len__(self):
+        return len(self.cells) - len(self._free_slots)
+
+    def __getitem__(self, i):
+        return self.cells[i]
+
+    def center(self, i):
+        x0, y0, w, h, _ = self.cells[i]
+        return (x0 + w / 2, y0 + h / 2)
+
+    # --- Point location ---
+    def locate(self, x, y):
+        """Index of the leaf containing (x, y), by quadtree descent."""
+        node = self.root
+        while node.children is not None:
+            right = x >= node.x0 + node.w / 2
+            top = y >= node.y0 + node.h / 2
+            node = node.children[2 * top + right]
+        return node.index
+
+    def nearest_free(self, x, y):
+        """
+        Index of the free leaf whose center is closest to (x, y), or -1.
+        Best-first search over the quadtree, skipping subtrees with no free
+        leaves; a node's box distance is a lower bound for its centers.
+        """
+        if self.root.free == 0:
+            return -1
+        heap = [(0.0, 0, self.root)]
+        tie = 1
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            if node.children is None:
+                return node.index
+            for child in node.children:
+                if child.free == 0:
+                    continue
+                if child.children is None:
+                    cx, cy = child.x0 + child.w / 2, child.y0 + child.h / 2
+                    d = math.hypot(cx - x, cy - y)
+                else:
+                    dx = max(child.x0 - x, 0.0, x - child.x0 - child.w)
+                    dy = max(child.y0 - y, 0.0, y - child.y0 - child.h)
+                    d = math.hypot(dx, dy)
+                heapq.heappush(heap, (d, tie, child))
+                tie += 1
+        return -1
+
+    # --- Quadtree construction ---
+    def _obstacle_near(self, obs, node):
+        r = self.robot_radius
+        if isinstance(obs, Rectangle):
+            # Broad phase: obstacle within the cell's bounding box (expanded by radius)
+            return (obs.x < node.x0 + node.w + r and obs.x + obs.w > node.x0 - r and
+                    obs.y < node.y0 + node.h + r and obs.y + obs.h > node.y0 - r)
+        if isinstance(obs, LineSegment):
+            # Conservative check: if distance < radius + half_diagonal, it might intersect
+            mid_x, mid_y = node.x0 + node.w / 2, node.y0 + node.h / 2
+            half_diag = math.hypot(node.w, node.h) / 2
+            return point_to_segment_distance(mid_x, mid_y, obs.p1, obs.p2) < r + half_diag
+        return False
+
+    def _near_obstacle(self, node):
+        r = self.robot_radius
+        m = r + math.hypot(node.w, node.h) / 2
+        mid_x, mid_y = node.x0 + node.w / 2, node.y0 + node.h / 2
+
+        # The clearance at the center usually decides it without touching an
+        # obstacle: nothing within reach of the box expanded by r (what a
+        # rectangle is tested against) means far, a segment closer than m
+        # means near; a rectangle that close might still miss the box
+        field = self.world.clearance
+        if field is not None:
+            verdict = field.classify(mid_x, mid_y, math.hypot(node.w / 2 + r, node.h / 2 + r),
+                                     None if field.rectangles else m)
+            if verdict is not None:
+                return not verdict
+
+        # Broad phase: only obstacles whose AABB reaches the node's box
+        # expanded by the largest margin _obstacle_near can accept
+        candidates = self.world.obstacle_index.query_aabb(
+            mid_x - m, mid_y - m, mid_x + m, mid_y + m)
+        for obs in candidates:
+            if self._obstacle_near(obs, node):
+                return True
+        return False
+
+    def _should_split(self, node, near_obs):
+        # Near obstacles refine down to min_grid, free space only down to base_grid
+        return node.w > (self.min_grid if near_obs else self.base_grid)
+
+    def _add_leaf(self, node, is_free, dirty=None):
+        cell = (node.x0, node.y0, node.w, node.h, is_free)
+        if self._free_slots:
+            node.index = self._free_slots.pop()
+            self.cells[node.index] = cell
+            self.nodes[node.index] = node
+        else:
+            node.index = len(self.cells)
+            self.cells.append(cell)
+            self.nodes.append(node)
+            self.neighbors.append({})
+        node.free = 1 if is_free else 0
+        if dirty is not None:
+            dirty.add(node.index)
+
+    def _subdivide(self, node, dirty=None):
+        near_obs = self._near_obstacle(node)
+
+        if not self._should_split(node, near_obs):
+            # Leaf: if near_obs is still True we hit min_grid, so it's occupied
+            self._add_leaf(node, not near_obs, dirty)
+            return
+
+        hw, hh = node.w / 2, node.h / 2
+        x0, y0 = node.x0, node.y0
+        node.children = [
+            QuadNode(x0, y0, hw, hh),
+            QuadNode(x0 + hw, y0, hw, hh),
+            QuadNode(x0, y0 + hh, hw, hh),
+            QuadNode(x0 + hw, y0 + hh, hw, hh),
+        ]
+        for child in node.children:
+            self._subdivide(child, dirty)
+        node.free = sum(child.free for child in node.children)
+
+    # --- Adjacency ---
+    def leaves_touching(self, x0, y0, x1, y1):
+        """Indices of all leaves whose closed box overlaps [x0, x1] x [y0, y1]."""
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if not node.touches(x0, y0, x1, y1):
+                continue
+            if node.children is None:
+                found.append(node.index)
+            else:
+                stack.extend(node.children)
+        return found
+
+    def _link(self, i):
+        """Connect free leaf i to every free leaf it shares an edge or corner with."""
+        x0, y0, w, h, _ = self.cells[i]
+        cx, cy = x0 + w / 2, y0 + h / 2
+        edges = self.neighbors[i]
+        for j in self.leaves_touching(x0, y0, x0 + w, y0 + h):
+            if j == i or not self.cells[j][4]:
+                continue
+            nx0, ny0, nw, nh, _ = self.cells[j]
+            edges[j] = math.hypot(nx0 + nw / 2 - cx, ny0 + nh / 2 - cy)
+
+    def _unlink(self, i):
+        for j in self.neighbors[i]:
+            self.neighbors[j].pop(i, None)
+        self.neighbors[i] = {}
+
+    def _build_adjacency(self):
+        self.neighbors = [{} for _ in self.cells]
+        for i, cell in enumerate(self.cells):
+            if cell[4]:
+                self._link(i)
+
+    # --- Incremental updates ---
+    def sync(self):
+        """
+        Bring the grid up to date with world.obstacles by replaying the
+        obstacle journal. Returns False if the journal no longer reaches
+        back to this grid's version, in which case the caller must rebuild.
+        """
+        changes = self.world.obstacles.changes_since(self.version)
+        if changes is None:
+            return False
+        self.update(obs for _, obs in changes)
+        self.version = self.world.obstacle_version
+        return True
+
+    def update(self, changed_obstacles):
+        """
+        Re-subdivide only the cells whose inflated box overlaps one of the
+        added or removed obstacles, then patch the adjacency around them.
+        world.obstacles must already reflect the change.
+        """
+        dirty = set()
+        for obs in changed_obstacles:
+            self._refresh(self.root, obs, dirty)
+
+        for i in dirty:
+            cell = self.cells[i]
+            if cell is None or not cell[4]:
+                continue
+            self._link(i)
+            for j, cost in self.neighbors[i].items():
+                self.neighbors[j][i] = cost
+
+    def add_obstacle(self, obs):
+        self.update([obs])
+
+    def remove_obstacle(self, obs):
+        self.update([obs])
+
+    def _refresh(self, node, obs, dirty):
+        # Cells the changed obstacle can't reach keep their old decision,
+        # and a child never reaches further than its parent
+        if not self._obstacle_near(obs, node):
+            return
+
+        near_obs = self._near_obstacle(node)
+        if self._should_split(node, near_obs):
+            if node.children is None:
+                self._release(node, dirty)
+                self._subdivide(node, dirty)
+            else:
+                for child in node.children:
+                    self._refresh(child, obs, dirty)
+                node.free = sum(child.free for child in node.children)
+            return
+
+        if node.children is not None:
+            # Obstacle removed: collapse the subtree back into one leaf
+            self._release(node, dirty)
+            node.children = None
+            self._add_leaf(node, not near_obs, dirty)
+        elif self.cells[node.index][4] == near_obs:
+            i = node.index
+            self._unlink(i)
+            self.cells[i] = (node.x0, node.y0, node.w, node.h, not near_obs)
+            node.free = 0 if near_obs else 1
+            dirty.add(i)
+
+    def _release(self, node, dirty):
+        """Free the leaf slots of node's subtree."""
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            if n.children is not None:
+                stack.extend(n.children)
+                continue
+            i = n.index
+            self._unlink(i)
+            self.cells[i] = None
+            self.nodes[i] = None
+            self._free_slots.append(i)
+            dirty.add(i)
+            n.index = -1
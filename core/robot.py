@@ -1,23 +1,74 @@
 # core/robot.py
 
 import math
-from simulation.sensors import raycast
+import numpy as np
+from core.fleet import FleetState
+from simulation.sensors import circle_array, raycast, raycast_many, segment_array
+
+
+def _column(name, index=None):
+    """Property reading and writing robot.fleet.<name>[robot.row] (at column index)."""
+    if index is None:
+        def get(self):
+            return float(getattr(self.fleet, name)[self.row])
+
+        def set(self, value):
+            getattr(self.fleet, name)[self.row] = value
+    else:
+        def get(self):
+            return float(getattr(self.fleet, name)[self.row, index])
+
+        def set(self, value):
+            getattr(self.fleet, name)[self.row, index] = value
+
+    return property(get, set)
 
 
 class Robot:
+    # Kinematic state lives in a FleetState row (see core/fleet.py)
+    x = _column("pos", 0)
+    y = _column("pos", 1)
+    vx = _column("vel", 0)
+    vy = _column("vel", 1)
+    radius = _column("radius")
+    speed = _column("speed")
+
     def __init__(self, robot_id, position, radius=1.0, speed=10.0):
         self.id = robot_id
-        self.x, self.y = position
-        self.radius = radius
-        self.speed = speed
         self.target = None
-        # velocity
-        self.vx = 0.0
-        self.vy = 0.0
+        # A new robot gets a one-row fleet of its own until World adopts it
+        self.fleet = None
+        self.row = -1
+        FleetState(capacity=1).add(self, position, radius, speed)
 
-        # ---- ESO-MAPF attributes ----
-        self.path = []        # list of waypoints [(x, y), ...]
-        self.path_index = 0   # which waypoint we're moving toward
+    @classmethod
+    def attach(cls, fleet, row, robot_id):
+        """Robot viewing an already filled row of fleet, without a fleet of its own."""
+        robot = cls.__new__(cls)
+        robot.id = robot_id
+        robot.target = None
+        robot.fleet, robot.row = fleet, row
+        return robot
+
+    # ---- ESO-MAPF attributes ----
+    @property
+    def path(self):
+        """List of waypoints [(x, y), ...]."""
+        return self.fleet.paths[self.row]
+
+    @path.setter
+    def path(self, path):
+        self.fleet.paths[self.row] = path
+        self.fleet.retarget(self.row)
+
+    @property
+    def path_index(self):
+        """Which waypoint we're moving toward."""
+        return int(self.fleet.path_index[self.row])
+
+    @path_index.setter
+    def path_index(self, index):
+        self.fleet.set_path_index(self.row, index)
 
     @property
     def position(self):
@@ -43,26 +94,37 @@ class Robot:
 
     def sense(self, direction, world, max_range=20.0):
         """
-        direction: angle in radians
-        Returns distance to nearest object.
+        direction: angle in radians, or a sequence of angles
+        Returns distance to nearest object (an array for several angles).
         """
-        dx = math.cos(direction)
-        dy = math.sin(direction)
-
-        return raycast(
-            origin=(self.x, self.y),
-            direction=(dx, dy),
-            obstacles=world.obstacles,
-            robots=world.robots,
-            max_range=max_range,
-            self_robot=self
+        if isinstance(direction, (int, float)):
+            # One ray: walking the obstacle index beats NumPy's call overhead
+            return raycast(
+                origin=(self.x, self.y),
+                direction=(math.cos(direction), math.sin(direction)),
+                obstacles=world.obstacle_index,
+                robots=world.robots,
+                max_range=max_range,
+                self_robot=self
+            )
+
+        # Several rays: one batched call against what max_range can reach
+        angles = np.asarray(direction, dtype=float)
+        r = max_range
+        obstacles = world.obstacle_index.query_aabb(self.x - r, self.y - r, self.x + r, self.y + r)
+        others = [o for o in world.robots_near(self.x, self.y, r) if o is not self]
+        return raycast_many(
+            origins=np.tile((self.x, self.y), (len(angles), 1)),
+            directions=np.column_stack((np.cos(angles), np.sin(angles))),
+            segments=segment_array(obstacles),
+            circles=circle_array(others),
+            max_range=max_range
         )
 
     # ---- NEW ESO-MAPF methods ----
     def set_path(self, path):
         """Assign a path (list of waypoints) to this robot."""
-        self.path = path
-        self.path_index = 0
+        self.fleet.set_path(self.row, path)
 
     def update_along_path(self, dt, speed=10.0):
         """
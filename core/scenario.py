@@ -0,0 +1,178 @@
+# core/scenario.py
+"""
+Scenario files: obstacles, start/target regions, robots and their targets.
+
+Two variants of format version 1:
+
+- Binary (any extension but .json, ".dip" by convention): a fixed 128-byte
+  header followed by packed little-endian float64 arrays, each starting on
+  an 8-byte boundary, so read_arrays() can memory-map a map with 100k+
+  segments without parsing it.
+- JSON: the same content, human-readable.
+
+    header  "<4sHHdd4d4dIII": magic, version, flags, width, height,
+            start region (x, y, w, h), target region (x, y, w, h),
+            segment count, rectangle count, robot count
+    segments    (n, 4)  x1, y1, x2, y2
+    rectangles  (n, 4)  x, y, w, h
+    robots      (n, 7)  id, x, y, radius, speed, target x, target y (nan: none)
+"""
+import json
+import mmap
+import struct
+
+import numpy as np
+
+from core.geometry import LineSegment, Rectangle
+
+MAGIC = b"DIPS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHdd4d4dIII")
+HEADER_SIZE = 128
+ROBOT_COLUMNS = 7
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+def _align(offset):
+    return -(-offset // 8) * 8
+
+
+# --- World <-> arrays ---
+def world_arrays(world):
+    """Scenario content of world as a dict of plain values and float64 arrays."""
+    segments = [(*o.p1, *o.p2) for o in world.obstacles if isinstance(o, LineSegment)]
+    rectangles = [(o.x, o.y, o.w, o.h) for o in world.obstacles if isinstance(o, Rectangle)]
+    robots = [
+        (r.id, r.x, r.y, r.radius, r.speed, *(r.target if r.target is not None else (np.nan, np.nan)))
+        for r in world.robots
+    ]
+    region = lambda r: (r.x, r.y, r.w, r.h)
+    return {
+        "width": float(world.width),
+        "height": float(world.height),
+        "start_region": region(world.start_region),
+        "target_region": region(world.target_region),
+        "segments": np.array(segments, dtype=float).reshape(-1, 4),
+        "rectangles": np.array(rectangles, dtype=float).reshape(-1, 4),
+        "robots": np.array(robots, dtype=float).reshape(-1, ROBOT_COLUMNS),
+    }
+
+
+# --- Binary ---
+def write_binary(arrays, path):
+    sections = [arrays["segments"], arrays["rectangles"], arrays["robots"]]
+    header = HEADER.pack(
+        MAGIC, VERSION, 0, arrays["width"], arrays["height"],
+        *arrays["start_region"], *arrays["target_region"],
+        *(len(a) for a in sections)
+    )
+    with open(path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        for a in sections:
+            f.write(np.ascontiguousarray(a, dtype="<f8").tobytes())
+
+
+def read_binary(path, mmap_mode=True):
+    """
+    Arrays of a binary scenario file. With mmap_mode the arrays are
+    read-only views onto a memory map of the file, so nothing is parsed or
+    copied until it is used.
+    """
+    with open(path, "rb") as f:
+        if mmap_mode:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = f.read()
+    if len(buf) < HEADER_SIZE:
+        raise ScenarioError(f"{path}: too short for a scenario header")
+
+    fields = HEADER.unpack_from(buf, 0)
+    magic, version = fields[0], fields[1]
+    if magic != MAGIC:
+        raise ScenarioError(f"{path}: not a scenario file")
+    if version > VERSION:
+        raise ScenarioError(f"{path}: format version {version} is newer than supported ({VERSION})")
+
+    width, height = fields[3:5]
+    start_region, target_region = fields[5:9], fields[9:13]
+    counts = fields[13:16]
+
+    arrays = {
+        "width": width,
+        "height": height,
+        "start_region": start_region,
+        "target_region": target_region,
+    }
+    offset = HEADER_SIZE
+    for name, n, columns in zip(("segments", "rectangles", "robots"), counts, (4, 4, ROBOT_COLUMNS)):
+        offset = _align(offset)
+        size = n * columns * 8
+        if offset + size > len(buf):
+            raise ScenarioError(f"{path}: truncated {name} section")
+        arrays[name] = np.frombuffer(buf, dtype="<f8", count=n * columns, offset=offset).reshape(n, columns)
+        offset += size
+    return arrays
+
+
+# --- JSON ---
+def write_json(arrays, path):
+    robots = []
+    for rid, x, y, radius, speed, tx, ty in arrays["robots"].tolist():
+        robots.append({
+            "id": int(rid), "position": [x, y], "radius": radius, "speed": speed,
+            "target": None if np.isnan(tx) else [tx, ty],
+        })
+    doc = {
+        "format": "dip-scenario",
+        "version": VERSION,
+        "width": arrays["width"],
+        "height": arrays["height"],
+        "start_region": list(arrays["start_region"]),
+        "target_region": list(arrays["target_region"]),
+        "segments": arrays["segments"].tolist(),
+        "rectangles": arrays["rectangles"].tolist(),
+        "robots": robots,
+    }
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=1)
+
+
+def read_json(path):
+    with open(path) as f:
+        doc = json.load(f)
+    if doc.get("format") != "dip-scenario":
+        raise ScenarioError(f"{path}: not a scenario file")
+    if doc.get("version", 0) > VERSION:
+        raise ScenarioError(f"{path}: format version {doc['version']} is newer than supported ({VERSION})")
+
+    robots = [
+        (r["id"], *r["position"], r.get("radius", 1.0), r.get("speed", 10.0),
+         *(r["target"] if r.get("target") is not None else (np.nan, np.nan)))
+        for r in doc.get("robots", [])
+    ]
+    return {
+        "width": float(doc["width"]),
+        "height": float(doc["height"]),
+        "start_region": tuple(doc["start_region"]),
+        "target_region": tuple(doc["target_region"]),
+        "segments": np.array(doc.get("segments", []), dtype=float).reshape(-1, 4),
+        "rectangles": np.array(doc.get("rectangles", []), dtype=float).reshape(-1, 4),
+        "robots": np.array(robots, dtype=float).reshape(-1, ROBOT_COLUMNS),
+    }
+
+
+# --- Files ---
+def is_json(path):
+    return str(path).lower().endswith(".json")
+
+
+def save_arrays(arrays, path):
+    (write_json if is_json(path) else write_binary)(arrays, path)
+
+
+def read_arrays(path, mmap_mode=True):
+    """Scenario arrays of path, by extension: .json is JSON, anything else binary."""
+    return read_json(path) if is_json(path) else read_binary(path, mmap_mode)
@@ -0,0 +1,185 @@
+# core/spatial.py
+import math
+from core.geometry import LineSegment, Rectangle, point_to_segment_distance
+from simulation.sensors import ray_line_intersection
+
+
+class SpatialHash:
+    """
+    Uniform-grid hash of points (robot centers). Items are bucketed by the
+    cell containing their position; a query only visits the buckets that
+    overlap the query circle's bounding box.
+    """
+
+    def __init__(self, cell_size=4.0):
+        self.cell_size = cell_size
+        self.buckets = {}    # (i, j) -> list of items
+        self.positions = {}  # item -> (i, j)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _key(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def clear(self):
+        self.buckets = {}
+        self.positions = {}
+
+    def insert(self, item, x, y):
+        key = self._key(x, y)
+        self.positions[item] = key
+        self.buckets.setdefault(key, []).append(item)
+
+    def remove(self, item):
+        key = self.positions.pop(item)
+        bucket = self.buckets[key]
+        bucket.remove(item)
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, item, x, y):
+        key = self._key(x, y)
+        old = self.positions.get(item)
+        if old == key:
+            return
+        if old is not None:
+            self.remove(item)
+        self.positions[item] = key
+        self.buckets.setdefault(key, []).append(item)
+
+    def query(self, x, y, radius):
+        """Items in buckets overlapping the box around (x, y) +- radius."""
+        i0, j0 = self._key(x - radius, y - radius)
+        i1, j1 = self._key(x + radius, y + radius)
+        buckets = self.buckets
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                bucket = buckets.get((i, j))
+                if bucket:
+                    yield from bucket
+
+
+class SegmentIndex:
+    """
+    Uniform grid over the AABBs of static obstacles (LineSegment and
+    Rectangle). Each obstacle is listed in every bucket its box overlaps.
+    `version` records which obstacle-list version the index reflects.
+    """
+
+    def __init__(self, cell_size=8.0):
+        self.cell_size = cell_size
+        self.buckets = {}  # (i, j) -> list of obstacles
+        self.keys = {}     # obstacle -> bucket keys it is listed in
+        self.version = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    @staticmethod
+    def aabb(obs):
+        if isinstance(obs, Rectangle):
+            return obs.x, obs.y, obs.x + obs.w, obs.y + obs.h
+        (x1, y1), (x2, y2) = obs.p1, obs.p2
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+    def _cells(self, x0, y0, x1, y1):
+        cs = self.cell_size
+        i0, j0 = math.floor(x0 / cs), math.floor(y0 / cs)
+        i1, j1 = math.floor(x1 / cs), math.floor(y1 / cs)
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                yield (i, j)
+
+    # --- Maintenance ---
+    def clear(self):
+        self.buckets = {}
+        self.keys = {}
+
+    def rebuild(self, obstacles):
+        self.clear()
+        for obs in obstacles:
+            self.insert(obs)
+
+    def insert(self, obs):
+        keys = list(self._cells(*self.aabb(obs)))
+        self.keys[obs] = keys
+        for key in keys:
+            self.buckets.setdefault(key, []).append(obs)
+
+    def remove(self, obs):
+        for key in self.keys.pop(obs, ()):
+            bucket = self.buckets[key]
+            bucket.remove(obs)
+            if not bucket:
+                del self.buckets[key]
+
+    # --- Queries ---
+    def query_aabb(self, x0, y0, x1, y1):
+        """Obstacles whose AABB overlaps [x0, x1] x [y0, y1]."""
+        found = set()
+        for key in self._cells(x0, y0, x1, y1):
+            for obs in self.buckets.get(key, ()):
+                if obs in found:
+                    continue
+                bx0, by0, bx1, by1 = self.aabb(obs)
+                if bx0 <= x1 and bx1 >= x0 and by0 <= y1 and by1 >= y0:
+                    found.add(obs)
+        return found
+
+    @staticmethod
+    def distance(obs, x, y):
+        if isinstance(obs, Rectangle):
+            dx = max(obs.x - x, 0.0, x - obs.x - obs.w)
+            dy = max(obs.y - y, 0.0, y - obs.y - obs.h)
+            return math.hypot(dx, dy)
+        return point_to_segment_distance(x, y, obs.p1, obs.p2)
+
+    def nearest(self, x, y, radius):
+        """(obstacle, distance) of the closest obstacle within radius, else (None, radius)."""
+        best, best_dist = None, radius
+        for obs in self.query_aabb(x - radius, y - radius, x + radius, y + radius):
+            d = self.distance(obs, x, y)
+            if d < best_dist:
+                best, best_dist = obs, d
+        return best, best_dist
+
+    def raycast(self, origin, direction, max_range):
+        """
+        Distance along a normalized ray to the first LineSegment it hits,
+        or max_range. Walks the buckets the ray passes through in order
+        (Amanatides-Woo) and stops once the next bucket is beyond the hit.
+        """
+        ox, oy = origin
+        dx, dy = direction
+        cs = self.cell_size
+        i, j = math.floor(ox / cs), math.floor(oy / cs)
+
+        inf = float('inf')
+        step_i = 1 if dx > 0 else -1
+        step_j = 1 if dy > 0 else -1
+        t_max_x = ((i + (dx > 0)) * cs - ox) / dx if dx else inf
+        t_max_y = ((j + (dy > 0)) * cs - oy) / dy if dy else inf
+        t_delta_x = cs / abs(dx) if dx else inf
+        t_delta_y = cs / abs(dy) if dy else inf
+
+        closest = max_range
+        tested = set()
+        t = 0.0
+        while t <= closest:
+            for obs in self.buckets.get((i, j), ()):
+                if obs in tested or not isinstance(obs, LineSegment):
+                    continue
+                tested.add(obs)
+                hit = ray_line_intersection(origin, direction, obs.p1, obs.p2)
+                if hit is not None and hit < closest:
+                    closest = hit
+            if t_max_x < t_max_y:
+                t = t_max_x
+                t_max_x += t_delta_x
+                i += step_i
+            else:
+                t = t_max_y
+                t_max_y += t_delta_y
+                j += step_j
+        return closest
@@ -1,28 +1,237 @@
 # core/world.py
 
+import bisect
+import itertools
 import random
+import numpy as np
+from core import scenario
+from core.constants import WORLD_WIDTH, WORLD_HEIGHT
+from core.fleet import FleetState
 from core.geometry import Rectangle, LineSegment
+from core.grid import ClearanceField
 from core.robot import Robot
+from core.spatial import SegmentIndex, SpatialHash
+
+
+# Shared across worlds so a version number identifies one obstacle state
+_obstacle_versions = itertools.count(1)
+
+
+class ObstacleList(list):
+    """
+    A list of obstacles that bumps `version` on every mutation, so derived
+    data (occupancy grids, indices) can tell when it is stale.
+
+    Small edits are journaled so derived data can patch itself with
+    changes_since() instead of rebuilding; bulk edits reset the journal.
+    """
+
+    MAX_JOURNAL = 1024
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self._reset()
+
+    def _reset(self):
+        self.version = next(_obstacle_versions)
+        self._base_version = self.version
+        self._journal = []  # (version, "add" | "remove", obstacle)
+
+    def _bump(self, added=(), removed=()):
+        self.version = next(_obstacle_versions)
+        for obs in removed:
+            self._journal.append((self.version, "remove", obs))
+        for obs in added:
+            self._journal.append((self.version, "add", obs))
+
+        if len(self._journal) > self.MAX_JOURNAL:
+            # Forget the oldest half, never splitting one version's entries
+            cut = len(self._journal) // 2
+            self._base_version = self._journal[cut - 1][0]
+            while cut < len(self._journal) and self._journal[cut][0] == self._base_version:
+                cut += 1
+            del self._journal[:cut]
+
+    def changes_since(self, version):
+        """
+        List of (op, obstacle) applied after `version`, or None if `version`
+        is not a state of this list that the journal still reaches back to.
+        """
+        if version == self.version:
+            return []
+        if version != self._base_version:
+            versions = [v for v, _, _ in self._journal]
+            i = bisect.bisect_right(versions, version)
+            if i == 0 or versions[i - 1] != version:
+                return None
+        return [(op, obs) for v, op, obs in self._journal if v > version]
+
+    def append(self, obs):
+        super().append(obs)
+        self._bump(added=(obs,))
+
+    def extend(self, iterable):
+        added = list(iterable)
+        super().extend(added)
+        self._bump(added=added)
+
+    def insert(self, i, obs):
+        super().insert(i, obs)
+        self._bump(added=(obs,))
+
+    def remove(self, obs):
+        super().remove(obs)
+        self._bump(removed=(obs,))
+
+    def pop(self, i=-1):
+        obs = super().pop(i)
+        self._bump(removed=(obs,))
+        return obs
+
+    def clear(self):
+        super().clear()
+        self._reset()
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            super().__setitem__(i, value)
+            self._reset()
+            return
+        old = self[i]
+        super().__setitem__(i, value)
+        self._bump(added=(value,), removed=(old,))
+
+    def __delitem__(self, i):
+        removed = self[i] if isinstance(i, slice) else (self[i],)
+        super().__delitem__(i)
+        self._bump(removed=removed)
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+    def __imul__(self, n):
+        # Repeats (or with n <= 0 drops) everything: a bulk edit
+        super().__imul__(n)
+        self._reset()
+        return self
 
 
 class World:
-    def __init__(self, num_robots=10, width=100, height=100):
+    # Fewer obstacles than this and clearance is None: building the field
+    # (~70 ms even when empty) costs more than the segment index spends on a
+    # whole grid build, and saves a fraction of a millisecond per tick
+    CLEARANCE_MIN_OBSTACLES = 128
+
+    def __init__(self, num_robots=10, width=WORLD_WIDTH, height=WORLD_HEIGHT):
+        # World size in world units; obstacles, grids and robots all live in [0, width] x [0, height]
         self.width = width
         self.height = height
         self.num_robots = num_robots
-        self.obstacles = []
+        self._obstacles = ObstacleList()
+        # Segment rows of a loaded scenario not yet turned into obstacles, see obstacles
+        self._packed_segments = None
 
         self.start_region = Rectangle(10, 10, 20, 20)
         self.target_region = Rectangle(90, 90, 20, 20)
 
         self.robots = []
+        # Struct-of-arrays robot state, see sync_fleet
+        self.fleet = FleetState()
+        # Robot centers bucketed for neighbor queries, see robots_near
+        self.robot_index = SpatialHash(cell_size=4.0)
+        self.max_robot_radius = 0.0
+        # Static obstacles bucketed by AABB, see obstacle_index
+        self._obstacle_index = SegmentIndex(cell_size=8.0)
+        # Distance to the nearest obstacle, built on first use, see clearance
+        self._clearance = None
         self.spawn_robots()
 
+    @property
+    def obstacles(self):
+        if self._packed_segments is not None:
+            # Build the LineSegments of a loaded scenario on first use; the
+            # version is left alone since the obstacle set itself is unchanged
+            rows, self._packed_segments = self._packed_segments, None
+            points = list(map(tuple, rows.reshape(-1, 2).tolist()))
+            list.extend(self._obstacles, map(LineSegment, points[0::2], points[1::2]))
+        return self._obstacles
+
+    @obstacles.setter
+    def obstacles(self, obstacles):
+        self._packed_segments = None
+        self._obstacles = ObstacleList(obstacles)
+
+    @property
+    def obstacle_version(self):
+        """Changes whenever the obstacle set changes."""
+        return self._obstacles.version
+
     def add_obstacle(self, p1, p2):
-        self.obstacles.append(LineSegment(p1, p2))
+        obs = LineSegment(p1, p2)
+        self.obstacles.append(obs)
+        return obs
+
+    def remove_obstacle(self, obs):
+        self.obstacles.remove(obs)
+
+    @property
+    def obstacle_index(self):
+        """
+        SegmentIndex over the current obstacles. Brought up to date on access
+        by replaying the obstacle journal, or rebuilt if it has been trimmed.
+        """
+        index = self._obstacle_index
+        if index.version != self.obstacle_version:
+            changes = None
+            if index.version is not None:
+                changes = self._obstacles.changes_since(index.version)
+            if changes is None:
+                index.rebuild(self.obstacles)
+            else:
+                for op, obs in changes:
+                    if op == "add":
+                        index.insert(obs)
+                    else:
+                        index.remove(obs)
+            index.version = self.obstacle_version
+        return index
+
+    @property
+    def clearance(self):
+        """
+        ClearanceField over the current obstacles, kept up to date from the
+        obstacle journal like obstacle_index, or None while there are fewer
+        than CLEARANCE_MIN_OBSTACLES obstacles (callers then go straight to
+        obstacle_index). Samples are max(0.25, longer side / 512) apart, so
+        the world spans at most 512 samples along its longer side, plus a
+        margin of 32 samples on every side: 576 x 576 for a square world.
+        """
+        count = len(self._obstacles)
+        if self._packed_segments is not None:
+            count += len(self._packed_segments)
+        if count < self.CLEARANCE_MIN_OBSTACLES:
+            return None
+
+        field = self._clearance
+        if field is None or (field.width, field.height) != (self.width, self.height):
+            cell = max(0.25, max(self.width, self.height) / 512)
+            field = self._clearance = ClearanceField(self.width, self.height, cell, 32 * cell)
+        if field.version != self.obstacle_version:
+            changes = None
+            if field.version is not None:
+                changes = self._obstacles.changes_since(field.version)
+            if changes is None:
+                field.rebuild(self.obstacles)
+            else:
+                field.apply(changes)
+            field.version = self.obstacle_version
+        return field
 
     def spawn_robots(self):
         self.robots = []
+        self.fleet = FleetState(capacity=self.num_robots)
+        self.update_robot_index()
         attempts = 0
         max_attempts = 1000
 
@@ -42,16 +251,111 @@ class World:
                 )
 
                 if not self._overlaps_existing((x, y), radius=1.0):
-                    self.robots.append(Robot(i, (x, y)))
+                    robot = Robot(i, (x, y))
+                    self.robots.append(robot)
+                    self.fleet.adopt(robot)
+                    self.robot_index.insert(robot, x, y)
+                    self.max_robot_radius = max(self.max_robot_radius, robot.radius)
                     break
 
     def reset_robots(self):
         """Reset robots back to the start region."""
         self.spawn_robots()
 
+    # --- Scenario files ---
+    def save_scenario(self, path):
+        """Write obstacles, regions, robots and targets to path (.json or binary, see core/scenario.py)."""
+        scenario.save_arrays(scenario.world_arrays(self), path)
+
+    def load_scenario(self, path):
+        """
+        Replace this world's contents with the scenario at path, in place so
+        code holding on to the world keeps working. Segments stay packed until
+        world.obstacles is first used, so even huge maps load in milliseconds.
+        """
+        self.apply_scenario(scenario.read_arrays(path))
+
+    def apply_scenario(self, arrays):
+        """load_scenario from the arrays of core.scenario.read_arrays or world_arrays."""
+        self.width, self.height = arrays["width"], arrays["height"]
+        self.start_region = Rectangle(*arrays["start_region"])
+        self.target_region = Rectangle(*arrays["target_region"])
+
+        self._obstacles = ObstacleList(Rectangle(*r) for r in arrays["rectangles"].tolist())
+        self._packed_segments = np.array(arrays["segments"]) if len(arrays["segments"]) else None
+
+        rows = arrays["robots"]
+        n = len(rows)
+        fleet = FleetState(capacity=n)
+        fleet.size = n
+        fleet.ids[:n] = rows[:, 0]
+        fleet.pos[:n] = rows[:, 1:3]
+        fleet.radius[:n] = rows[:, 3]
+        fleet.speed[:n] = rows[:, 4]
+        fleet.paths = [[] for _ in range(n)]
+        fleet.robots = [Robot.attach(fleet, row, rid) for row, rid in enumerate(fleet.ids[:n].tolist())]
+        for robot, (tx, ty) in zip(fleet.robots, rows[:, 5:7].tolist()):
+            if tx == tx:  # nan marks "no target"
+                robot.target = (tx, ty)
+
+        self.fleet = fleet
+        self.robots = list(fleet.robots)
+        self.num_robots = n
+        self.update_robot_index()
+
+    @classmethod
+    def from_scenario(cls, path):
+        world = cls(num_robots=0)
+        world.load_scenario(path)
+        return world
+
+    # --- Fleet state ---
+    def sync_fleet(self):
+        """
+        The FleetState whose rows are exactly self.robots, in order. Rebuilt
+        (robots are re-bound to the new rows) if robots were added or removed.
+        """
+        if self.fleet.robots != self.robots:
+            fleet = FleetState(capacity=len(self.robots))
+            for robot in self.robots:
+                fleet.adopt(robot)
+            self.fleet = fleet
+        return self.fleet
+
+    # --- Robot spatial hash ---
+    def update_robot_index(self):
+        """Rebuild the robot spatial hash from scratch; once per tick is enough."""
+        self.robot_index.clear()
+        self.max_robot_radius = 0.0
+        for robot in self.robots:
+            self.robot_index.insert(robot, robot.x, robot.y)
+            self.max_robot_radius = max(self.max_robot_radius, robot.radius)
+
+    def robots_near(self, x, y, radius):
+        """Robots that might overlap a circle of `radius` at (x, y)."""
+        if len(self.robot_index) != len(self.robots):
+            # Robots were added or removed behind our back
+            self.update_robot_index()
+        return self.robot_index.query(x, y, radius + self.max_robot_radius)
+
+    def move_robot(self, robot, x, y):
+        robot.x = x
+        robot.y = y
+        self.robot_index.move(robot, x, y)
+
+    def move_fleet(self, rows, positions):
+        """move_robot for many fleet rows; only robots that change bucket touch the hash."""
+        fleet = self.sync_fleet()
+        cs = self.robot_index.cell_size
+        crossed = (np.floor(fleet.pos[rows] / cs) != np.floor(positions / cs)).any(axis=1)
+        fleet.pos[rows] = positions
+        for row in rows[crossed]:
+            robot = fleet.robots[row]
+            self.robot_index.move(robot, robot.x, robot.y)
+
     def _overlaps_existing(self, pos, radius):
         px, py = pos
-        for r in self.robots:
+        for r in self.robot_index.query(px, py, 2 * radius):
             dx = r.x - px
             dy = r.y - py
             if dx * dx + dy * dy < (2 * radius) ** 2:
@@ -1,5 +1,6 @@
 # gui/editor.py
 
+
 class Editor:
     def __init__(self):
         self.active = False
@@ -21,3 +22,13 @@ class Editor:
             # Second click: create obstacle
             world.add_obstacle(self.start_point, world_pos)
             self.start_point = None
+
+    def handle_right_click(self, world_pos, world, tolerance=1.0):
+        """
+        Remove the obstacle closest to world_pos, if within tolerance. Loaded
+        scenarios may hold rectangles too; the obstacle index measures both.
+        """
+        self.start_point = None
+        best, _ = world.obstacle_index.nearest(world_pos[0], world_pos[1], tolerance)
+        if best is not None:
+            world.remove_obstacle(best)
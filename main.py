@@ -2,14 +2,27 @@
 
 import pygame
 import sys
-import random
 from core.world import World
 from core.controller import Controller
 from core.constants import WINDOW_WIDTH, WINDOW_HEIGHT, FPS
+from core.profiler import PROFILER
+from simulation.engine import Engine
+from simulation.recording import Recorder, Replay
 from gui.renderer import Renderer
 from gui.ui import UI
 from gui.editor import Editor
-from gui.grid_visualiser import show_grid_popup
+from gui.grid_visualiser import export_grid_image, show_grid_popup
+
+# S / L save and load the scenario; with Shift the JSON variant
+SCENARIO_FILE = "scenario.dip"
+SCENARIO_JSON = "scenario.json"
+# V saves the last run's recording, O opens it in replay mode (O again to leave)
+RECORDING_FILE = "recording.npz"
+# G opens the grid view in its own window, Shift+G saves it as an image
+GRID_IMAGE = "grid.png"
+# F toggles the profiler and its overlay, T writes what it recorded as a trace
+# (open in chrome://tracing or Perfetto)
+TRACE_FILE = "trace.json"
 
 
 def main():
@@ -20,7 +33,8 @@ def main():
     clock = pygame.time.Clock()
 
     # ---- Initialize World ----
-    world = World(num_robots=5, width=WINDOW_WIDTH, height=WINDOW_HEIGHT)
+    # Default world size; scenarios and replays of any size are scaled to the window
+    world = World(num_robots=5)
 
     # ---- Initialize Renderer ----
     renderer = Renderer(screen)
@@ -28,59 +42,67 @@ def main():
     # ---- Initialize UI & Editor ----
     ui = UI()
     editor = Editor()
+    renderer.overlay_rects = ui.areas
 
-    # ---- Initialize Controller ----
+    # ---- Initialize Controller & Engine (W toggles rolling-horizon planning) ----
     controller = Controller(base_grid=5.0, min_grid=1.0)
-
-    # ---- Simulation engine placeholder ----
-    class Engine:
-        def __init__(self):
-            
-            self.sim_time = 0.0
-            self.speed_multiplier = 1
-            self.running = False
-            self.completed = False
-            self.completion_time = 0.0
-
-    engine = Engine()
+    engine = Engine(world, controller, recorder=Recorder())
+    replay = None
 
     running = True
     show_rays = True
 
-    # ---- Helper: assign paths individually ----
-    def assign_paths():
-        for robot in world.robots:
-            # Assign random target inside target region
-            if robot.target is None:
-                cx, cy = world.target_region.x, world.target_region.y
-                w, h = world.target_region.w, world.target_region.h
-                robot.target = (
-                    cx + 0.1 + (w - 0.2) * random.random(),
-                    cy + 0.1 + (h - 0.2) * random.random()
-                )
-            # Plan ESO-MAPF path
-            path = controller.plan_path(robot, world, robot.target)
-            if path is None:
-                print(f"No findable path for Robot {robot.id}")
-                robot.set_path([])
-            else:
-                robot.set_path(path)
-
     while running:
         dt = clock.tick(FPS) / 1000.0  # delta time in seconds
-        dt *= engine.speed_multiplier
-        if engine.running:
-            engine.sim_time += dt
 
         # ---- Mouse position ----
         mouse_sx, mouse_sy = pygame.mouse.get_pos()
-        mouse_world = ui.screen_to_world(mouse_sx, mouse_sy)
+        shown = replay.world if replay is not None else world
+        mouse_world = ui.screen_to_world(mouse_sx, mouse_sy, shown)
 
         # ---- Event Handling ----
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_f, pygame.K_t):
+                if event.key == pygame.K_f:
+                    PROFILER.enable(not PROFILER.enabled)
+                    print(f"Profiler {'on' if PROFILER.enabled else 'off'}")
+                elif not PROFILER.events:
+                    print("Nothing profiled yet; press F to start the profiler")
+                else:
+                    try:
+                        count = PROFILER.export_trace(TRACE_FILE)
+                        print(f"Trace of {count} events written to {TRACE_FILE}")
+                    except OSError as e:
+                        print(f"Trace export failed: {e}")
+
+            elif event.type == pygame.KEYDOWN and replay is not None:
+                # Replay mode: P play/pause, arrows seek (Shift: 10 s), Home/End, Up/Down speed
+                step = 10.0 if event.mod & pygame.KMOD_SHIFT else 1.0
+                if event.key == pygame.K_o:
+                    replay = None
+                    print("Replay closed")
+                elif event.key == pygame.K_p:
+                    if replay.t >= replay.end:
+                        replay.seek(replay.start)
+                    replay.playing = not replay.playing
+                elif event.key == pygame.K_LEFT:
+                    replay.seek(replay.t - step)
+                elif event.key == pygame.K_RIGHT:
+                    replay.seek(replay.t + step)
+                elif event.key == pygame.K_HOME:
+                    replay.seek(replay.start)
+                elif event.key == pygame.K_END:
+                    replay.seek(replay.end)
+                elif event.key == pygame.K_UP:
+                    replay.speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    replay.speed /= 2
+                elif event.key == pygame.K_SPACE:
+                    show_rays = not show_rays
+
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
                     world.reset_robots()
@@ -88,18 +110,66 @@ def main():
                     show_rays = not show_rays
                 elif event.key == pygame.K_e:
                     editor.toggle()
+                elif event.key == pygame.K_d:
+                    renderer.dirty_rects = not renderer.dirty_rects
+                    print(f"Dirty-rect updates {'on' if renderer.dirty_rects else 'off'} (used while rays are hidden)")
+                elif event.key == pygame.K_w:
+                    engine.windowed = not engine.windowed
+                    print(f"Rolling-horizon planning {'on' if engine.windowed else 'off'}")
+                elif event.key == pygame.K_g and event.mod & pygame.KMOD_SHIFT:
+                    export_grid_image(controller, world, GRID_IMAGE)
+                    print(f"Grid discretization written to {GRID_IMAGE}")
                 elif event.key == pygame.K_g:
                     print("Showing grid discretization popup...")
                     show_grid_popup(controller, world)
+                elif event.key in (pygame.K_s, pygame.K_l):
+                    path = SCENARIO_JSON if event.mod & pygame.KMOD_SHIFT else SCENARIO_FILE
+                    try:
+                        if event.key == pygame.K_s:
+                            world.save_scenario(path)
+                            print(f"Scenario saved to {path}")
+                        else:
+                            world.load_scenario(path)
+                            engine.running = False
+                            print(f"Scenario loaded from {path}")
+                    except (OSError, ValueError) as e:
+                        print(f"Scenario {'save' if event.key == pygame.K_s else 'load'} failed: {e}")
+                elif event.key == pygame.K_v:
+                    try:
+                        engine.recorder.save(RECORDING_FILE)
+                        print(f"Recording of {len(engine.recorder)} ticks saved to {RECORDING_FILE}")
+                    except (OSError, ValueError) as e:
+                        print(f"Recording save failed: {e}")
+                elif event.key == pygame.K_o:
+                    try:
+                        replay = Replay(RECORDING_FILE)
+                        engine.running = False
+                        print(f"Replaying {RECORDING_FILE} ({replay.duration:.2f}s)")
+                    except (OSError, ValueError, KeyError) as e:
+                        print(f"Replay failed: {e}")
+
+            elif event.type == pygame.MOUSEBUTTONDOWN and replay is not None:
+                if event.button == 1:
+                    fraction = ui.timeline_fraction(event.pos)
+                    if fraction is not None:
+                        replay.seek_fraction(fraction)
+                    speed = ui.speed_clicked(event.pos)
+                    if speed:
+                        replay.speed = speed
+
+            elif event.type == pygame.MOUSEMOTION and replay is not None and event.buttons[0]:
+                # Scrub by dragging along the timeline
+                fraction = ui.timeline_fraction(event.pos)
+                if fraction is not None:
+                    replay.seek_fraction(fraction)
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # left click
                     if ui.start_clicked(event.pos):
                         print("START button clicked!")
-                        assign_paths()
-                        engine.running = True
-                        engine.sim_time = 0.0
-                        engine.completed = False
+                        engine.start()
+                        if engine.unplanned:
+                            print(f"No findable path for robots {', '.join(map(str, engine.unplanned))}")
                     elif ui.reset_clicked(event.pos):
                         print("RESET button clicked!")
                         world.reset_robots()
@@ -111,26 +181,31 @@ def main():
                     speed = ui.speed_clicked(event.pos)
                     if speed:
                         engine.speed_multiplier = speed
+                elif event.button == 3 and editor.active:  # right click
+                    editor.handle_right_click(mouse_world, world)
 
         # ---- Update Robots ----
-        if engine.running:
-            all_reached = True
-            for robot in world.robots:
-                controller.update(robot, dt, world)
-                if not world.target_region.contains((robot.x, robot.y)):
-                    all_reached = False
-            
-            if all_reached and world.robots:
-                engine.running = False
-                engine.completed = True
-                engine.completion_time = engine.sim_time
+        if replay is not None:
+            replay.advance(dt)
+        elif engine.running:
+            engine.step(dt)
+            if engine.completed:
                 print(f"Completed in {engine.completion_time:.2f}s")
 
         # ---- Draw World & UI ----
-        renderer.draw_world(world, editor=editor, mouse_world=mouse_world, show_rays=show_rays)
-        ui.draw(screen, mouse_world, edit_mode=editor.active, engine=engine)
-
-        pygame.display.flip()
+        with PROFILER.scope("render"):
+            if replay is not None:
+                dirty = renderer.draw_world(replay.world, show_rays=show_rays)
+            else:
+                dirty = renderer.draw_world(world, editor=editor, mouse_world=mouse_world, show_rays=show_rays)
+        with PROFILER.scope("ui"):
+            ui.draw(screen, mouse_world, edit_mode=editor.active, engine=engine, replay=replay)
+
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        PROFILER.frame()
 
     pygame.quit()
     sys.exit()
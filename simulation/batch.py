@@ -0,0 +1,174 @@
+# simulation/batch.py
+"""
+Monte Carlo batch runner: many seeded headless episodes across processes.
+
+Every episode is one Engine run on a fresh World with the given robot count,
+a random segment layout and Controller grid parameters. Configurations are
+the cross product of the list arguments; episodes cycle through them with
+increasing seeds, so any episode can be rerun from its record alone.
+Per-episode metrics are streamed to a JSON-lines file as they finish and
+percentiles are printed at the end.
+
+Run from the repository root:
+    python -m simulation.batch --episodes 1000 --robots 5,10,20 --obstacles 0,20 \\
+        --base-grid 5,8 --min-grid 1 --world-size 128,256 --processes 4 --out results.jsonl
+"""
+import argparse
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+
+import numpy as np
+
+from core.constants import WORLD_WIDTH, FPS
+from core.controller import Controller
+from core.world import World
+from simulation.engine import Engine
+
+METRICS = ["makespan", "sum_of_costs", "planning_time", "collisions", "waits", "unplanned", "wall_time"]
+PERCENTILES = [50, 90, 99]
+REGION_MARGIN = 2.0  # obstacles keep this far from the start and target regions
+PLACEMENT_ATTEMPTS = 100  # random tries per obstacle before add_obstacles gives up
+
+
+def add_obstacles(world, count, rng):
+    """
+    count random segments that stay clear of the start and target regions.
+    Raises RuntimeError if the regions leave too little room to place them.
+    """
+    placed = 0
+    for _ in range(count * PLACEMENT_ATTEMPTS):
+        if placed == count:
+            return
+        x = rng.uniform(0, world.width)
+        y = rng.uniform(0, world.height)
+        a = rng.uniform(0, math.pi)
+        l = rng.uniform(2, 10)
+        x2, y2 = x + l * math.cos(a), y + l * math.sin(a)
+        box = (min(x, x2), min(y, y2), max(x, x2), max(y, y2))
+        if any(box[0] <= r.x + r.w + REGION_MARGIN and box[2] >= r.x - REGION_MARGIN and
+               box[1] <= r.y + r.h + REGION_MARGIN and box[3] >= r.y - REGION_MARGIN
+               for r in (world.start_region, world.target_region)):
+            continue
+        world.add_obstacle((x, y), (x2, y2))
+        placed += 1
+    if placed < count:
+        raise RuntimeError(f"Placed only {placed} of {count} obstacles clear of the regions.")
+
+
+def run_episode(episode):
+    """Run one episode dict (see episodes()) and return it with its metrics."""
+    # World spawning and target assignment draw from the global generator
+    random.seed(episode["seed"])
+    started = time.perf_counter()
+    record = dict(episode)
+    try:
+        size = episode["world_size"]
+        world = World(num_robots=episode["robots"], width=size, height=size)
+        add_obstacles(world, episode["obstacles"], random.Random(episode["seed"]))
+        controller = Controller(base_grid=episode["base_grid"], min_grid=episode["min_grid"],
+                                any_angle=episode["any_angle"], hierarchical=episode["hierarchical"])
+        engine = Engine(world, controller, windowed=episode["windowed"],
+                        shared_field=episode["shared_field"])
+        engine.run(dt=episode["dt"], max_time=episode["max_time"])
+        record.update(engine.metrics())
+    except Exception as e:  # keep the batch going, the record says what happened
+        record.update(completed=False, error=f"{type(e).__name__}: {e}")
+    record["wall_time"] = time.perf_counter() - started
+    return record
+
+
+def episodes(args):
+    configs = list(itertools.product(args.robots, args.obstacles, args.base_grid, args.min_grid,
+                                     args.world_size))
+    for i in range(args.episodes):
+        robots, obstacles, base_grid, min_grid, world_size = configs[i % len(configs)]
+        yield {
+            "episode": i,
+            "seed": args.seed + i // len(configs),
+            "robots": robots,
+            "obstacles": obstacles,
+            "base_grid": base_grid,
+            "min_grid": min_grid,
+            "world_size": world_size,
+            "windowed": args.windowed,
+            "any_angle": args.any_angle,
+            "hierarchical": args.hierarchical,
+            "shared_field": args.shared_field,
+            "dt": args.dt,
+            "max_time": args.max_time,
+        }
+
+
+# --- Aggregation ---
+def summarize(records):
+    """Print completion rate and metric percentiles, overall and per configuration."""
+    groups = {"all": records}
+    for r in records:
+        key = (f"robots={r['robots']} obstacles={r['obstacles']} base={r['base_grid']} "
+               f"min={r['min_grid']} size={r['world_size']:g}")
+        groups.setdefault(key, []).append(r)
+
+    header = "".join(f"{f'p{p}':>10}" for p in PERCENTILES)
+    for name, group in groups.items():
+        done = sum(1 for r in group if r.get("completed"))
+        errors = sum(1 for r in group if "error" in r)
+        print(f"\n{name}: {len(group)} episodes, {done / len(group):.1%} completed, {errors} errors")
+        print(f"  {'metric':<14}{header}")
+        for metric in METRICS:
+            values = [r[metric] for r in group if r.get(metric) is not None]
+            if not values:
+                continue
+            row = "".join(f"{v:>10.3f}" for v in np.percentile(values, PERCENTILES))
+            print(f"  {metric:<14}{row}")
+
+
+def int_list(text):
+    return [int(v) for v in text.split(",")]
+
+
+def float_list(text):
+    return [float(v) for v in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo batch runner for headless episodes.")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--robots", type=int_list, default=[5])
+    parser.add_argument("--obstacles", type=int_list, default=[0])
+    parser.add_argument("--base-grid", type=float_list, default=[5.0])
+    parser.add_argument("--min-grid", type=float_list, default=[1.0])
+    parser.add_argument("--world-size", type=float_list, default=[WORLD_WIDTH], help="square world sides")
+    parser.add_argument("--windowed", action="store_true", help="rolling-horizon planning")
+    parser.add_argument("--any-angle", action="store_true", help="string-pull planned paths")
+    parser.add_argument("--hierarchical", action="store_true", help="HPA* over clusters of leaves")
+    parser.add_argument("--shared-field", action="store_true",
+                        help="descend one cost-to-go field instead of an A* per robot")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--dt", type=float, default=1.0 / FPS)
+    parser.add_argument("--max-time", type=float, default=120.0, help="simulated seconds per episode")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default="results.jsonl")
+    args = parser.parse_args()
+
+    records = []
+    started = time.perf_counter()
+    with open(args.out, "w") as out, mp.Pool(args.processes) as pool:
+        for record in pool.imap_unordered(run_episode, episodes(args)):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            records.append(record)
+            if len(records) % max(1, args.episodes // 10) == 0:
+                print(f"{len(records)}/{args.episodes} episodes, {time.perf_counter() - started:.1f}s")
+
+    records.sort(key=lambda r: r["episode"])
+    summarize(records)
+    print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
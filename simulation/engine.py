@@ -0,0 +1,239 @@
+# simulation/engine.py
+"""
+Headless simulation loop. Imports neither pygame nor matplotlib, so batch
+runs start fast and work without a display.
+
+Run a demo from the repository root:
+    python -m simulation.engine [num_robots] [seed] [--windowed] [--any-angle] [--hierarchical]
+        [--shared-field] [--workers=N] [--record=run.npz] [--size=W[xH]]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from core.constants import WORLD_WIDTH, WORLD_HEIGHT, FPS
+from core.controller import Controller
+from core.grid import Grid
+from core.parallel import ParallelPlanner
+from core.planner import Planner, RollingHorizonPlanner
+from core.profiler import PROFILER
+from core.world import World
+from simulation.recording import Recorder
+
+
+class Engine:
+    """
+    Owns the simulation clock and planners and steps a World. main.py calls
+    step() once per frame; run() steps with a fixed dt as fast as it can.
+    """
+
+    def __init__(self, world, controller=None, windowed=False, workers=1, recorder=None,
+                 shared_field=False):
+        self.world = world
+        self.controller = controller or Controller(base_grid=5.0, min_grid=1.0)
+        # More than one worker plans assign_paths in a process pool
+        self.planner = ParallelPlanner(self.controller, workers) if workers > 1 else None
+
+        # Rolling-horizon planner, used instead of assign_paths when windowed
+        self.grid = Grid(world.width, world.height, cell_size=2.0)
+        self.rolling = RollingHorizonPlanner(Planner("ecbs"), window=10, replan_every=5)
+        self.windowed = windowed
+        # Descend one shared cost-to-go field instead of an A* per robot. Cheaper, but
+        # every robot follows the same next-hop chain, so crowds jam; off by default
+        self.shared_field = shared_field
+        self.recorder = recorder  # a simulation.recording.Recorder, fed every tick
+        self.tick_time = 0.0
+
+        self.sim_time = 0.0
+        self.speed_multiplier = 1
+        self.running = False
+        self.completed = False
+        self.completion_time = 0.0
+        self.reset_metrics()
+
+    # --- Metrics ---
+    def reset_metrics(self):
+        self.planning_time = 0.0  # wall-clock seconds spent planning
+        self.collisions = 0       # robot-ticks whose move was blocked by a contact
+        self.waits = 0            # robot-ticks standing still outside the target region
+        self.unplanned = []       # IDs of robots assign_paths found no path for
+        self.arrival = np.full(len(self.world.robots), np.nan)  # sim time each robot got in
+
+    @property
+    def sum_of_costs(self):
+        """Sum of arrival times; nan until every robot is in the target region."""
+        return float(self.arrival.sum())
+
+    def metrics(self):
+        return {
+            "completed": self.completed,
+            "makespan": self.completion_time if self.completed else None,
+            "sum_of_costs": self.sum_of_costs if self.completed else None,
+            "sim_time": self.sim_time,
+            "planning_time": self.planning_time,
+            "collisions": self.collisions,
+            "waits": self.waits,
+            "unplanned": len(self.unplanned),
+        }
+
+    # --- Planning ---
+    def assign_targets(self):
+        """Random targets inside the target region for robots without one."""
+        region = self.world.target_region
+        for robot in self.world.robots:
+            if robot.target is None:
+                robot.target = (
+                    region.x + 0.1 + (region.w - 0.2) * random.random(),
+                    region.y + 0.1 + (region.h - 0.2) * random.random()
+                )
+
+    def assign_paths(self):
+        self.assign_targets()
+        robots = self.world.robots
+        region = self.world.target_region if self.shared_field else None
+        if self.planner is not None:
+            paths = self.planner.plan(self.world, robots, region)
+        elif region is not None:
+            paths = [self.controller.plan_path_to_region(robot, self.world, region, robot.target)
+                     for robot in robots]
+        else:
+            paths = [self.controller.plan_path(robot, self.world, robot.target) for robot in robots]
+        self.unplanned = []
+        for robot, path in zip(robots, paths):
+            if path is None:
+                self.unplanned.append(robot.id)
+                robot.set_path([])
+            else:
+                robot.set_path(path)
+
+    def close(self):
+        """Shut down the planning pool, if any."""
+        if self.planner is not None:
+            self.planner.close()
+
+    # --- Stepping ---
+    def start(self):
+        self.reset_metrics()
+        started = time.perf_counter()
+        with PROFILER.scope("plan"):
+            if self.windowed:
+                # Sized for the world as it is now: a scenario may have been loaded since
+                self.grid = Grid(self.world.width, self.world.height, cell_size=2.0)
+                self.assign_targets()
+                self.rolling.reset()
+                self.tick_time = float('inf')  # step right away
+                for robot in self.world.robots:
+                    robot.set_path([])
+            else:
+                self.assign_paths()
+        self.planning_time += time.perf_counter() - started
+        self.running = True
+        self.sim_time = 0.0
+        self.completed = False
+        if self.recorder is not None:
+            self.recorder.reset(self.world)
+            self.recorder.capture(self.sim_time, self.world.fleet)
+
+    def step(self, dt):
+        """Advance dt seconds (times speed_multiplier). Returns True while still running."""
+        if not self.running:
+            return False
+        dt *= self.speed_multiplier
+        self.sim_time += dt
+        world = self.world
+
+        if self.windowed and world.robots:
+            # One plan step per cell traversal time
+            self.tick_time += dt
+            tick = self.grid.cell_size / max(r.speed for r in world.robots)
+            if self.tick_time >= tick:
+                self.tick_time = 0.0
+                started = time.perf_counter()
+                with PROFILER.scope("plan"):
+                    cells = self.rolling.step(world, self.grid)
+                self.planning_time += time.perf_counter() - started
+                for robot in world.robots:
+                    if robot.id in cells:
+                        robot.set_path([self.grid.cell_to_world(*cells[robot.id])])
+
+        with PROFILER.scope("update"):
+            world.update_robot_index()
+            collided = self.controller.update_all(world, dt)
+
+        # Per-robot bookkeeping on the fleet arrays
+        fleet = world.fleet
+        x, y = fleet.pos[:fleet.size].T
+        region = world.target_region
+        inside = ((region.x <= x) & (x <= region.x + region.w) &
+                  (region.y <= y) & (y <= region.y + region.h))
+        moved = (fleet.vel[:fleet.size] != 0).any(axis=1)
+        self.collisions += int(collided.sum())
+        self.waits += int((~moved & ~inside).sum())
+        if len(self.arrival) != fleet.size:
+            self.arrival = np.full(fleet.size, np.nan)
+        self.arrival[inside & np.isnan(self.arrival)] = self.sim_time
+        self.arrival[~inside] = np.nan
+        if self.recorder is not None:
+            self.recorder.capture(self.sim_time, fleet)
+
+        if world.robots and inside.all():
+            self.running = False
+            self.completed = True
+            self.completion_time = self.sim_time
+        return self.running
+
+    def run(self, dt=1.0 / FPS, max_time=None):
+        """
+        start() and step with a fixed dt until every robot is in the target
+        region or max_time simulated seconds pass. Returns completed.
+        """
+        self.start()
+        while self.running and (max_time is None or self.sim_time < max_time):
+            self.step(dt)
+        return self.completed
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    num_robots = int(args[0]) if args else 5
+    if len(args) > 1:
+        random.seed(int(args[1]))
+
+    workers = 1
+    recorder = record = None
+    size = (WORLD_WIDTH, WORLD_HEIGHT)
+    for a in sys.argv[1:]:
+        if a.startswith("--workers="):
+            workers = int(a.split("=", 1)[1])
+        elif a.startswith("--size="):
+            size = tuple(float(v) for v in a.split("=", 1)[1].split("x"))
+            size = size * 2 if len(size) == 1 else size
+        elif a.startswith("--record="):
+            record = a.split("=", 1)[1]
+            recorder = Recorder()
+
+    start = time.perf_counter()
+    controller = Controller(base_grid=5.0, min_grid=1.0, any_angle="--any-angle" in sys.argv,
+                            hierarchical="--hierarchical" in sys.argv)
+    engine = Engine(World(num_robots=num_robots, width=size[0], height=size[1]), controller,
+                    windowed="--windowed" in sys.argv, workers=workers, recorder=recorder,
+                    shared_field="--shared-field" in sys.argv)
+    try:
+        completed = engine.run(max_time=120.0)
+    finally:
+        engine.close()
+    elapsed = time.perf_counter() - start
+    if engine.unplanned:
+        print(f"No findable path for robots {', '.join(map(str, engine.unplanned))}")
+    if recorder is not None:
+        recorder.save(record)
+        print(f"Recording of {len(recorder)} ticks saved to {record}")
+
+    status = f"completed in {engine.completion_time:.2f}s" if completed else "did not complete"
+    print(f"{num_robots} robots {status} of simulated time ({elapsed:.2f}s wall clock)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# simulation/recording.py
+"""
+Trajectory recording and replay.
+
+A Recorder copies the fleet's per-tick state into preallocated chunks of
+CHUNK_TICKS frames; a full chunk is kept as is and a new one allocated, so
+recording never copies what it already has. save() writes one compressed
+.npz with a column per field plus the scenario (see core/scenario.py), so
+a Replay needs nothing but the file:
+
+    time       (T,)        sim time of each frame
+    pos, vel   (T, N, 2)   float32
+    collided   (T, N)      bool
+    scenario_*             obstacles, regions and the robots at the start
+"""
+import numpy as np
+
+from core import scenario
+from core.world import World
+
+CHUNK_TICKS = 1024
+FORMAT_VERSION = 1
+
+
+class Recorder:
+    def __init__(self, chunk_ticks=CHUNK_TICKS):
+        self.chunk_ticks = chunk_ticks
+        self.reset()
+
+    def __len__(self):
+        return self.frames
+
+    def reset(self, world=None):
+        """Drop all frames; with a world, start a new recording of it."""
+        self.frames = 0
+        self.chunks = []
+        self.fill = self.chunk_ticks  # frames used in the last chunk
+        self.scenario = scenario.world_arrays(world) if world is not None else None
+        self.size = world.sync_fleet().size if world is not None else 0
+
+    def _chunk(self):
+        n, t = self.size, self.chunk_ticks
+        chunk = {
+            "time": np.empty(t),
+            "pos": np.empty((t, n, 2), dtype=np.float32),
+            "vel": np.empty((t, n, 2), dtype=np.float32),
+            "collided": np.empty((t, n), dtype=bool),
+        }
+        self.chunks.append(chunk)
+        self.fill = 0
+        return chunk
+
+    def capture(self, time, fleet):
+        """Append the fleet's current state as the frame at sim time `time`."""
+        if fleet.size != self.size:
+            raise ValueError(f"fleet has {fleet.size} robots, the recording {self.size}")
+        chunk = self.chunks[-1] if self.fill < self.chunk_ticks else self._chunk()
+        k, n = self.fill, self.size
+        chunk["time"][k] = time
+        chunk["pos"][k] = fleet.pos[:n]
+        chunk["vel"][k] = fleet.vel[:n]
+        chunk["collided"][k] = fleet.collided[:n]
+        self.fill += 1
+        self.frames += 1
+
+    def column(self, name):
+        """All frames of one field as a single array."""
+        parts = [chunk[name] for chunk in self.chunks]
+        parts[-1] = parts[-1][:self.fill]
+        return np.concatenate(parts)
+
+    def save(self, path):
+        if not self.frames:
+            raise ValueError("nothing recorded")
+        columns = {name: self.column(name) for name in ("time", "pos", "vel", "collided")}
+        columns["version"] = np.array(FORMAT_VERSION)
+        for key, value in self.scenario.items():
+            columns[f"scenario_{key}"] = np.asarray(value)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **columns)
+
+
+class Replay:
+    """
+    A recording played back into a World of its own: seek(t) puts every
+    robot where it was at sim time t, interpolating between frames, and
+    advance(dt) plays on at `speed` times real time. Nothing is simulated.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            if int(data["version"]) > FORMAT_VERSION:
+                raise ValueError(f"{path}: recording version {int(data['version'])} is newer than supported")
+            columns = {key: data[key] for key in data.files}
+
+        self.time = columns["time"]
+        self.pos = columns["pos"]
+        self.vel = columns["vel"]
+        self.collided = columns["collided"]
+        if not len(self.time):
+            raise ValueError(f"{path}: recording has no frames")
+
+        arrays = {key[len("scenario_"):]: value for key, value in columns.items()
+                  if key.startswith("scenario_")}
+        for key in ("width", "height", "start_region", "target_region"):
+            arrays[key] = arrays[key].tolist()
+        self.world = World(num_robots=0)
+        self.world.apply_scenario(arrays)
+
+        self.speed = 1.0
+        self.playing = True
+        self.t = self.start
+        self.seek(self.start)
+
+    @property
+    def start(self):
+        return float(self.time[0])
+
+    @property
+    def end(self):
+        return float(self.time[-1])
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def seek(self, t):
+        """Show the recorded state at sim time t (clamped to the recording)."""
+        self.t = min(max(t, self.start), self.end)
+        k = int(np.searchsorted(self.time, self.t, side="right")) - 1
+        k = max(0, min(k, len(self.time) - 1))
+        pos = self.pos[k].astype(float)
+        if k + 1 < len(self.time) and self.time[k + 1] > self.time[k]:
+            a = (self.t - self.time[k]) / (self.time[k + 1] - self.time[k])
+            pos += a * (self.pos[k + 1] - self.pos[k])
+
+        fleet = self.world.fleet
+        fleet.pos[:fleet.size] = pos
+        fleet.vel[:fleet.size] = self.vel[k]
+        fleet.collided[:fleet.size] = self.collided[k]
+        self.world.update_robot_index()
+        return k
+
+    def seek_fraction(self, f):
+        return self.seek(self.start + f * self.duration)
+
+    def advance(self, dt):
+        """Play dt seconds of real time; stops at the end."""
+        if self.playing:
+            self.seek(self.t + dt * self.speed)
+            if self.t >= self.end:
+                self.playing = False
+
+    @property
+    def progress(self):
+        return (self.t - self.start) / self.duration if self.duration > 0 else 1.0
@@ -1,6 +1,11 @@
 # simulation/sensors.py
 
 import math
+import numpy as np
+from core.profiler import PROFILER
+
+# Rays per chunk are capped so a chunk's (rays x shapes) arrays stay ~64k entries (cache sized)
+CHUNK_ELEMENTS = 1 << 16
 
 
 def raycast(origin, direction, obstacles, robots, max_range, self_robot):
@@ -9,7 +14,7 @@ def raycast(origin, direction, obstacles, robots, max_range, self_robot):
 
     origin: (x, y)
     direction: (dx, dy) - MUST be normalized
-    obstacles: list of LineSegment
+    obstacles: list of LineSegment, or a SegmentIndex (see World.obstacle_index)
     robots: list of Robot
     max_range: float
     self_robot: Robot (to ignore self)
@@ -18,8 +23,15 @@ def raycast(origin, direction, obstacles, robots, max_range, self_robot):
     dx, dy = direction
 
     closest_dist = max_range
+    if PROFILER.enabled:
+        PROFILER.count("rays cast")
 
     # --- Check obstacle intersections ---
+    if hasattr(obstacles, "raycast"):
+        # Spatial index: only visits the buckets along the ray
+        closest_dist = obstacles.raycast(origin, direction, max_range)
+        obstacles = ()
+
     for obs in obstacles:
         hit = ray_line_intersection(
             origin, direction, obs.p1, obs.p2
@@ -105,3 +117,82 @@ def ray_circle_intersection(origin, direction, center, radius):
         return t2
 
     return None
+
+
+# --- Batched raycasting ---
+def segment_array(obstacles):
+    """(M, 4) array of x1, y1, x2, y2 for the LineSegments in obstacles."""
+    rows = [(*obs.p1, *obs.p2) for obs in obstacles if hasattr(obs, "p1")]
+    return np.array(rows, dtype=float).reshape(-1, 4)
+
+
+def circle_array(robots):
+    """(K, 3) array of x, y, radius for robots."""
+    rows = [(robot.x, robot.y, robot.radius) for robot in robots]
+    return np.array(rows, dtype=float).reshape(-1, 3)
+
+
+def raycast_many(origins, directions, segments, circles, max_range, ignore=None):
+    """
+    Vectorized raycast: every ray against every segment and circle.
+
+    origins: (N, 2) ray starts
+    directions: (N, 2) - MUST be normalized
+    segments: (M, 4) from segment_array
+    circles: (K, 3) from circle_array
+    max_range: float
+    ignore: optional (N,) circle index each ray skips (its own robot), -1 for none
+
+    Returns an (N,) array of hit distances, max_range where nothing is hit.
+    Same tests as ray_line_intersection / ray_circle_intersection.
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+    segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+    circles = np.asarray(circles, dtype=float).reshape(-1, 3)
+
+    if PROFILER.enabled:
+        PROFILER.count("rays cast", len(origins))
+        PROFILER.count("ray shape tests", len(origins) * (len(segments) + len(circles)))
+
+    dist = np.full(len(origins), float(max_range))
+    step = max(1, CHUNK_ELEMENTS // max(len(segments), len(circles), 1))
+
+    for start in range(0, len(origins), step):
+        rows = slice(start, start + step)
+        ox, oy = origins[rows, 0:1], origins[rows, 1:2]
+        dx, dy = directions[rows, 0:1], directions[rows, 1:2]
+        closest = dist[rows]  # view, updated in place
+
+        # --- Segments ---
+        if len(segments):
+            x1, y1, x2, y2 = segments.T
+            sx, sy = x2 - x1, y2 - y1
+            denom = dx * sy - dy * sx
+            qpx, qpy = x1 - ox, y1 - oy
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = (qpx * sy - qpy * sx) / denom
+                u = (qpx * dy - qpy * dx) / denom
+            hit = (np.abs(denom) >= 1e-8) & (t >= 0) & (u >= 0) & (u <= 1)
+            np.minimum(closest, np.where(hit, t, np.inf).min(axis=1), out=closest)
+
+        # --- Circles ---
+        if len(circles):
+            cx, cy, r = circles.T
+            fx, fy = ox - cx, oy - cy
+            a = dx * dx + dy * dy
+            b = 2 * (fx * dx + fy * dy)
+            c = fx * fx + fy * fy - r * r
+            disc = b * b - 4 * a * c
+            root = np.sqrt(np.maximum(disc, 0.0))
+            t1 = (-b - root) / (2 * a)
+            t2 = (-b + root) / (2 * a)
+            t = np.where(t1 >= 0, t1, np.where(t2 >= 0, t2, np.inf))
+            t[disc < 0] = np.inf
+            if ignore is not None:
+                own = np.asarray(ignore)[rows]
+                hits = np.nonzero(own >= 0)[0]
+                t[hits, own[hits]] = np.inf
+            np.minimum(closest, t.min(axis=1), out=closest)
+
+    return dist
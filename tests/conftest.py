@@ -0,0 +1,6 @@
+# tests/conftest.py
+# Run from the repository root: python -m pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
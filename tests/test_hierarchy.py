@@ -0,0 +1,48 @@
+# tests/test_hierarchy.py
+import random
+
+import pytest
+
+from core.controller import Controller
+from core.hierarchy import AbstractGraph
+from core.quadtree import OccupancyGrid
+from core.world import World
+
+
+def random_world(width, height, seed):
+    rng = random.Random(seed)
+    world = World(num_robots=0, width=width, height=height)
+    for _ in range(int(width * height / 400)):
+        x, y = rng.uniform(0, width), rng.uniform(0, height)
+        world.add_obstacle((x, y), (x + rng.uniform(-12, 12), y + rng.uniform(-12, 12)))
+    return world
+
+
+def cost(grid, cells):
+    return sum(grid.neighbors[a][b] for a, b in zip(cells, cells[1:]))
+
+
+# Tall, wide and square worlds; base_grid 16 leaves free leaves wider than
+# a cluster column of the tall world
+@pytest.mark.parametrize("width, height", [(64.0, 256.0), (256.0, 64.0), (128.0, 128.0)])
+def test_clusters_and_paths_on_any_world_shape(width, height):
+    world = random_world(width, height, seed=2)
+    grid = OccupancyGrid(world, 1.0, 16.0, 1.0, width, height)
+    graph = AbstractGraph(grid, 32.0)
+
+    for i, c in graph.cluster.items():
+        x0, y0, w, h = grid.cells[i][:4]
+        cx, cy, cw, ch = graph.boxes[c]
+        assert cx <= x0 and x0 + w <= cx + cw and cy <= y0 and y0 + h <= cy + ch
+
+    rng = random.Random(5)
+    free = sorted(graph.cluster)
+    for _ in range(40):
+        start, goal = rng.choice(free), rng.choice(free)
+        best = Controller.astar(grid, start, goal)
+        cells = graph.search(start, goal)
+        assert (cells is None) == (best is None)
+        if cells is not None:
+            assert cells[0] == start and cells[-1] == goal
+            assert all(b in grid.neighbors[a] for a, b in zip(cells, cells[1:]))
+            assert cost(grid, cells) >= cost(grid, best) - 1e-9
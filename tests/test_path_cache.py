@@ -0,0 +1,46 @@
+# tests/test_path_cache.py
+import pytest
+
+from benchmarks.scenarios import Scenario
+from core.controller import Controller
+
+
+def cost(grid, cells):
+    return sum(grid.neighbors[a][b] for a, b in zip(cells, cells[1:]))
+
+
+def test_cached_astar_matches_uncached_cost():
+    world = Scenario(200, 40, seed=5).build()
+    cached = Controller()
+    plain = Controller(path_cache_size=0)
+    grid = cached.get_occupancy_grid(world, 1.0)
+    fresh = plain.get_occupancy_grid(world, 1.0)
+
+    pairs = []
+    for robot in world.robots:
+        start = cached.get_cell_index(robot.x, robot.y, grid)
+        end = cached.get_cell_index(*robot.target, grid)
+        if start != -1 and end != -1:
+            pairs.append((start, end))
+    assert pairs
+
+    # Every pair twice (whole-path hits), then from cells along the first
+    # paths towards the same ends (suffix hits)
+    for start, end in pairs + pairs:
+        cells = cached.cached_astar(grid, start, end)
+        expected = plain.cached_astar(fresh, start, end)
+        assert (cells is None) == (expected is None)
+        if cells is not None:
+            assert cells[0] == start and cells[-1] == end
+            assert cost(grid, cells) == pytest.approx(cost(fresh, expected))
+    for start, end in pairs:
+        path = cached.cached_astar(grid, start, end) or []
+        for start in path[1:-1:3]:
+            cells = cached.cached_astar(grid, start, end)
+            assert cells[0] == start and cells[-1] == end
+            assert cost(grid, cells) == pytest.approx(cost(fresh, plain.astar(fresh, start, end)))
+
+    info = cached.path_cache_info()
+    assert info["hits"] >= len(pairs)
+    assert info["suffix_hits"] > 0
+    assert plain.path_cache_info()["hits"] == 0
@@ -0,0 +1,51 @@
+# tests/test_planner.py
+import random
+
+import pytest
+
+from core.grid import Grid
+from core.planner import Planner, find_conflicts
+from core.world import World
+
+
+def corridor_world(num_robots, seed):
+    """Start and target regions split by a wall with one narrow gap, so paths must cross."""
+    random.seed(seed)
+    world = World(num_robots=num_robots)
+    world.add_obstacle((60.0, 0.0), (60.0, 52.0))
+    world.add_obstacle((60.0, 72.0), (60.0, 128.0))
+    return world
+
+
+def check_plan(plan, grid):
+    paths = {rid: [cell for cell, _ in path] for rid, path in plan.paths.items()}
+    assert find_conflicts(paths) == []
+    moves = grid.moves()
+    for path in paths.values():
+        for cell, nxt in zip(path, path[1:]):
+            assert nxt in moves[cell]
+    assert plan.cost == sum(len(p) - 1 for p in paths.values())
+    return paths
+
+
+@pytest.mark.parametrize("seed", [1, 2, 6])
+def test_cbs_and_ecbs_plans_are_conflict_free(seed):
+    world = corridor_world(5, seed)
+    costs = {}
+    for algorithm in ("cbs", "ecbs"):
+        grid = Grid(world.width, world.height, cell_size=4.0)
+        planner = Planner(algorithm, suboptimality=1.5, time_limit=20.0)
+        plan = planner.plan(world, grid)
+        assert plan.success
+        paths = check_plan(plan, grid)
+        assert set(paths) == {robot.id for robot in world.robots}
+        costs[algorithm] = plan.cost
+
+    # CBS is optimal, ECBS within its suboptimality bound
+    assert costs["cbs"] <= costs["ecbs"] <= 1.5 * costs["cbs"]
+
+
+def test_find_conflicts_reports_vertex_and_swap_conflicts():
+    assert find_conflicts({0: [(0, 0), (1, 0)], 1: [(2, 0), (1, 0)]}) == [(0, 1, ((1, 0), 1), ((1, 0), 1))]
+    swap = find_conflicts({0: [(0, 0), (1, 0)], 1: [(1, 0), (0, 0)]})
+    assert [(a, b) for a, b, _, _ in swap] == [(0, 1)]
@@ -0,0 +1,64 @@
+# tests/test_quadtree.py
+import random
+
+import pytest
+
+from core.quadtree import OccupancyGrid
+from core.world import World
+
+
+def snapshot(grid):
+    """Leaves, free count and neighbor graph keyed by cell geometry, not by index."""
+    cells = [cell for cell in grid.cells if cell is not None]
+    neighbors = {}
+    for i, cell in enumerate(grid.cells):
+        if cell is not None and cell[4]:
+            neighbors[cell] = {grid.cells[j]: round(cost, 9) for j, cost in grid.neighbors[i].items()}
+    return sorted(cells), grid.root.free, neighbors
+
+
+def random_segment(rng, world):
+    x, y = rng.uniform(0, world.width), rng.uniform(0, world.height)
+    return (x, y), (x + rng.uniform(-10, 10), y + rng.uniform(-10, 10))
+
+
+@pytest.mark.parametrize("min_obstacles", [0, World.CLEARANCE_MIN_OBSTACLES])
+def test_sync_matches_fresh_build(min_obstacles):
+    rng = random.Random(3)
+    world = World(num_robots=0)
+    world.CLEARANCE_MIN_OBSTACLES = min_obstacles
+    for _ in range(15):
+        world.add_obstacle(*random_segment(rng, world))
+    grid = OccupancyGrid(world, 1.0, 8.0, 1.0, world.width, world.height)
+
+    for _ in range(20):
+        if world.obstacles and rng.random() < 0.4:
+            world.remove_obstacle(rng.choice(list(world.obstacles)))
+        else:
+            world.add_obstacle(*random_segment(rng, world))
+        assert grid.sync()
+        assert grid.version == world.obstacle_version
+
+        fresh = OccupancyGrid(world, 1.0, 8.0, 1.0, world.width, world.height)
+        assert snapshot(grid) == snapshot(fresh)
+
+
+def test_clearance_field_and_index_build_the_same_grid():
+    rng = random.Random(7)
+    world = World(num_robots=0)
+    for _ in range(40):
+        world.add_obstacle(*random_segment(rng, world))
+    assert world.clearance is None
+    by_index = OccupancyGrid(world, 1.0, 8.0, 1.0, world.width, world.height)
+
+    world.CLEARANCE_MIN_OBSTACLES = 0
+    assert world.clearance is not None
+    by_field = OccupancyGrid(world, 1.0, 8.0, 1.0, world.width, world.height)
+    assert snapshot(by_index) == snapshot(by_field)
+
+
+def test_sync_after_bulk_edit_asks_for_rebuild():
+    world = World(num_robots=0)
+    grid = OccupancyGrid(world, 1.0, 8.0, 1.0, world.width, world.height)
+    world.obstacles = []
+    assert not grid.sync()
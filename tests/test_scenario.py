@@ -0,0 +1,43 @@
+# tests/test_scenario.py
+import pytest
+
+from benchmarks.scenarios import Scenario
+from core.geometry import LineSegment, Rectangle
+from core.world import World
+
+
+def describe(world):
+    """Everything a scenario file stores, as plain comparable values."""
+    obstacles = sorted(
+        ("rect", o.x, o.y, o.w, o.h) if isinstance(o, Rectangle) else ("seg", *o.p1, *o.p2)
+        for o in world.obstacles
+    )
+    robots = [(r.id, r.x, r.y, r.radius, r.speed, r.target) for r in world.robots]
+    regions = [(r.x, r.y, r.w, r.h) for r in (world.start_region, world.target_region)]
+    return world.width, world.height, regions, obstacles, robots
+
+
+@pytest.mark.parametrize("name", ["scenario.dip", "scenario.json"])
+def test_save_load_round_trip(tmp_path, name):
+    world = Scenario(30, 12, seed=2, width=200.0, height=150.0).build()
+    world.obstacles.append(Rectangle(40.0, 50.0, 8.0, 3.5))
+    world.robots[0].target = None
+    path = str(tmp_path / name)
+    world.save_scenario(path)
+
+    loaded = World.from_scenario(path)
+    assert describe(loaded) == describe(world)
+    assert all(isinstance(o, (LineSegment, Rectangle)) for o in loaded.obstacles)
+
+    # Loading into an existing world replaces its contents in place
+    other = World(num_robots=3)
+    other.load_scenario(path)
+    assert describe(other) == describe(world)
+
+
+def test_json_and_binary_agree(tmp_path):
+    world = Scenario(20, 8, seed=5).build()
+    world.save_scenario(str(tmp_path / "a.dip"))
+    world.save_scenario(str(tmp_path / "a.json"))
+    assert (describe(World.from_scenario(str(tmp_path / "a.dip"))) ==
+            describe(World.from_scenario(str(tmp_path / "a.json"))))
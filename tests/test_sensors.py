@@ -0,0 +1,38 @@
+# tests/test_sensors.py
+import math
+
+import numpy as np
+
+from benchmarks.scenarios import Scenario
+from core.geometry import Rectangle
+from simulation.sensors import circle_array, raycast_many, segment_array
+
+ANGLES = np.linspace(0, 2 * math.pi, 24, endpoint=False)
+
+
+def scene():
+    world = Scenario(60, 30, seed=4).build()
+    world.obstacles.append(Rectangle(50.0, 50.0, 6.0, 4.0))
+    return world
+
+
+def test_raycast_many_matches_scalar_sense():
+    world = scene()
+    robots = world.robots
+    origins = np.repeat([robot.position for robot in robots], len(ANGLES), axis=0)
+    directions = np.tile(np.column_stack((np.cos(ANGLES), np.sin(ANGLES))), (len(robots), 1))
+    batched = raycast_many(origins, directions, segment_array(world.obstacles), circle_array(robots),
+                           20.0, ignore=np.repeat(np.arange(len(robots)), len(ANGLES)))
+
+    scalar = [robot.sense(float(a), world, 20.0) for robot in robots for a in ANGLES]
+    np.testing.assert_allclose(batched, scalar, rtol=0, atol=1e-9)
+    # Not a vacuous comparison: some beams hit something
+    assert (batched < 20.0).any()
+
+
+def test_sense_many_angles_matches_one_at_a_time():
+    world = scene()
+    for robot in world.robots[:10]:
+        many = robot.sense(ANGLES, world, 20.0)
+        one = [robot.sense(float(a), world, 20.0) for a in ANGLES]
+        np.testing.assert_allclose(many, one, rtol=0, atol=1e-9)
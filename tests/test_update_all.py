@@ -0,0 +1,21 @@
+# tests/test_update_all.py
+import pytest
+
+from core.controller import Controller
+from core.robot import Robot
+from core.world import World
+
+
+@pytest.mark.parametrize("radius", [0.5, 0.0])
+def test_fast_robot_does_not_pass_through_another(radius):
+    # 400 units in one tick is far more than MAX_SUBSTEPS radius-long steps
+    world = World(num_robots=0)
+    mover = Robot(0, (20.0, 50.0), radius=radius, speed=400.0)
+    standing = Robot(1, (40.0, 50.0), speed=0.0)
+    world.robots = [mover, standing]
+    mover.set_path([(100.0, 50.0)])
+
+    collided = Controller().update_all(world, 1.0)
+    assert collided.tolist() == [True, False]
+    assert mover.x <= standing.x - standing.radius - radius
+    assert standing.position == (40.0, 50.0)
@@ -0,0 +1,40 @@
+# tests/test_world.py
+import pytest
+
+from core.geometry import LineSegment
+from core.world import ObstacleList, World
+
+
+def segment(k):
+    return LineSegment((k, 0.0), (k, 5.0))
+
+
+@pytest.mark.parametrize("edit", [
+    lambda obs: obs.append(segment(9)),
+    lambda obs: obs.extend([segment(9)]),
+    lambda obs: obs.insert(0, segment(9)),
+    lambda obs: obs.remove(obs[0]),
+    lambda obs: obs.pop(),
+    lambda obs: obs.clear(),
+    lambda obs: obs.__setitem__(0, segment(9)),
+    lambda obs: obs.__setitem__(slice(0, 1), [segment(9)]),
+    lambda obs: obs.__delitem__(0),
+    lambda obs: obs.__iadd__([segment(9)]),
+    lambda obs: obs.__imul__(2),
+    lambda obs: obs.__imul__(0),
+])
+def test_every_mutation_bumps_the_version(edit):
+    obstacles = ObstacleList(segment(k) for k in range(3))
+    version = obstacles.version
+    edit(obstacles)
+    assert obstacles.version != version
+
+
+def test_index_follows_in_place_repeat():
+    world = World(num_robots=0)
+    world.add_obstacle((10.0, 10.0), (20.0, 10.0))
+    world.obstacle_index  # built for the single obstacle
+    # Through a held reference: world.obstacles *= 0 would go through the setter
+    obstacles = world.obstacles
+    obstacles *= 0
+    assert world.obstacle_index.nearest(15.0, 10.0, 1.0)[0] is None